@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Compares the throughput of the batch protocol with the per-record protocol
+
+Usage:
+    python benchmarks/bench_batch.py [number of records]
+"""
+
+import io
+import random
+import sys
+import time
+from typing import Any, Type
+
+from itaxotools.DNAconvert import convertDNA
+from itaxotools.DNAconvert.library.fasta import Fastafile
+from itaxotools.DNAconvert.library.tabfile import Tabfile
+
+options = dict(
+    allow_empty_sequences=False,
+    automatic_renaming=False,
+    preserve_spaces=False,
+    preserve_special=False,
+)
+
+
+def per_record(format: Type[Any]) -> Type[Any]:
+    """
+    Returns a copy of the format class without the batch methods
+    """
+    attributes = {
+        name: value
+        for name, value in vars(format).items()
+        if name not in {"read_batches", "write_batches"}
+    }
+    return type(format.__name__ + "PerRecord", (), attributes)
+
+
+def generate_fasta(count: int) -> str:
+    rng = random.Random(0)
+    return "".join(
+        f">seq{i}\n{''.join(rng.choices('ACGT', k=rng.randint(100, 700)))}\n"
+        for i in range(count)
+    )
+
+
+def generate_tab(count: int) -> str:
+    rng = random.Random(0)
+    return "seqid\tspecies\tsequence\n" + "".join(
+        f"seq{i}\tGenus species{i % 100}\t{''.join(rng.choices('ACGT', k=rng.randint(100, 700)))}\n"
+        for i in range(count)
+    )
+
+
+def measure(data: str, informat: Type[Any], outformat: Type[Any], count: int) -> float:
+    """
+    Returns the number of records converted per second
+    """
+    infile = io.StringIO(data)
+    outfile = io.StringIO()
+    start = time.perf_counter()
+    convertDNA(infile, outfile, informat, outformat, **options)
+    return count / (time.perf_counter() - start)
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    inputs = {"fasta": generate_fasta(count), "tab": generate_tab(count)}
+    pairs = [
+        ("fasta", Fastafile, "tab", Tabfile),
+        ("tab", Tabfile, "fasta", Fastafile),
+        ("fasta", Fastafile, "fasta", Fastafile),
+    ]
+    print(f"{'conversion':<16}{'per-record':>14}{'batch':>14}{'gain':>8}")
+    for inname, informat, outname, outformat in pairs:
+        data = inputs[inname]
+        old = measure(data, per_record(informat), per_record(outformat), count)
+        new = measure(data, informat, outformat, count)
+        print(
+            f"{inname + ' -> ' + outname:<16}{old:>12.0f}/s{new:>12.0f}/s{new / old:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Compares the parsing speed of FASTA and tab files read as text, as bytes and from a memory map
+
+Usage:
+    python benchmarks/bench_binary.py [number of records]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, Type
+
+from itaxotools.DNAconvert.library import binary
+from itaxotools.DNAconvert.library.fasta import Fastafile
+from itaxotools.DNAconvert.library.tabfile import Tabfile
+
+
+def generate_fasta(count: int) -> str:
+    rng = random.Random(0)
+    records = []
+    for i in range(count):
+        sequence = "".join(rng.choices("ACGT", k=rng.randint(100, 2000)))
+        # the sequences are wrapped at 60 characters
+        lines = "\n".join(sequence[j : j + 60] for j in range(0, len(sequence), 60))
+        records.append(f">seq{i} sample\n{lines}\n")
+    return "".join(records)
+
+
+def generate_tab(count: int) -> str:
+    rng = random.Random(0)
+    return "seqid\tspecies\tlocality\tsequence\n" + "".join(
+        f"seq{i}\tGenus species{i % 100}\tlocality {i % 7}\t{''.join(rng.choices('ACGT', k=rng.randint(100, 2000)))}\n"
+        for i in range(count)
+    )
+
+
+def measure(path: str, format: Type[Any], repeat: int = 3) -> float:
+    """
+    Returns the number of megabytes parsed per second in the best of the runs
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with open(path, errors="replace") as file:
+            _, batches = format.read_batches(file)
+            for _ in batches():
+                pass
+        best = min(best, time.perf_counter() - start)
+    return os.path.getsize(path) / best / 1e6
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    inputs = [
+        ("fasta", Fastafile, generate_fasta(count)),
+        ("tab", Tabfile, generate_tab(count)),
+    ]
+    binary_source = binary.binary_source
+    map_file = binary.map_file
+    # the functions disabled in each mode
+    modes: Dict[str, Dict[str, Callable]] = {
+        "text": dict(binary_source=lambda file: None, map_file=lambda file: None),
+        "bytes": dict(binary_source=binary_source, map_file=lambda file: None),
+        "mmap": dict(binary_source=binary_source, map_file=map_file),
+    }
+    print(f"{'format':<8}" + "".join(f"{mode:>12}" for mode in modes))
+    with tempfile.TemporaryDirectory() as directory:
+        for name, format, data in inputs:
+            path = os.path.join(directory, name)
+            with open(path, "w") as file:
+                file.write(data)
+            speeds = []
+            for functions in modes.values():
+                for function_name, function in functions.items():
+                    setattr(binary, function_name, function)
+                speeds.append(measure(path, format))
+            print(f"{name:<8}" + "".join(f"{speed:>8.1f}MB/s" for speed in speeds))
+
+
+if __name__ == "__main__":
+    main()
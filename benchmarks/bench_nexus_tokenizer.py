@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Compares the speed of the NEXUS tokenizer with the previous character-by-character tokenizer
+
+A NEXUS file with a DNA matrix of the given numbers of taxa and sites is generated in memory.
+Both tokenizers must emit the same tokens for it.
+
+Usage:
+    python benchmarks/bench_nexus_tokenizer.py [taxa] [sites]
+"""
+
+import io
+import random
+import sys
+import time
+from typing import Callable, ClassVar, Iterator, List, Optional, Set, TextIO
+
+from itaxotools.DNAconvert.library.nexus import Tokenizer
+
+
+# the previous tokenizer, which reads the file one character at a time
+class CharTokenizer:
+    """
+    Token iterator for the NEXUS format
+
+    Emits the stream of words and punctuation
+    """
+
+    punctuation: ClassVar[Set[str]] = set("=;")
+
+    def __init__(self, file: TextIO):
+        """
+        Iterate over the token in 'file'
+        """
+        # check that the file is in NEXUS format
+        magic_word = file.read(6)
+        if magic_word != "#NEXUS":
+            raise ValueError("The input file is not a nexus file")
+        # contains the underlying file
+        self.file = file
+        # the currently read token
+        self.token: List[str] = []
+        # the currently read line
+        self.line = ""
+        # the reading position in the line
+        self.line_pos = 0
+
+    def peek_char(self) -> Optional[str]:
+        """
+        Returns the next char, without advancing the position.
+        Returns None, if EOF is reached
+        """
+        try:
+            c = self.line[self.line_pos]
+            return c
+        except IndexError:
+            # line_pos is self.line.len()
+            # it's equivalent to 0 in the next line
+            self.line = self.file.readline()
+            if self.line == "":
+                # EOF is reached
+                return None
+            self.line_pos = 0
+            c = self.line[0]
+            return c
+
+    def get_char(self) -> Optional[str]:
+        """
+        Emits a char, advancing the reading
+        Returns None, if EOF is reached
+        """
+        c = self.peek_char()
+        self.line_pos += 1
+        return c
+
+    def replace_token(self, token: List[str]) -> str:
+        """
+        Remember the next token and return the str representation of the current one
+        """
+        self.token, token = token, self.token
+        return "".join(token)
+
+    def skip_comment(self) -> None:
+        """
+        Advance the iterator past the end of a comment
+        """
+        while True:
+            c = self.get_char()
+            if c is None:
+                # EOF is reached, should not happen in a well-formed file
+                raise ValueError("Nexus: EOF inside a comment")
+            elif c == "[":
+                # comment inside a comment
+                self.skip_comment
+            elif c == "]":
+                # end of the comment
+                break
+
+    def read_quoted(self) -> List[str]:
+        """
+        Reads a quoted string as one token
+        """
+        s = []
+        while True:
+            c = self.get_char()
+            if c is None:
+                # EOF is reached, should not happen in a well-formed file
+                raise ValueError("Nexus: EOF inside a quoted value")
+            elif c == "'":
+                # possible end of the quoted value
+                if self.peek_char == "'":
+                    # '' is ', and not the end
+                    s += ["'"]
+                else:
+                    # the end of the line
+                    return s
+            else:
+                # update the line
+                s += [c]
+
+    def __iter__(self) -> "CharTokenizer":
+        """CharTokenizer is an Iterator"""
+        return self
+
+    def __next__(self) -> str:
+        if self.token:
+            # the is a previously saved token
+            return self.replace_token([])
+        while True:
+            c = self.get_char()
+            if c is None:
+                # EOF => return the last token
+                if self.token:
+                    "".join(self.token)
+                else:
+                    raise StopIteration
+            elif c in CharTokenizer.punctuation:
+                # punctuation is a token by itself => save it into the token
+                token = self.replace_token([c])
+                if token:
+                    return token
+            elif c == "[":
+                # a comment => skip it
+                self.skip_comment()
+            elif c == "'":
+                # a quoted value => read it and save into the token
+                token = self.replace_token(self.read_quoted())
+                if token:
+                    return token
+            elif c.isspace():
+                # whitespace => return the token, if it's the first whitespace
+                if self.token:
+                    token = self.replace_token([])
+                    return token
+            else:
+                # otherwise => update the token
+                self.token.append(c)
+
+
+def nexus_text(taxa: int, sites: int) -> str:
+    """Returns a NEXUS file with a DNA matrix of random sequences"""
+    rng = random.Random(0)
+    pool = "".join(rng.choices("ACGT", k=sites + taxa))
+    lines = [
+        "#NEXUS",
+        "begin data;",
+        f"dimensions ntax={taxa} nchar={sites};",
+        "format datatype=DNA missing=? gap=-;",
+        "[a comment before the matrix]",
+        "matrix",
+    ]
+    lines += [f"taxon_{i} {pool[i : i + sites]}" for i in range(taxa)]
+    lines += [";", "end;", ""]
+    return "\n".join(lines)
+
+
+def measure(tokenizer: Callable[[TextIO], Iterator[str]], text: str) -> List[str]:
+    """Prints the time of the tokenization of text and returns the tokens"""
+    start = time.perf_counter()
+    tokens = list(tokenizer(io.StringIO(text)))
+    seconds = time.perf_counter() - start
+    print(
+        f"{tokenizer.__name__:<15}{seconds:>10.3f} s{len(text) / seconds / 1e6:>10.2f} MB/s"
+    )
+    return tokens
+
+
+def main() -> None:
+    taxa = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    sites = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    text = nexus_text(taxa, sites)
+    print(f"{taxa} taxa x {sites} sites, {len(text) / 1e6:.1f} MB")
+    tokens = measure(Tokenizer, text)
+    if measure(CharTokenizer, text) != tokens:
+        sys.exit("The tokenizers emit different tokens")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Compares the memory used by the schema-based records with the dictionary-based records
+
+Usage:
+    python benchmarks/bench_record_memory.py [number of records]
+"""
+
+import sys
+import tracemalloc
+from typing import Callable, List, Optional
+
+from itaxotools.DNAconvert.library.genbank import gb_schema
+from itaxotools.DNAconvert.library.record import Record
+
+
+class DictRecord:
+    """The previous implementation of Record, that wraps a dictionary"""
+
+    def __init__(self, **kwargs: str):
+        self._fields = kwargs
+
+    def __getitem__(self, field: str) -> str:
+        return self._fields[field]
+
+    def __setitem__(self, field: str, value: str) -> None:
+        self._fields[field] = value
+
+    def get(self, field: str) -> Optional[str]:
+        return self._fields.get(field)
+
+
+def measure(make_records: Callable[[], List]) -> int:
+    """
+    Returns the number of bytes allocated by make_records and still in use
+    """
+    tracemalloc.start()
+    records = make_records()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del records
+    return current
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    fields = gb_schema.fields
+    # the values are shared, so that only the containers are measured
+    values = [f"value of {field}" for field in fields]
+
+    def genbank_dict_records() -> List:
+        # the previous Genbank reader filled the fields one by one
+        records = []
+        for _ in range(count):
+            record = DictRecord(seqid=values[0], sequence=values[1])
+            for field, value in zip(fields[2:], values[2:]):
+                record[field] = value
+            records.append(record)
+        return records
+
+    def genbank_records() -> List:
+        return [Record.from_values(gb_schema, values.copy()) for _ in range(count)]
+
+    def fasta_dict_records() -> List:
+        return [DictRecord(seqid=values[0], sequence=values[1]) for _ in range(count)]
+
+    def fasta_records() -> List:
+        return [Record(seqid=values[0], sequence=values[1]) for _ in range(count)]
+
+    print(f"{'records':<24}{'dict-based':>14}{'schema-based':>14}{'ratio':>8}")
+    for name, old, new in [
+        (f"Genbank ({len(fields)} fields)", genbank_dict_records, genbank_records),
+        ("FASTA (2 fields)", fasta_dict_records, fasta_records),
+    ]:
+        old_size = measure(old) / count
+        new_size = measure(new) / count
+        print(
+            f"{name:<24}{old_size:>12.0f} B{new_size:>12.0f} B{old_size / new_size:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
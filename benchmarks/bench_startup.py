@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Measures the start time of a command-line conversion of a small FASTA file into a tab file
+
+The time of the interpreter start is subtracted.
+Exits with status 1, if the median time exceeds the budget.
+The times are representative, when the modules are compiled to bytecode, as in an installed package.
+
+Usage:
+    python benchmarks/bench_startup.py [budget in milliseconds]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List
+
+# the default budget for the start of DNAconvert --cmd, in milliseconds
+BUDGET_MS = 100
+
+RUNS = 15
+
+
+def run_times(arguments: List[str]) -> List[float]:
+    """Returns the wall-clock times of the runs of the Python interpreter, in milliseconds"""
+    times = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *arguments], check=True)
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def main() -> None:
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else BUDGET_MS
+    with tempfile.TemporaryDirectory() as directory:
+        infile = os.path.join(directory, "input.fas")
+        outfile = os.path.join(directory, "output.tab")
+        with open(infile, "w") as file:
+            file.write(">seq1\nACGT\n>seq2\nGGCC\n")
+        interpreter = statistics.median(run_times(["-c", "pass"]))
+        conversion = statistics.median(
+            run_times(
+                [
+                    "-c",
+                    "from itaxotools.DNAconvert import main; main()",
+                    "--cmd",
+                    "--informat",
+                    "fasta",
+                    "--outformat",
+                    "tab",
+                    infile,
+                    outfile,
+                ]
+            )
+        )
+    startup = conversion - interpreter
+    print(f"interpreter: {interpreter:.1f} ms")
+    print(f"DNAconvert --cmd: {startup:.1f} ms (budget {budget:.0f} ms)")
+    if startup > budget:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Compares two result files of suite.py, e.g. of two releases
+
+Prints the ratio of the throughput and of the peak memory for each conversion measured in both.
+
+Usage:
+    python benchmarks/compare.py OLD.json NEW.json
+"""
+
+import json
+import sys
+from typing import Any, Dict, Tuple
+
+
+def load(path: str) -> Dict[Tuple[str, str, int, str], Dict[str, Any]]:
+    """Returns the results in the file by the conversion"""
+    with open(path) as file:
+        results = json.load(file)["results"]
+    return {
+        (result["input"], result["output"], result["records"], result["length"]): result
+        for result in results
+    }
+
+
+def main() -> None:
+    if len(sys.argv) != 3:
+        sys.exit(__doc__)
+    old, new = load(sys.argv[1]), load(sys.argv[2])
+    print(f"{'conversion':<50}{'speed':>10}{'memory':>10}")
+    for key, result in new.items():
+        if key not in old:
+            continue
+        name = f"{key[0]} -> {key[1]} ({key[2]} {key[3]})"
+        before = old[key]
+        if "error" in result or "error" in before:
+            status = "error" if "error" in result else "fixed"
+            print(f"{name:<50}{status:>10}")
+            continue
+        speed = result["records_per_s"] / before["records_per_s"]
+        if result["peak_rss"] and before["peak_rss"]:
+            memory = f"{result['peak_rss'] / before['peak_rss']:>9.2f}x"
+        else:
+            memory = f"{'?':>10}"
+        print(f"{name:<50}{speed:>9.2f}x{memory}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Generates deterministic synthetic input files in every readable format
+
+The records have a seqid, an organism, a specimen voucher and a DNA sequence.
+The same arguments always produce the same file.
+
+Usage:
+    python benchmarks/generate.py FORMAT COUNT {short,long} OUTPUT
+"""
+
+import random
+import sys
+import tempfile
+import warnings
+from typing import Iterator, NamedTuple, TextIO
+
+from itaxotools.DNAconvert import convertDNA
+from itaxotools.DNAconvert.library.formats import formats
+
+# the ranges of the lengths of the sequences
+LENGTHS = {"short": (200, 800), "long": (10_000, 20_000)}
+
+# the formats that can't be read
+OUTPUT_ONLY = {"fasta_nogaps"}
+
+# the formats that can be read
+READABLE = [name for name in formats if name not in OUTPUT_ONLY]
+
+options = dict(
+    allow_empty_sequences=False,
+    automatic_renaming=False,
+    preserve_spaces=False,
+    preserve_special=False,
+)
+
+
+class SyntheticRecord(NamedTuple):
+    seqid: str
+    organism: str
+    voucher: str
+    sequence: str
+
+
+def synthetic_records(
+    count: int, length: str, seed: int = 0
+) -> Iterator[SyntheticRecord]:
+    """Yields count deterministic records with sequences of the given length class"""
+    rng = random.Random(seed)
+    shortest, longest = LENGTHS[length]
+    # the sequences are slices of a random pool, which is much faster than generating each
+    pool = "".join(rng.choices("ACGT", k=1 << 20)) * 2
+    for i in range(count):
+        start = rng.randrange(1 << 20)
+        size = rng.randint(shortest, longest)
+        yield SyntheticRecord(
+            seqid=f"seq{i:08d}",
+            organism=f"Genus{i % 97} species{i % 1009}",
+            voucher=f"V{rng.randrange(10**6):06d}",
+            sequence=pool[start : start + size],
+        )
+
+
+def write_tab(records: Iterator[SyntheticRecord], file: TextIO) -> None:
+    print("seqid", "organism", "specimen_voucher", "sequence", sep="\t", file=file)
+    for record in records:
+        print(*record, sep="\t", file=file)
+
+
+def write_fastq(records: Iterator[SyntheticRecord], file: TextIO) -> None:
+    for record in records:
+        quality = "I" * len(record.sequence)
+        file.write(f"@{record.seqid}\n{record.sequence}\n+\n{quality}\n")
+
+
+def write_genbank(records: Iterator[SyntheticRecord], file: TextIO) -> None:
+    for i, record in enumerate(records):
+        accession = f"SY{i:08d}"
+        length = len(record.sequence)
+        file.write(
+            f"LOCUS       {accession}{length:>15} bp    DNA     linear   INV 01-JAN-2020\n"
+            f"DEFINITION  {record.organism} voucher {record.voucher} cytochrome oxidase\n"
+            "            subunit 1 (COI) gene, partial cds; mitochondrial.\n"
+            f"ACCESSION   {accession}\n"
+            f"VERSION     {accession}.1\n"
+            f"SOURCE      mitochondrion {record.organism}\n"
+            f"  ORGANISM  {record.organism}\n"
+            "            Eukaryota; Metazoa; Arthropoda.\n"
+            "FEATURES             Location/Qualifiers\n"
+            f"     source          1..{length}\n"
+            f'                     /organism="{record.organism}"\n'
+            '                     /mol_type="genomic DNA"\n'
+            f'                     /specimen_voucher="{record.voucher}"\n'
+            "ORIGIN\n"
+        )
+        sequence = record.sequence.lower()
+        for start in range(0, length, 60):
+            line = sequence[start : start + 60]
+            groups = " ".join(line[j : j + 10] for j in range(0, len(line), 10))
+            file.write(f"{start + 1:>9} {groups}\n")
+        file.write("//\n\n")
+
+
+def generate(format_name: str, count: int, length: str, path: str) -> None:
+    """Writes the synthetic file of the format at path"""
+    if format_name not in READABLE:
+        raise ValueError(f"{format_name} is not a readable format")
+    records = synthetic_records(count, length)
+    with open(path, "w") as file:
+        if format_name == "fastq":
+            write_fastq(records, file)
+        elif format_name == "genbank":
+            write_genbank(records, file)
+        elif format_name == "tab":
+            write_tab(records, file)
+        else:
+            # the other formats are written by DNAconvert from a tab file
+            with tempfile.TemporaryFile("w+") as tab, warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                write_tab(records, tab)
+                tab.seek(0)
+                convertDNA(tab, file, formats["tab"], formats[format_name], **options)
+
+
+def main() -> None:
+    if len(sys.argv) != 5:
+        sys.exit(__doc__)
+    format_name, count, length, path = sys.argv[1:]
+    generate(format_name, int(count), length, path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Measures the throughput and the peak memory of the conversions between the formats
+
+For each number of records and length class, synthetic inputs are generated in the readable formats
+(see generate.py) and converted into each writable format in a separate process.
+Records/s, MB/s of the input and the peak resident set size are written to a JSON file,
+which can be compared with compare.py.
+
+Usage:
+    python benchmarks/suite.py [--records 10000,100000] [--lengths short,long]
+                               [--inputs fasta,tab] [--outputs tab,nexus]
+                               [--data DIRECTORY] [--output results.json]
+"""
+
+import argparse
+import importlib.metadata
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from typing import Any, Dict, List, Optional
+
+from generate import READABLE, generate, options
+
+from itaxotools.DNAconvert import convertDNA
+from itaxotools.DNAconvert.library.formats import formats
+
+# the formats that can't be written
+INPUT_ONLY = {"genbank"}
+
+# the formats that can be written
+WRITABLE = [name for name in formats if name not in INPUT_ONLY]
+
+
+def peak_rss() -> Optional[int]:
+    """Returns the peak resident set size of this process in bytes, if it's known"""
+    # on Linux, ru_maxrss can be inherited from the parent process
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # bytes on macOS
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run_conversion(informat: str, outformat: str, inpath: str, outpath: str) -> None:
+    """Converts one file and prints the measurements as JSON, in the child process"""
+    result: Dict[str, Any] = {}
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            with open(inpath, errors="replace") as infile, open(
+                outpath, "w+"
+            ) as outfile:
+                start = time.perf_counter()
+                convertDNA(
+                    infile, outfile, formats[informat], formats[outformat], **options
+                )
+                result["seconds"] = time.perf_counter() - start
+    except Exception as ex:
+        result["error"] = f"{type(ex).__name__}: {ex}"
+    result["peak_rss"] = peak_rss()
+    print(json.dumps(result))
+
+
+def measure(
+    informat: str, outformat: str, inpath: str, outpath: str, count: int
+) -> Dict[str, Any]:
+    """Runs the conversion in a new process and returns its measurements"""
+    process = subprocess.run(
+        [sys.executable, __file__, "--child", informat, outformat, inpath, outpath],
+        capture_output=True,
+        text=True,
+    )
+    if process.returncode != 0:
+        return dict(error=process.stderr.strip().splitlines()[-1])
+    result = json.loads(process.stdout.splitlines()[-1])
+    if "seconds" in result:
+        size = os.path.getsize(inpath)
+        result["records_per_s"] = count / result["seconds"]
+        result["mb_per_s"] = size / result["seconds"] / 1e6
+    if os.path.exists(outpath):
+        os.remove(outpath)
+    return result
+
+
+def run_suite(
+    counts: List[int],
+    lengths: List[str],
+    inputs: List[str],
+    outputs: List[str],
+    data: str,
+) -> List[Dict[str, Any]]:
+    results = []
+    for count in counts:
+        for length in lengths:
+            for informat in inputs:
+                inpath = os.path.join(data, f"{count}_{length}.{informat}")
+                if not os.path.exists(inpath):
+                    generate(informat, count, length, inpath)
+                for outformat in outputs:
+                    outpath = os.path.join(data, f"output.{outformat}")
+                    result = dict(
+                        input=informat,
+                        output=outformat,
+                        records=count,
+                        length=length,
+                        input_bytes=os.path.getsize(inpath),
+                    )
+                    result.update(measure(informat, outformat, inpath, outpath, count))
+                    results.append(result)
+                    print(summary(result), file=sys.stderr)
+    return results
+
+
+def summary(result: Dict[str, Any]) -> str:
+    """Returns a line describing the result"""
+    name = f"{result['input']} -> {result['output']} ({result['records']} {result['length']})"
+    if "error" in result:
+        return f"{name:<50} {result['error']}"
+    peak = result["peak_rss"] / 1e6 if result["peak_rss"] else float("nan")
+    return f"{name:<50} {result['records_per_s']:>12.0f} rec/s {result['mb_per_s']:>8.2f} MB/s {peak:>8.1f} MB"
+
+
+def package_version() -> Optional[str]:
+    """Returns the version of the installed DNAconvert"""
+    try:
+        return importlib.metadata.version("DNAconvert")
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+
+def names(argument: str) -> List[str]:
+    return [name for name in argument.split(",") if name]
+
+
+def main() -> None:
+    if sys.argv[1:2] == ["--child"]:
+        run_conversion(*sys.argv[2:6])
+        return
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=names, default=["10000"])
+    parser.add_argument("--lengths", type=names, default=["short"])
+    parser.add_argument("--inputs", type=names, default=READABLE)
+    parser.add_argument("--outputs", type=names, default=WRITABLE)
+    parser.add_argument(
+        "--data", help="directory for the generated inputs, kept between runs"
+    )
+    parser.add_argument("--output", default="benchmark_results.json")
+    args = parser.parse_args()
+    if args.data:
+        os.makedirs(args.data, exist_ok=True)
+
+    with tempfile.TemporaryDirectory() as temporary:
+        results = run_suite(
+            [int(count) for count in args.records],
+            args.lengths,
+            args.inputs,
+            args.outputs,
+            args.data or temporary,
+        )
+    with open(args.output, "w") as file:
+        json.dump(
+            dict(
+                version=package_version(),
+                python=platform.python_version(),
+                platform=platform.platform(),
+                processor=platform.processor(),
+                results=results,
+            ),
+            file,
+            indent=1,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -4,18 +4,15 @@ import io
 import sys
 from .library import formats
 import os
-import tkinter as tk
-import tkinter.filedialog
-import tkinter.messagebox
-import tkinter.font as tkfont
-from tkinter import ttk
 import warnings
-import gzip
+from dataclasses import dataclass, field
 from .library import fasta
-from typing import Tuple, Type, Optional, TextIO, Any
-from .library import guiutils
+from typing import Tuple, Type, Optional, TextIO, Any, List, Dict, Iterator
 from .library import utils
-from .library.resources import get_resource
+from .library import compression as library_compression
+from .library import profiling
+from .library import progress as library_progress
+from .library.record import Record
 
 
 def splitext(name: str) -> Tuple[str, str]:
@@ -60,12 +57,76 @@ def parse_format(name: Optional[str], ext_pair: Tuple[str, str]) -> Optional[Typ
             return None
 
 
+def read_batches(
+    infile: TextIO, informat: Type[Any], options: Dict[str, Any]
+) -> Tuple[List[str], Iterator[List[Record]]]:
+    """
+    Starts reading infile of format informat
+
+    Returns the list of fields and an iterator over the batches of records
+    """
+    # the records are read in batches, if the format supports it
+    read = getattr(informat, "read_batches", informat.read)
+    if hasattr(informat, "read_takes_kwargs"):
+        fields, records = read(infile, **options)
+    else:
+        fields, records = read(infile)
+    if hasattr(informat, "read_batches"):
+        return fields, records()
+    else:
+        return fields, utils.batched(records())
+
+
+def prepare_batch(batch: List[Record], options: Dict[str, Any]) -> List[Record]:
+    """
+    Removes the spaces from the sequences and the records with empty sequences,
+    unless the options say otherwise
+    """
+    if not options["preserve_spaces"]:
+        for record in batch:
+            record["sequence"] = record["sequence"].replace(" ", "")
+    # when 'allow_empty_sequences' is set, all the records are passed to the writer
+    # otherwise only the records with non-empty sequences are passed
+    if not options["allow_empty_sequences"]:
+        batch = [record for record in batch if record["sequence"]]
+    return batch
+
+
+def prescan(
+    infile: TextIO,
+    informat: Type[Any],
+    outformat: Type[Any],
+    options: Dict[str, Any],
+    monitor: Optional[library_progress.Monitor] = None,
+) -> List[Any]:
+    """
+    Reads infile once to collect the information that outformat needs before writing the first record
+
+    Returns the results of the prescan aggregator of outformat.
+    infile is returned to its initial position.
+    The cancellation of the conversion is checked by the monitor
+    """
+    start = infile.tell()
+    fields, batches = read_batches(infile, informat, options)
+    aggregator = outformat.prescan(fields, **options)
+    # the warnings are raised during the actual conversion
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for batch in batches:
+            if monitor is not None:
+                monitor.check()
+            for record in prepare_batch(batch, options):
+                aggregator.send(record)
+    infile.seek(start)
+    return aggregator.results()
+
+
 def convertDNA(
     infile: TextIO,
     outfile: TextIO,
     informat: Type[Any],
     outformat: Type[Any],
-    **options: bool,
+    **options: Any,
 ) -> None:
     """
     Converts infile of format informat to outfile of format outformat with given options
@@ -75,41 +136,120 @@ def convertDNA(
            By default, records with empty sequences are discarded
         automatic_renaming: if set, enables automatic renaming of sequence names
         preserve_spaces: if set, the spaces in sequences are not removed
+        jobs: the number of processes parsing infile (only used by the FASTA formats and GenBank). 1 by default
+        low_memory: if set, the formats that need information about all the records before writing
+           read a seekable infile twice or keep the records in a temporary file,
+           instead of keeping them in memory
+        select: the list of names of records to convert, in the order of output (only used by the FASTA formats and GenBank).
+           The name of a record is its identifier line up to the first whitespace,
+           or the accession or the definition of a GenBank record
+        record_range: the pair (start, stop) of positions of records to convert, as in a slice
+           (only used by the FASTA formats and GenBank)
+        profile: a profiling.Profile, that records the time of the stages of the conversion
+        progress: a function that is called with a progress.Progress after each batch of records
+        cancel: a progress.CancelToken. The conversion raises progress.ConversionCancelled,
+           if the token is cancelled, leaving outfile incomplete
     """
     utils.GLOBAL_OPTION_DISABLE_AUTOMATIC_RENAMING = not options["automatic_renaming"]
+    # the stages are only timed, if the conversion is profiled
+    profile = options.pop("profile", None) or profiling.Profile(enabled=False)
+    monitor = library_progress.Monitor(
+        infile, options.pop("progress", None), options.pop("cancel", None)
+    )
+    with profile.conversion():
+        convert_records(
+            infile,
+            profile.output(outfile),
+            informat,
+            outformat,
+            profile,
+            monitor,
+            options,
+        )
+    monitor.finish()
+
+
+def convert_records(
+    infile: TextIO,
+    outfile: TextIO,
+    informat: Type[Any],
+    outformat: Type[Any],
+    profile: profiling.Profile,
+    monitor: library_progress.Monitor,
+    options: Dict[str, Any],
+) -> None:
+    """
+    Does the conversion of convertDNA, timing its stages in profile
+    and reporting the progress to monitor
+    """
     # take a shortcut for convertion FastQ into FASTA
     if informat is fasta.FastQFile and outformat is fasta.Fastafile:
-        fasta.FastQFile.to_fasta(infile, outfile)
+        with profile.stage("read"):
+            fasta.FastQFile.to_fasta(infile, outfile, monitor.update)
         return
 
+    # the readers can skip the fields, that the writer doesn't use
+    if hasattr(outformat, "consumed_fields"):
+        options = dict(options, projection=outformat.consumed_fields)
+
+    # in the low memory mode, the writer receives the information it needs in advance
+    if (
+        options.get("low_memory")
+        and hasattr(outformat, "prescan")
+        and infile.seekable()
+    ):
+        with profile.stage("prescan"):
+            prescan_results = prescan(infile, informat, outformat, options, monitor)
+        options = dict(options, prescan=prescan_results)
+
     # initialize reading the file
-    if hasattr(informat, "read_takes_kwargs"):
-        fields, records = informat.read(infile, **options)
-    else:
-        fields, records = informat.read(infile)
+    with profile.stage("read"):
+        fields, batches = read_batches(infile, informat, options)
 
     # start the writer
-    if hasattr(outformat, "write_takes_kwargs"):
-        writer = outformat.write(outfile, fields, **options)
-    else:
-        writer = outformat.write(outfile, fields)
-    next(writer)
+    # the records are written in batches, if the format supports it
+    write_batches = hasattr(outformat, "write_batches")
+    write = outformat.write_batches if write_batches else outformat.write
+    with profile.stage("write"):
+        if hasattr(outformat, "write_takes_kwargs"):
+            writer = write(outfile, fields, **options)
+        else:
+            writer = write(outfile, fields)
+        next(writer)
 
     # keep track of the number of skipped records
     skipped = 0
-    # iterate over the records in infile
-    for record in records():
-        if not options["preserve_spaces"]:
-            record["sequence"] = record["sequence"].replace(" ", "")
-        # when 'allow_empty_sequences' is set, the condition is always true and the record is passed to the writer
-        # otherwise only the records with non-empty sequences are passed
-        if record["sequence"] or options["allow_empty_sequences"]:
-            writer.send(record)
-        else:
-            skipped += 1
+    # iterate over the batches of records in infile
+    while True:
+        with profile.stage("read"):
+            batch = next(batches, None)
+        if batch is None:
+            break
+        try:
+            monitor.update(len(batch))
+        except library_progress.ConversionCancelled as cancelled:
+            # stop the reader and the writer without finishing the output
+            getattr(batches, "close", lambda: None)()
+            try:
+                writer.throw(cancelled)
+            except library_progress.ConversionCancelled:
+                pass
+            raise
+        with profile.stage("prepare"):
+            prepared = prepare_batch(batch, options)
+        skipped += len(batch) - len(prepared)
+        if not prepared:
+            continue
+        with profile.stage("write"):
+            if write_batches:
+                writer.send(prepared)
+            else:
+                for record in prepared:
+                    writer.send(record)
 
     # finish the writing
-    writer.close()
+    with profile.stage("write"):
+        writer.close()
 
     # inform the user about the number of skipped records
     if skipped > 0:
@@ -118,44 +258,242 @@ def convertDNA(
         )
 
 
+@dataclass
+class FileResult:
+    """
+    The outcome of the conversion of one file in a directory
+    """
+
+    infile: str
+    outfile: str
+    # the messages of the warnings raised during the conversion
+    warnings: List[str] = field(default_factory=list)
+    # the message of the error that stopped the conversion
+    error: Optional[str] = None
+    # the number of records read from infile
+    records: int = 0
+
+
+class BatchConversionError(ValueError):
+    """
+    Raised when some of the files in a directory could not be converted
+    """
+
+    def __init__(self, failed: List[FileResult], total: int):
+        self.failed = failed
+        super().__init__(
+            f"{len(failed)} of {total} files could not be converted:\n"
+            + "\n".join(f"{result.infile}: {result.error}" for result in failed)
+        )
+
+
+def directory_tasks(infile_path: str, outfile_path: str) -> List[Tuple[str, str]]:
+    """
+    Returns the pairs of input and output paths for the conversion of the directory infile_path
+
+    Subdirectories are processed recursively
+    """
+    tasks = []
+    with os.scandir(infile_path) as files:
+        for infile_curr in files:
+            basename, _ = os.path.splitext(infile_curr.name)
+            outfile_path_curr = (
+                outfile_path.replace("#", basename, 1)
+                if "#" in outfile_path
+                else os.path.join(outfile_path, infile_curr.name)
+            )
+            if infile_curr.is_dir():
+                tasks += directory_tasks(infile_curr.path, outfile_path_curr)
+            else:
+                tasks.append((infile_curr.path, outfile_path_curr))
+    return tasks
+
+
+def convert_file(
+    infile_path: str,
+    outfile_path: str,
+    informat_name: str,
+    outformat_name: str,
+    options: Dict[str, Any],
+) -> FileResult:
+    """
+    Converts one file of a directory, collecting the warnings, the error and the number of records
+
+    The progress is passed to the 'progress' option, if it's given
+    """
+    result = FileResult(infile_path, outfile_path)
+    callback = options.get("progress")
+
+    def count_records(progress: library_progress.Progress) -> None:
+        result.records = progress.records
+        if callback is not None:
+            callback(progress)
+
+    # the conversion can run in a background thread
+    with utils.collect_warnings() as messages:
+        try:
+            convert_wrapper(
+                infile_path,
+                outfile_path,
+                informat_name,
+                outformat_name,
+                **dict(options, progress=count_records),
+            )
+        except library_progress.ConversionCancelled:
+            raise
+        except Exception as ex:
+            result.error = str(ex)
+    result.warnings = messages
+    return result
+
+
+def convert_directory(
+    infile_path: str,
+    outfile_path: str,
+    informat_name: str,
+    outformat_name: str,
+    *,
+    jobs: int = 1,
+    progress: Optional[library_progress.ProgressCallback] = None,
+    cancel: Optional[library_progress.CancelToken] = None,
+    **options: Any,
+) -> List[FileResult]:
+    """
+    Converts all the files in the directory infile_path.
+
+    An error in one file doesn't stop the conversion of the other files.
+    Returns the results of the conversions in the order of the files.
+
+    If jobs is greater than 1, the files are converted in 'jobs' processes, starting from the largest ones.
+    jobs=0 uses one process per CPU.
+    A profile can only collect the conversions in this process.
+
+    progress is called with the progress of the whole directory.
+    The conversion raises progress.ConversionCancelled, when cancel is cancelled.
+    In several processes, both happen only between the files
+    """
+    if jobs < 0:
+        raise ValueError("The number of jobs cannot be negative")
+    jobs = jobs or os.cpu_count() or 1
+    tasks = directory_tasks(infile_path, outfile_path)
+
+    if jobs > 1 and len(tasks) > 1 and options.get("profile"):
+        raise ValueError(
+            "The conversions in several processes cannot be profiled, use one job"
+        )
+
+    monitor = library_progress.DirectoryMonitor(
+        [infile for infile, _ in tasks], progress, cancel
+    )
+
+    if jobs == 1 or len(tasks) <= 1:
+        results = []
+        for infile, outfile in tasks:
+            monitor.check()
+            result = convert_file(
+                infile,
+                outfile,
+                informat_name,
+                outformat_name,
+                dict(options, progress=monitor.file_callback(infile), cancel=cancel),
+            )
+            monitor.file_done(infile, result.records)
+            results.append(result)
+        return results
+
+    # imported here, because it slows down the start of single conversions
+    import concurrent.futures
+
+    # schedule the largest files first, so that they don't finish last
+    schedule = sorted(
+        range(len(tasks)), key=lambda i: os.path.getsize(tasks[i][0]), reverse=True
+    )
+    # the results in the order of the files, as they are completed
+    completed: List[Optional[FileResult]] = [None] * len(tasks)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {
+            executor.submit(
+                convert_file, *tasks[i], informat_name, outformat_name, options
+            ): i
+            for i in schedule
+        }
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                i = futures[future]
+                try:
+                    result = future.result()
+                except Exception as ex:
+                    # the worker process has failed
+                    result = FileResult(*tasks[i], error=str(ex))
+                completed[i] = result
+                monitor.file_done(tasks[i][0], result.records)
+                monitor.check()
+        finally:
+            # the conversion is cancelled or the callback has failed
+            for future in futures:
+                future.cancel()
+    return [result for result in completed if result is not None]
+
+
 def convert_wrapper(
     infile_path: str,
     outfile_path: str,
     informat_name: str,
     outformat_name: str,
-    **options: bool,
+    *,
+    jobs: int = 1,
+    compression: Optional[str] = None,
+    **options: Any,
 ) -> None:
     """
     This the wrapper for convertDNA. It parses the arguments and deals with the errors.
 
     Detects formats based on informat_name, outformat_name and extensions
-    Passes options to the convertDNA
+    Passes options and jobs to the convertDNA
+
+    A compressed input file is detected by its first bytes and decompressed in a background thread.
+    The output file is compressed with compression ("gzip", "bz2", "xz" or "zstd") in 'jobs' threads.
+    By default, the compression is detected from the extension of outfile_path,
+    and the extension before it is used for the format; "none" disables the compression.
+
+    If infile_path is a directory, converts all the files in it with convert_directory.
+    The warnings are reissued with the names of the files
+    and BatchConversionError is raised, if some of the files could not be converted.
     """
     # if infile_path is a directory, convert all files in it
     if os.path.isdir(infile_path):
-        with os.scandir(infile_path) as files:
-            for infile_curr in files:
-                basename, _ = os.path.splitext(infile_curr.name)
-                outfile_path_curr = (
-                    outfile_path.replace("#", basename, 1)
-                    if "#" in outfile_path
-                    else os.path.join(outfile_path, infile_curr.name)
-                )
-                convert_wrapper(
-                    infile_curr.path,
-                    outfile_path_curr,
-                    informat_name,
-                    outformat_name,
-                    **options,
-                )
+        results = convert_directory(
+            infile_path,
+            outfile_path,
+            informat_name,
+            outformat_name,
+            jobs=jobs,
+            compression=compression,
+            **options,
+        )
+        for result in results:
+            for message in result.warnings:
+                warnings.warn(f"{result.infile}: {message}")
+        failed = [result for result in results if result.error is not None]
+        if failed:
+            raise BatchConversionError(failed, len(results))
         return
 
-    # detect extensions
-    in_ext = splitext(infile_path)
-    out_ext = splitext(outfile_path)
+    # the compressed output files have an additional extension
+    if compression is None:
+        compression = library_compression.output_compression(outfile_path)
+    elif compression == "none":
+        compression = None
+
+    # detect extensions, without the extension of the compression
+    in_ext = splitext(library_compression.strip_extension(infile_path))
+    out_ext = splitext(library_compression.strip_extension(outfile_path))
 
     # parse the formats
-    informat = parse_format(informat_name, in_ext)
+    # a bare '.gz' extension means a compressed FastQ file
+    informat = parse_format(informat_name, in_ext) or parse_format(
+        informat_name, splitext(infile_path)
+    )
     outformat = parse_format(outformat_name, out_ext)
 
     # check that everything is okay
@@ -168,16 +506,23 @@ def convert_wrapper(
     if not outformat:
         raise ValueError(f"Unknown format {outformat_name or out_ext[0]}")
 
-    # open the input file
-    if in_ext[1] == ".gz":
-        # if the input file is a gz archive, unpack it
-        infile: TextIO = gzip.open(infile_path, mode="rt", errors="replace")
-    else:
-        infile = open(infile_path, errors="replace")
+    # open the input file, the compression is detected from the content
+    infile = library_compression.open_input(infile_path)
 
     # do the conversion
-    with infile, open(outfile_path, mode="w") as outfile:
-        convertDNA(infile, outfile, informat=informat, outformat=outformat, **options)
+    jobs = jobs or os.cpu_count() or 1
+    # the writers that patch their output need to read it
+    with infile, library_compression.open_output(
+        outfile_path, compression, jobs, readable=hasattr(outformat, "reads_output")
+    ) as outfile:
+        convertDNA(
+            infile,
+            outfile,
+            informat=informat,
+            outformat=outformat,
+            jobs=jobs,
+            **options,
+        )
 
 
 def launch_gui() -> None:
@@ -186,6 +531,21 @@ def launch_gui() -> None:
 
     It is used when DNAconvert is launched without arguments
     """
+    # the command-line conversions don't need tkinter
+    import tkinter as tk
+    import tkinter.filedialog
+    import tkinter.messagebox
+    import tkinter.font as tkfont
+    from tkinter import ttk
+    from .library import guiutils
+    from .library.resources import get_resource
+
+    # the warnings of the conversions in the background are collected by their threads
+    utils.install_warnings_hook()
+
+    # the interval in milliseconds between the updates of the progress
+    POLL_INTERVAL = 100
+
     # create window
     root = tk.Tk()
     root.title("DNAconvert")
@@ -337,39 +697,113 @@ def launch_gui() -> None:
         output_box.text.delete("1.0", "end")
         output_box.text.insert("1.0", output_data.getvalue())
 
-    # command for the convert button
+    def show_outcome(messages: List[str], error: Optional[BaseException]) -> None:
+        # display the warnings generated during the conversion
+        for message in messages:
+            tkinter.messagebox.showwarning("Warning", message)
+        if error is None:
+            # notify the user that the converions is finished
+            tkinter.messagebox.showinfo("Done.", "The conversion has been completed")
+        elif isinstance(error, library_progress.ConversionCancelled):
+            tkinter.messagebox.showinfo(
+                "Cancelled",
+                "The conversion has been cancelled, the output is incomplete",
+            )
+        else:
+            # show the ValueErrors and FileNotFoundErrors
+            tkinter.messagebox.showerror("Error", str(error))
 
+    # the conversion of a file running in the background
+    conversion: Optional[guiutils.ConversionThread] = None
+
+    # command for the convert button
     def gui_convert() -> None:
-        try:
+        nonlocal conversion
+        if not infile_name.get():
+            # the pasted data is small, so it's converted at once
+            error: Optional[Exception] = None
             # catch all warnings
             with warnings.catch_warnings(record=True) as warns:
-                if not infile_name.get():
+                try:
                     small_convert()
-                else:
-                    informat_arg = (
-                        "" if informat.get() == INFER_FORMAT else informat.get()
-                    )
-                    outformat_arg = (
-                        "" if outformat.get() == INFER_FORMAT else outformat.get()
-                    )
-                    convert_wrapper(
-                        infile_name.get(),
-                        outfile_name.get(),
-                        informat_arg,
-                        outformat_arg,
-                        allow_empty_sequences=allow_empty_sequences.get(),
-                        automatic_renaming=automatic_renaming.get(),
-                        preserve_spaces=preserve_spaces.get(),
-                        preserve_special=preserve_special.get(),
-                    )
-                # display the warnings generated during the conversion
-                for w in warns:
-                    tkinter.messagebox.showwarning("Warning", str(w.message))
-            # notify the user that the converions is finished
-            tkinter.messagebox.showinfo("Done.", "The conversion has been completed")
-        # show the ValueErrors and FileNotFoundErrors
-        except Exception as ex:
-            tkinter.messagebox.showerror("Error", str(ex))
+                except Exception as ex:
+                    error = ex
+            show_outcome([str(w.message) for w in warns], error)
+            return
+
+        # the options are read before the conversion starts
+        infile_arg = infile_name.get()
+        outfile_arg = outfile_name.get()
+        informat_arg = "" if informat.get() == INFER_FORMAT else informat.get()
+        outformat_arg = "" if outformat.get() == INFER_FORMAT else outformat.get()
+        allow_empty_arg = allow_empty_sequences.get()
+        automatic_renaming_arg = automatic_renaming.get()
+        preserve_spaces_arg = preserve_spaces.get()
+        preserve_special_arg = preserve_special.get()
+
+        def convert(**observers: Any) -> None:
+            # the compression is detected from the extension
+            convert_wrapper(
+                infile_arg,
+                outfile_arg,
+                informat_arg,
+                outformat_arg,
+                jobs=1,
+                compression=None,
+                allow_empty_sequences=allow_empty_arg,
+                automatic_renaming=automatic_renaming_arg,
+                preserve_spaces=preserve_spaces_arg,
+                preserve_special=preserve_special_arg,
+                **observers,
+            )
+
+        conversion = guiutils.ConversionThread(convert)
+        guiutils.set_enabled(controls, False)
+        guiutils.set_enabled([cancel_btn], True)
+        progress_bar.configure(value=0)
+        conversion.start()
+        root.after(POLL_INTERVAL, poll_conversion)
+
+    def poll_conversion() -> None:
+        """
+        Shows the progress of the conversion, until it's finished
+        """
+        nonlocal conversion
+        assert conversion is not None
+        finished = not conversion.is_alive()
+        progress = conversion.progress
+        fraction = progress.fraction if progress is not None else None
+        if fraction is None:
+            # the size of the input is unknown
+            progress_bar.configure(mode="indeterminate")
+            progress_bar.step(5)
+        else:
+            progress_bar.configure(mode="determinate", value=100 * fraction)
+        if conversion.token.cancelled and not finished:
+            status.set("Cancelling...")
+        else:
+            status.set(guiutils.progress_text(progress))
+        if not finished:
+            root.after(POLL_INTERVAL, poll_conversion)
+            return
+        guiutils.set_enabled(controls, True)
+        guiutils.set_enabled([cancel_btn], False)
+        show_outcome(conversion.warnings, conversion.error)
+        conversion = None
+
+    # command for the cancel button
+    def cancel_conversion() -> None:
+        if conversion is not None:
+            conversion.cancel()
+            guiutils.set_enabled([cancel_btn], False)
+            status.set("Cancelling...")
+
+    def close_window() -> None:
+        if conversion is not None:
+            conversion.cancel()
+        root.destroy()
+
+    root.protocol("WM_DELETE_WINDOW", close_window)
 
     def browse_indir() -> None:
         newpath: Optional[str] = tkinter.filedialog.askdirectory()
@@ -446,6 +880,36 @@ def launch_gui() -> None:
     preserve_spaces_chk.grid(column=0, row=4, sticky="w")
     preserve_special_chk.grid(column=0, row=5, sticky="w")
 
+    # progress bar, status line and cancel button of the conversion
+    progress_frame = ttk.Frame(middle_frame)
+    progress_bar = ttk.Progressbar(
+        progress_frame, orient=tk.HORIZONTAL, length=200, maximum=100
+    )
+    status = tk.StringVar()
+    status_lbl = ttk.Label(progress_frame, textvariable=status)
+    cancel_btn = ttk.Button(progress_frame, text="Cancel", command=cancel_conversion)
+    cancel_btn.state(["disabled"])
+    progress_frame.grid(column=0, row=6, sticky="we")
+    progress_bar.grid(column=0, row=0, sticky="we")
+    cancel_btn.grid(column=1, row=0)
+    status_lbl.grid(column=0, row=1, columnspan=2, sticky="w")
+
+    # the widgets that are disabled during a conversion
+    controls = [
+        infile_entry,
+        outfile_entry,
+        informatBox,
+        outformatBox,
+        infile_browse,
+        indir_browse,
+        outfile_browse,
+        convert_btn,
+        allow_es_chk,
+        automatic_renaming_chk,
+        preserve_spaces_chk,
+        preserve_special_chk,
+    ]
+
     # place a separator above boxes
     ttk.Separator(root).grid(column=0, row=3, sticky="nsew", ipady=10)
 
@@ -456,6 +920,46 @@ def launch_gui() -> None:
     root.mainloop()
 
 
+def parse_names(argument: str) -> List[str]:
+    """Parses a comma-separated list of names of records"""
+    return [name.strip() for name in argument.split(",") if name.strip()]
+
+
+def parse_range(argument: str) -> Tuple[int, int]:
+    """Parses a range of records, given as START:STOP"""
+    start, sep, stop = argument.partition(":")
+    try:
+        if not sep:
+            raise ValueError
+        return int(start or 0), int(stop)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"invalid range of records: {argument} (expected START:STOP)"
+        )
+
+
+def progress_printer(interval: float = 0.5) -> library_progress.ProgressCallback:
+    """Returns a progress callback that prints the progress to stderr at most every interval seconds"""
+    last_time = -interval
+
+    def print_progress(progress: library_progress.Progress) -> None:
+        nonlocal last_time
+        finished = progress.fraction == 1.0
+        if progress.elapsed - last_time < interval and not finished:
+            return
+        last_time = progress.elapsed
+        parts = [f"{progress.records} records"]
+        if progress.files_total > 1:
+            parts.append(f"{progress.files_done}/{progress.files_total} files")
+        if progress.fraction is not None:
+            parts.append(f"{100 * progress.fraction:.1f}%")
+        if progress.remaining is not None:
+            parts.append(f"{progress.remaining:.0f} s left")
+        print("\r" + ", ".join(parts).ljust(60), end="", file=sys.stderr, flush=True)
+
+    return print_progress
+
+
 def main() -> None:
     # configure the argument parser
     parser = argparse.ArgumentParser(
@@ -477,6 +981,54 @@ def main() -> None:
     parser.add_argument(
         "--preserve_spaces", action="store_true", help="preserve spaces in sequences"
     )
+    parser.add_argument(
+        "--low_memory",
+        action="store_true",
+        help="don't keep all the records in memory when writing Phylip, Hapview and NEXUS files",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of processes used for the conversion (0: one per CPU). Converts several files of a directory in parallel or parses a large FASTA or GenBank file in parallel",
+    )
+    parser.add_argument(
+        "--select",
+        type=parse_names,
+        metavar="NAMES",
+        help="comma-separated names of records to convert from a FASTA or GenBank file. The name is the identifier line up to the first whitespace, or the accession or the definition of a GenBank record",
+    )
+    parser.add_argument(
+        "--select_file",
+        metavar="FILE",
+        help="file with the names of records to convert from a FASTA or GenBank file, one per line",
+    )
+    parser.add_argument(
+        "--record_range",
+        type=parse_range,
+        metavar="START:STOP",
+        help="positions of records to convert from a FASTA or GenBank file, as START:STOP (counting from 0, STOP is excluded)",
+    )
+    parser.add_argument(
+        "--compress",
+        choices=["none", *library_compression.CODECS],
+        help="compression of the output file, gzip files are written in the BGZF format in several threads. Detected from the extension by default: .gz, .bgz, .bz2, .xz, .zst",
+    )
+    parser.add_argument(
+        "--progress",
+        action="store_true",
+        help="print the number of converted records and the estimated remaining time",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="print the time spent in the stages of the conversion and in the slowest functions",
+    )
+    parser.add_argument(
+        "--profile_output",
+        metavar="FILE",
+        help="write the profile of the conversion to FILE, which can be read with pstats or snakeviz. Implies --profile",
+    )
     parser.add_argument("--informat", default="", help="format of the input file")
     parser.add_argument("--outformat", default="", help="format of the output file")
     parser.add_argument("infile", default="", nargs="?", help="the input file")
@@ -492,20 +1044,44 @@ def main() -> None:
         # launch in the command-line mode
         try:
             # catch the warnging
+            select = args.select
+            if args.select_file:
+                with open(args.select_file) as select_file:
+                    select = (select or []) + [
+                        line.strip() for line in select_file if line.strip()
+                    ]
+            profile = (
+                profiling.Profile() if args.profile or args.profile_output else None
+            )
             with warnings.catch_warnings(record=True) as warns:
-                convert_wrapper(
-                    args.infile,
-                    args.outfile,
-                    args.informat,
-                    args.outformat,
-                    allow_empty_sequences=args.allow_empty_sequences,
-                    automatic_renaming=args.automatic_renaming,
-                    preserve_spaces=args.preserve_spaces,
-                )
-
-                # display the warnings generated during the conversion
-                for w in warns:
-                    print(w.message)
+                try:
+                    convert_wrapper(
+                        args.infile,
+                        args.outfile,
+                        args.informat,
+                        args.outformat,
+                        jobs=args.jobs,
+                        compression=args.compress,
+                        allow_empty_sequences=args.allow_empty_sequences,
+                        automatic_renaming=args.automatic_renaming,
+                        preserve_spaces=args.preserve_spaces,
+                        low_memory=args.low_memory,
+                        select=select,
+                        record_range=args.record_range,
+                        profile=profile,
+                        progress=progress_printer() if args.progress else None,
+                    )
+                finally:
+                    if args.progress:
+                        print(file=sys.stderr)
+                    # display the warnings generated during the conversion
+                    for w in warns:
+                        print(w.message)
+            # the profile is reported after the conversion has succeeded
+            if profile is not None:
+                print(profile.report(), file=sys.stderr)
+                if args.profile_output:
+                    profile.dump(args.profile_output)
         # show the ValueErrors and FileNotFoundErrors
         except ValueError as ex:
             sys.exit(ex)
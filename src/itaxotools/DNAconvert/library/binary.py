@@ -0,0 +1,191 @@
+import codecs
+import io
+import mmap
+import os
+import stat
+from typing import Optional, TextIO, BinaryIO, Iterator, Iterable, List, Tuple
+
+# the size of the blocks read from a binary file
+BLOCK_SIZE = 1 << 20
+
+# the encodings in which every ASCII character is encoded by the same byte
+ASCII_COMPATIBLE = {"ascii", "utf-8", "iso8859-1", "cp1252"}
+
+# the characters removed by str.rstrip from ASCII strings
+ASCII_WHITESPACE = bytes(c for c in range(128) if chr(c).isspace())
+
+# the whitespace characters, that are unusual in the text files
+RARE_WHITESPACE = [bytes([c]) for c in ASCII_WHITESPACE if c not in b" \n"]
+
+
+def binary_source(file: TextIO) -> Optional[BinaryIO]:
+    """
+    Returns the binary file under 'file', positioned at the beginning.
+
+    Returns None, if the bytes of the file can't be decoded separately,
+    i.e. if the file is not a seekable text file at its beginning in an ASCII compatible encoding
+    """
+    if not isinstance(file, io.TextIOWrapper):
+        return None
+    if codecs.lookup(file.encoding).name not in ASCII_COMPATIBLE:
+        return None
+    try:
+        if file.tell() != 0:
+            return None
+        # discard the text that was already decoded
+        file.seek(0)
+    except (OSError, ValueError):
+        return None
+    return file.buffer
+
+
+def map_file(file: TextIO) -> Optional[mmap.mmap]:
+    """
+    Returns a read-only memory map of 'file'
+
+    Returns None, if it's not possible for the file or if binary_source returns None for it
+    """
+    raw = getattr(binary_source(file), "raw", None)
+    if not isinstance(raw, io.FileIO):
+        return None
+    try:
+        status = os.fstat(raw.fileno())
+        # empty files can't be mapped
+        if not stat.S_ISREG(status.st_mode) or status.st_size == 0:
+            return None
+        return mmap.mmap(raw.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+
+def normalize_newlines(data: bytes) -> bytes:
+    """
+    Replaces '\\r\\n' and '\\r' with '\\n', like the text files do
+    """
+    if b"\r" in data:
+        return data.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+    return data
+
+
+def line_blocks(source: BinaryIO, marker: bytes = b"") -> Iterator[bytes]:
+    """
+    Yields the parts of source consisting of whole lines, with '\\n' as the line break
+
+    Each part, except the last one, ends with a line break and the next part begins with marker
+    """
+    separator = b"\n" + marker
+    data = bytearray()
+    while True:
+        block = source.read(BLOCK_SIZE)
+        if not block:
+            yield bytes(data)
+            return
+        # '\r' at the end could be the beginning of '\r\n'
+        while block.endswith(b"\r"):
+            extra = source.read(1)
+            if not extra:
+                break
+            block += extra
+        # the separator can be split between the blocks
+        search_start = max(len(data) - len(separator) + 1, 0)
+        data += normalize_newlines(block)
+        end = data.rfind(separator, search_start)
+        if end >= 0:
+            yield bytes(data[: end + 1])
+            del data[: end + 1]
+
+
+def mapped_blocks(
+    buffer: mmap.mmap,
+    start: int = 0,
+    marker: bytes = b"",
+    source: Optional[BinaryIO] = None,
+) -> Iterator[bytes]:
+    """
+    Yields the parts of the buffer after 'start' consisting of whole lines, with '\\n' as the line break
+
+    Each part, except the last one, ends with a line break and the next part begins with marker.
+    Only the parts are copied from the buffer.
+    The position of the mapped file source is moved after each part, so that the progress can be observed
+    """
+    separator = b"\n" + marker
+    size = len(buffer)
+    while start < size:
+        end = buffer.find(separator, start + BLOCK_SIZE)
+        end = size if end < 0 else end + 1
+        yield normalize_newlines(buffer[start:end])
+        start = end
+        if source is not None:
+            source.seek(end)
+
+
+def first_line(buffer: mmap.mmap) -> Tuple[bytes, int]:
+    """
+    Returns the first line of the buffer without the line break and the position after it
+    """
+    ends = [end for end in (buffer.find(b"\n"), buffer.find(b"\r")) if end >= 0]
+    if not ends:
+        return buffer[:], len(buffer)
+    end = min(ends)
+    if buffer[end : end + 2] == b"\r\n":
+        return buffer[:end], end + 2
+    return buffer[:end], end + 1
+
+
+def fasta_records(data: bytes) -> List[bytes]:
+    """
+    Splits data consisting of whole FASTA records into the records without the initial '>'
+
+    The text before the first record is skipped
+    """
+    # searching for a single character is much faster than for the line break before it
+    pieces = data.split(b">")
+    records: List[bytes] = []
+    for i in range(1, len(pieces)):
+        # the character before the '>' is the last one of the previous piece
+        previous = pieces[i - 1]
+        if previous.endswith(b"\n") or (i == 1 and not previous):
+            records.append(pieces[i])
+        elif records:
+            # '>' inside a line
+            records[-1] += b">" + pieces[i]
+    return records
+
+
+def fasta_pairs(data: bytes, encoding: str, errors: str) -> List[Tuple[str, str]]:
+    """
+    Returns the identifier lines and the concatenated sequence lines
+    of the whole FASTA records in data, with '\\n' as the line break.
+
+    The text before the first record is skipped.
+    ASCII sequences without whitespace are decoded at once,
+    otherwise each line is decoded and stripped separately
+    """
+    # rare whitespace could be at the end of lines
+    plain = not any(char in data for char in RARE_WHITESPACE)
+    pairs = []
+    for record in fasta_records(data):
+        ident, _, lines = record.partition(b"\n")
+        if plain and lines.isascii() and b" " not in lines:
+            sequence = lines.replace(b"\n", b"").decode("ascii")
+        else:
+            sequence = "".join(
+                [line.decode(encoding, errors).rstrip() for line in lines.split(b"\n")]
+            )
+        pairs.append((">" + ident.decode(encoding, errors).rstrip(), sequence))
+    return pairs
+
+
+def split_fasta(
+    blocks: Iterable[bytes], encoding: str, errors: str
+) -> Iterator[List[Tuple[str, str]]]:
+    """
+    Yields the identifier lines and the concatenated sequence lines
+    of the records of a FASTA file in lists
+
+    blocks are the parts of the file returned by line_blocks or mapped_blocks with the marker '>'
+    """
+    for data in blocks:
+        pairs = fasta_pairs(data, encoding, errors)
+        if pairs:
+            yield pairs
@@ -0,0 +1,360 @@
+import collections
+import io
+import queue
+import struct
+import threading
+import zlib
+from typing import (
+    TYPE_CHECKING,
+    BinaryIO,
+    Any,
+    Callable,
+    Deque,
+    Optional,
+    TextIO,
+    Tuple,
+    Union,
+)
+
+if TYPE_CHECKING:
+    import concurrent.futures
+
+# the extensions of the compressed files
+EXTENSIONS = {
+    ".gz": "gzip",
+    ".bgz": "gzip",
+    ".bz2": "bz2",
+    ".xz": "xz",
+    ".zst": "zstd",
+}
+
+# the supported compressions of the output files
+CODECS = ("gzip", "bz2", "xz", "zstd")
+
+# the first bytes of the compressed files
+MAGIC_BYTES = {
+    b"\x1f\x8b": "gzip",
+    b"BZh": "bz2",
+    b"\xfd7zXZ\x00": "xz",
+    b"\x28\xb5\x2f\xfd": "zstd",
+}
+
+# the size of the chunks read ahead from a compressed input file
+READ_SIZE = 1 << 20
+
+# the number of chunks read ahead
+READ_AHEAD = 4
+
+# the maximal size of the data in a BGZF block, as in samtools
+BGZF_BLOCK_SIZE = 0xFF00
+
+# the header of a BGZF block: a gzip header with the size of the block in the extra field
+BGZF_HEADER = bytes.fromhex("1f8b08040000000000ff060042430200")
+
+# the empty block at the end of BGZF files
+BGZF_EOF = bytes.fromhex("1f8b08040000000000ff0600424302001b0003000000000000000000")
+
+# the size of the data compressed as one xz or zstd stream
+STREAM_SIZE = 1 << 23
+
+
+def bgzf_block(data: bytes, level: int = 6) -> bytes:
+    """Returns data compressed as a BGZF block, i.e. a gzip member with the size of the block"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    deflated = compressor.compress(data) + compressor.flush()
+    # the size field contains the size of the whole block minus 1
+    return b"".join(
+        [
+            BGZF_HEADER,
+            struct.pack("<H", len(BGZF_HEADER) + 2 + len(deflated) + 8 - 1),
+            deflated,
+            struct.pack("<II", zlib.crc32(data), len(data)),
+        ]
+    )
+
+
+def bz2_compress() -> Callable[[bytes], bytes]:
+    """Returns the function that compresses data as a bz2 stream"""
+    try:
+        import bz2
+    except ImportError:
+        raise ValueError("The bz2 compression is not supported by this Python")
+    return bz2.compress
+
+
+def xz_compress() -> Callable[[bytes], bytes]:
+    """Returns the function that compresses data as a xz stream"""
+    try:
+        import lzma
+    except ImportError:
+        raise ValueError("The xz compression is not supported by this Python")
+    return lzma.compress
+
+
+def zstd_compress() -> Callable[[bytes], bytes]:
+    """Returns the function that compresses data as a zstd frame"""
+    try:
+        import zstandard
+    except ImportError:
+        raise ValueError(
+            "The zstd compression requires the 'zstandard' module. Install it with 'pip install zstandard'"
+        )
+
+    def compress(data: bytes) -> bytes:
+        # the compressors can't be shared between threads
+        return zstandard.ZstdCompressor().compress(data)
+
+    return compress
+
+
+def codec_parameters(codec: str) -> Tuple[Callable[[bytes], bytes], int, bytes]:
+    """
+    Returns the compression function, the size of chunks and the end of the file for the codec
+    """
+    if codec == "gzip":
+        return bgzf_block, BGZF_BLOCK_SIZE, BGZF_EOF
+    elif codec == "bz2":
+        return bz2_compress(), STREAM_SIZE, b""
+    elif codec == "xz":
+        return xz_compress(), STREAM_SIZE, b""
+    elif codec == "zstd":
+        return zstd_compress(), STREAM_SIZE, b""
+    else:
+        raise ValueError(
+            f"Unknown compression {codec}. Possible compressions are: {', '.join(CODECS)}"
+        )
+
+
+class ChunkedWriter(io.BufferedIOBase):
+    """Binary file that compresses the written data in independent chunks in a thread pool
+
+    The compressed chunks are written to raw in order, followed by the end.
+    The gzip, bz2, xz and zstd decompressors read the concatenated chunks as one file
+    """
+
+    def __init__(
+        self,
+        raw: BinaryIO,
+        compress: Callable[[bytes], bytes],
+        chunk_size: int,
+        end: bytes = b"",
+        threads: int = 1,
+    ):
+        # imported here, because it slows down the start of uncompressed conversions
+        import concurrent.futures
+
+        super().__init__()
+        self._raw = raw
+        self._compress = compress
+        self._chunk_size = chunk_size
+        self._end = end
+        self._threads = threads
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=threads)
+        # the compressed chunks, that are not written yet
+        self._pending: Deque["concurrent.futures.Future[bytes]"] = collections.deque()
+        self._data = bytearray()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: bytes) -> int:  # type: ignore[override]
+        if self.closed:
+            raise ValueError("write to closed file")
+        self._data += data
+        if len(self._data) >= self._chunk_size:
+            view = memoryview(self._data)
+            end = len(self._data) - len(self._data) % self._chunk_size
+            for start in range(0, end, self._chunk_size):
+                self._submit(bytes(view[start : start + self._chunk_size]))
+            view.release()
+            del self._data[:end]
+        return len(data)
+
+    def _submit(self, chunk: bytes) -> None:
+        self._pending.append(self._executor.submit(self._compress, chunk))
+        # at most 2 chunks per thread wait in memory
+        while len(self._pending) > 2 * self._threads:
+            self._raw.write(self._pending.popleft().result())
+
+    def flush(self) -> None:
+        """Compresses and writes all the data written so far"""
+        # io.BufferedIOBase.close flushes after self.close has closed raw
+        if self.closed or self._raw.closed:
+            return
+        if self._data:
+            self._submit(bytes(self._data))
+            self._data.clear()
+        while self._pending:
+            self._raw.write(self._pending.popleft().result())
+        self._raw.flush()
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        try:
+            self.flush()
+            self._raw.write(self._end)
+        finally:
+            for future in self._pending:
+                future.cancel()
+            self._executor.shutdown()
+            self._raw.close()
+            super().close()
+
+
+def output_compression(path: str) -> Optional[str]:
+    """Returns the compression implied by the extension of path"""
+    for extension, codec in EXTENSIONS.items():
+        if path.lower().endswith(extension):
+            return codec
+    return None
+
+
+def strip_extension(path: str) -> str:
+    """Returns path without the extension of a compressed file"""
+    if output_compression(path) is None:
+        return path
+    stem, _, _ = path.rpartition(".")
+    return stem
+
+
+def open_output(
+    path: str, codec: Optional[str], threads: int = 1, readable: bool = False
+) -> TextIO:
+    """
+    Opens the output file at path for writing text, compressed with the codec
+
+    The file is not compressed, if the codec is None.
+    Then it's also opened for reading, if readable is set.
+    gzip files are written in the BGZF format, that can be read by any gzip reader.
+    Each thread compresses a chunk of the file at once
+    """
+    if codec is None:
+        return open(path, mode="w+" if readable else "w")
+    compress, chunk_size, end = codec_parameters(codec)
+    writer = ChunkedWriter(open(path, "wb"), compress, chunk_size, end, threads)
+    return io.TextIOWrapper(writer)
+
+
+def input_compression(path: str) -> Optional[str]:
+    """Returns the compression of the file at path, detected from its first bytes"""
+    with open(path, "rb") as file:
+        start = file.read(max(map(len, MAGIC_BYTES)))
+    for magic, codec in MAGIC_BYTES.items():
+        if start.startswith(magic):
+            return codec
+    return None
+
+
+def decompressed(file: BinaryIO, codec: str) -> BinaryIO:
+    """Returns the binary file with the decompressed content of file"""
+    if codec == "gzip":
+        import gzip
+
+        return gzip.GzipFile(fileobj=file)  # type: ignore[return-value]
+    elif codec == "bz2":
+        import bz2
+
+        return bz2.BZ2File(file)  # type: ignore[return-value]
+    elif codec == "xz":
+        import lzma
+
+        return lzma.LZMAFile(file)  # type: ignore[return-value]
+    try:
+        import zstandard
+    except ImportError:
+        raise ValueError(
+            "The input file is compressed with zstd, which requires the 'zstandard' module. Install it with 'pip install zstandard'"
+        )
+    return zstandard.ZstdDecompressor().stream_reader(
+        file, read_across_frames=True, closefd=True
+    )
+
+
+class ReadAheadReader(io.RawIOBase):
+    """Binary file that reads file in a background thread ahead of the consumer
+
+    The decompressors release the GIL, so the decompression overlaps with the parsing.
+    source is the compressed file under file, its position shows the progress of the reading
+    """
+
+    def __init__(self, file: BinaryIO, source: Optional[BinaryIO] = None):
+        super().__init__()
+        self._file = file
+        self.source = source
+        # the chunks of data, an empty chunk at the end or the exception of the reading
+        self._chunks: "queue.Queue[Union[bytes, BaseException]]" = queue.Queue(
+            maxsize=READ_AHEAD
+        )
+        self._stop = threading.Event()
+        self._chunk = memoryview(b"")
+        self._eof = False
+        self._thread = threading.Thread(target=self._read_ahead, daemon=True)
+        self._thread.start()
+
+    def _read_ahead(self) -> None:
+        try:
+            while True:
+                chunk = self._file.read(READ_SIZE)
+                if not self._put(chunk) or not chunk:
+                    return
+        except BaseException as ex:
+            self._put(ex)
+
+    def _put(self, item: Union[bytes, BaseException]) -> bool:
+        """Puts the item in the queue, returns False if the reader is closed"""
+        while not self._stop.is_set():
+            try:
+                self._chunks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        if not self._chunk:
+            if self._eof:
+                return 0
+            item = self._chunks.get()
+            if isinstance(item, BaseException):
+                self._eof = True
+                raise item
+            if not item:
+                self._eof = True
+                return 0
+            self._chunk = memoryview(item)
+        size = min(len(buffer), len(self._chunk))
+        buffer[:size] = self._chunk[:size]
+        self._chunk = self._chunk[size:]
+        return size
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._file.close()
+        # the decompressors don't close the file objects given to them
+        if self.source is not None:
+            self.source.close()
+        super().close()
+
+
+def open_input(path: str) -> TextIO:
+    """
+    Opens the input file at path for reading text
+
+    A compressed file is decompressed in a background thread.
+    The decoding errors are replaced
+    """
+    codec = input_compression(path)
+    if codec is None:
+        return open(path, errors="replace")
+    source = open(path, "rb")
+    file = decompressed(source, codec)
+    return io.TextIOWrapper(
+        io.BufferedReader(ReadAheadReader(file, source), READ_SIZE), errors="replace"
+    )
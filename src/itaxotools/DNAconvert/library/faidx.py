@@ -0,0 +1,232 @@
+import mmap
+import os
+from typing import NamedTuple, Optional, List, Dict, Iterable, Iterator, Tuple
+
+from . import binary
+
+# the extension of the index files, added to the name of the FASTA file
+INDEX_EXTENSION = ".fai"
+
+
+class IndexEntry(NamedTuple):
+    """A line of a FASTA index, in the same order as the columns of samtools .fai files"""
+
+    # the identifier line up to the first whitespace, without the initial '>'
+    name: str
+    # the number of bases in the sequence
+    length: int
+    # the position of the first base in the file
+    offset: int
+    # the number of bases in each line, except the last one
+    line_bases: int
+    # the number of bytes in each line, including the line break
+    line_width: int
+
+
+class IrregularFastaError(ValueError):
+    """Raised when the sequence lines of a record have different lengths"""
+
+
+def line_break(buffer: mmap.mmap, end: int) -> int:
+    """Returns the length of the line break at 'end': 2 for '\\r\\n', 1 otherwise"""
+    return 2 if buffer[end - 1 : end] == b"\r" else 1
+
+
+def count_bytes(buffer: mmap.mmap, char: bytes, start: int, end: int) -> int:
+    """Returns the number of occurrences of char between start and end"""
+    # mmap has no count method, the buffer is copied in blocks
+    return sum(
+        buffer[i : min(i + binary.BLOCK_SIZE, end)].count(char)
+        for i in range(start, end, binary.BLOCK_SIZE)
+    )
+
+
+def index_record(buffer: mmap.mmap, name: str, offset: int, end: int) -> IndexEntry:
+    """
+    Returns the index entry of the record whose sequence lines are between offset and end
+
+    Raises IrregularFastaError, if the lines can't be described by one line width
+    """
+    # the line breaks at the end of the record don't belong to the sequence
+    while end > offset and buffer[end - 1] in b"\r\n":
+        end -= 1
+    size = end - offset
+    if size == 0:
+        return IndexEntry(name, 0, offset, 0, 0)
+    first_end = buffer.find(b"\n", offset, end)
+    if first_end < 0:
+        # the sequence is on one line
+        first_end = end + 1 if buffer[end : end + 1] == b"\r" else end
+        if buffer.find(b"\r", offset, end) >= 0:
+            raise IrregularFastaError(f"'{name}' contains '\\r' inside a line")
+        return IndexEntry(name, size, offset, size, first_end - offset + 1)
+    breaks = line_break(buffer, first_end)
+    line_bases = first_end - offset + 1 - breaks
+    line_width = line_bases + breaks
+    full_lines, last_bases = divmod(size, line_width)
+    regular = 0 < last_bases <= line_bases
+    if regular:
+        # the line breaks are at multiples of the line width and nowhere else
+        lines_end = offset + full_lines * line_width
+        regular = (
+            buffer[offset + line_width - 1 : lines_end : line_width]
+            == b"\n" * full_lines
+            and count_bytes(buffer, b"\n", offset, end) == full_lines
+        )
+        if regular and breaks == 2:
+            regular = (
+                buffer[offset + line_width - 2 : lines_end : line_width]
+                == b"\r" * full_lines
+                and count_bytes(buffer, b"\r", offset, end) == full_lines
+            )
+        elif regular:
+            regular = buffer.find(b"\r", offset, end) < 0
+    if not regular:
+        raise IrregularFastaError(f"The lines of '{name}' have different lengths")
+    return IndexEntry(
+        name, full_lines * line_bases + last_bases, offset, line_bases, line_width
+    )
+
+
+def build_index(buffer: mmap.mmap, encoding: str) -> List[IndexEntry]:
+    """
+    Returns the index of the FASTA file in the buffer
+
+    Raises IrregularFastaError, if a record can't be indexed
+    """
+    entries: List[IndexEntry] = []
+    size = len(buffer)
+    if buffer[:1] == b">":
+        start = 0
+    else:
+        start = buffer.find(b"\n>") + 1
+        if start == 0:
+            # there are no records
+            return entries
+    while True:
+        header_end = buffer.find(b"\n", start)
+        if header_end < 0:
+            header_end = size
+        # samtools uses the identifier line up to the first whitespace
+        words = buffer[start + 1 : header_end].split(maxsplit=1)
+        name = words[0].decode(encoding, "replace") if words else ""
+        offset = min(header_end + 1, size)
+        next_start = buffer.find(b"\n>", header_end)
+        end = size if next_start < 0 else next_start + 1
+        entries.append(index_record(buffer, name, offset, end))
+        if next_start < 0:
+            return entries
+        start = end
+
+
+def write_index(path: str, entries: Iterable[IndexEntry], encoding: str) -> None:
+    """Writes the entries to the index file at 'path'"""
+    with open(path, "w", encoding=encoding, errors="replace", newline="\n") as file:
+        for entry in entries:
+            print(*entry, sep="\t", file=file)
+
+
+def read_index(path: str, encoding: str) -> List[IndexEntry]:
+    """Reads the index file at 'path'"""
+    with open(path, encoding=encoding, errors="replace") as file:
+        entries = []
+        for line in file:
+            if not line.strip():
+                continue
+            name, *numbers = line.rstrip("\r\n").split("\t")
+            length, offset, line_bases, line_width = map(int, numbers[:4])
+            entries.append(IndexEntry(name, length, offset, line_bases, line_width))
+        return entries
+
+
+def index_matches(buffer: mmap.mmap, entries: List[IndexEntry]) -> bool:
+    """
+    Checks that the entries can describe the FASTA file in the buffer
+
+    The last record should end at the end of the file, since the .fai files don't store its size,
+    and each record should begin with an identifier line
+    """
+    if not entries:
+        return False
+    size = len(buffer)
+    for entry in entries:
+        start, end = record_span(buffer, entry)
+        if end > size or buffer[start : start + 1] != b">":
+            return False
+    # only the line breaks can follow the last record
+    return size - end <= binary.BLOCK_SIZE and not buffer[end:].strip(b"\r\n")
+
+
+def load_index(path: str, buffer: mmap.mmap, encoding: str) -> List[IndexEntry]:
+    """
+    Returns the index of the FASTA file at 'path', mapped in the buffer
+
+    The index file next to it is used, if it's not older than the FASTA file and matches its size.
+    Otherwise, the index is built and written there, if it's possible.
+    Raises IrregularFastaError, if the index can't be built
+    """
+    index_path = path + INDEX_EXTENSION
+    try:
+        if os.path.getmtime(index_path) >= os.path.getmtime(path):
+            entries = read_index(index_path, encoding)
+            if index_matches(buffer, entries):
+                return entries
+    except (OSError, ValueError):
+        # there is no usable index
+        pass
+    entries = build_index(buffer, encoding)
+    try:
+        write_index(index_path, entries, encoding)
+    except OSError:
+        # the directory could be read-only
+        pass
+    return entries
+
+
+def record_span(buffer: mmap.mmap, entry: IndexEntry) -> Tuple[int, int]:
+    """Returns the span of bytes of the record, from the '>' to the last base"""
+    # the identifier line is the line before the offset
+    start = buffer.rfind(b"\n", 0, max(entry.offset - 1, 0)) + 1
+    if entry.length == 0:
+        return start, entry.offset
+    full_lines, last_bases = divmod(entry.length - 1, entry.line_bases)
+    return start, entry.offset + full_lines * entry.line_width + last_bases + 1
+
+
+def fetch_records(
+    buffer: mmap.mmap, entries: Iterable[IndexEntry], encoding: str, errors: str
+) -> Iterator[Tuple[str, str]]:
+    """
+    Yields the identifier lines and the sequences of the records with given entries
+
+    The records are parsed the same way as the FASTA files that are read sequentially
+    """
+    for entry in entries:
+        start, end = record_span(buffer, entry)
+        data = binary.normalize_newlines(buffer[start:end])
+        yield from binary.fasta_pairs(data, encoding, errors)
+
+
+def select_entries(
+    entries: List[IndexEntry],
+    select: Optional[Iterable[str]],
+    record_range: Optional[Tuple[int, int]],
+) -> Tuple[List[IndexEntry], List[str]]:
+    """
+    Returns the entries of the selected records and the names that are not in the index
+
+    select is a list of names, the entries are returned in its order.
+    record_range is a pair (start, stop) of indices in the file, as in a slice.
+    If both are given, only the names in the range are looked up
+    """
+    if record_range is not None:
+        entries = entries[slice(*record_range)]
+    if select is None:
+        return entries, []
+    by_name: Dict[str, IndexEntry] = {}
+    for entry in entries:
+        # the first record with the name is used
+        by_name.setdefault(entry.name, entry)
+    selected = [by_name[name] for name in select if name in by_name]
+    missing = [name for name in select if name not in by_name]
+    return selected, missing
@@ -1,8 +1,26 @@
+import functools
+import io
+import itertools
 import re
 import warnings
 from .record import *
 from .utils import *
-from typing import TextIO, Iterator, List, Generator, Tuple, Set
+from . import parallel
+from . import binary
+from . import faidx
+from typing import (
+    TextIO,
+    Iterator,
+    List,
+    Generator,
+    Tuple,
+    Set,
+    Optional,
+    Iterable,
+    Any,
+    Dict,
+    Union,
+)
 
 
 def split_file(file: TextIO) -> Iterator[List[str]]:
@@ -13,6 +31,9 @@ def split_file(file: TextIO) -> Iterator[List[str]]:
     line = " "
     while line[0] != ">":
         line = file.readline()
+        if not line:
+            # there are no records
+            return
 
     # chunk contains the already read lines of the current record
     chunk = []
@@ -36,47 +57,280 @@ def split_file(file: TextIO) -> Iterator[List[str]]:
     yield chunk
 
 
+def read_span(
+    path: str,
+    encoding: str,
+    make_record: Callable[[str, str], Record],
+    span: Tuple[int, int],
+) -> List[Record]:
+    """
+    Returns the records in the span of bytes of the FASTA file at 'path'
+    """
+    start, end = span
+    with open(path, "rb") as file:
+        file.seek(start)
+        data = file.read(end - start)
+    # decode the same way as the file opened for the conversion
+    data = binary.normalize_newlines(data)
+    return [
+        make_record(ident, sequence)
+        for ident, sequence in binary.fasta_pairs(data, encoding, "replace")
+    ]
+
+
+def fasta_batches(
+    file: TextIO, make_record: Callable[[str, str], Record], jobs: int = 1
+) -> Iterator[List[Record]]:
+    """
+    Yields the records of a FASTA file in batches
+
+    make_record creates a record from the identifier line and the sequence.
+
+    If jobs > 1 and the file is an uncompressed regular file,
+    the file is split at the beginnings of records and the parts are parsed by 'jobs' processes.
+    Otherwise, the bytes of the file are parsed directly, from a memory map for regular files,
+    unless it's not possible for this file
+    """
+    path = parallel.regular_file_path(file) if jobs > 1 else None
+    if path is None:
+        buffer = binary.map_file(file)
+        if buffer is not None:
+            with buffer:
+                blocks = binary.mapped_blocks(buffer, 0, b">", file.buffer.raw)
+                for pairs in binary.split_fasta(blocks, file.encoding, file.errors):
+                    yield [make_record(ident, sequence) for ident, sequence in pairs]
+            # the whole file is read
+            file.seek(0, io.SEEK_END)
+            return
+        source = binary.binary_source(file)
+        if source is None:
+            yield from batched(
+                make_record(chunk[0], "".join(chunk[1:])) for chunk in split_file(file)
+            )
+            return
+        blocks = binary.line_blocks(source, b">")
+        for pairs in binary.split_fasta(blocks, file.encoding, file.errors):
+            yield [make_record(ident, sequence) for ident, sequence in pairs]
+        return
+    spans = parallel.split_offsets(path, b">", parallel.CHUNK_SIZE)
+    batches = parallel.ordered_map(
+        functools.partial(read_span, path, file.encoding, make_record), spans, jobs
+    )
+    for batch, (_, end) in zip(batches, spans):
+        yield batch
+        # the position of the file shows the progress
+        file.buffer.raw.seek(end)
+
+
+def record_name(ident: str) -> str:
+    """Returns the name of a record in the index: the identifier line up to the first whitespace"""
+    words = ident[1:].split(maxsplit=1)
+    return words[0] if words else ""
+
+
+def scan_selection(
+    pairs: Iterator[Tuple[str, str]],
+    select: Optional[List[str]],
+    record_range: Optional[Tuple[int, int]],
+) -> Iterator[Tuple[str, str]]:
+    """
+    Yields the selected identifier lines and sequences from all the pairs of a file
+
+    The selection is the same as with the index
+    """
+    if record_range is not None:
+        pairs = itertools.islice(pairs, *record_range)
+    if select is None:
+        yield from pairs
+        return
+    wanted = set(select)
+    found: Dict[str, Tuple[str, str]] = {}
+    for ident, sequence in pairs:
+        name = record_name(ident)
+        if name in wanted and name not in found:
+            found[name] = (ident, sequence)
+            if len(found) == len(wanted):
+                break
+    report_missing([name for name in select if name not in found])
+    yield from (found[name] for name in select if name in found)
+
+
+def report_missing(names: List[str]) -> None:
+    """Warns about the selected names, that are not in the file"""
+    if names:
+        warnings.warn(
+            f"{len(names)} selected records are not in the file: {', '.join(names)}"
+        )
+
+
+def selected_batches(
+    file: TextIO,
+    make_record: Callable[[str, str], Record],
+    select: Optional[List[str]],
+    record_range: Optional[Tuple[int, int]],
+) -> Iterator[List[Record]]:
+    """
+    Yields the selected records of a FASTA file in batches
+
+    select is a list of names of records (the identifier lines up to the first whitespace),
+    the records are yielded in its order.
+    record_range is a pair (start, stop) of positions of records in the file, as in a slice.
+
+    Regular files are read through the samtools compatible index in the file with the extension '.fai',
+    which is created, if it's missing or outdated.
+    Otherwise, or if the file can't be indexed, the whole file is read
+    """
+    if record_range is not None and min(record_range) < 0:
+        raise ValueError("The range of records cannot contain negative positions")
+    path = parallel.regular_file_path(file)
+    buffer = binary.map_file(file) if path is not None else None
+    if path is not None and buffer is not None:
+        with buffer:
+            try:
+                entries = faidx.load_index(path, buffer, file.encoding)
+            except faidx.IrregularFastaError as ex:
+                warnings.warn(
+                    f"The file can't be indexed, so it's read completely. {ex}"
+                )
+            else:
+                entries, missing = faidx.select_entries(entries, select, record_range)
+                report_missing(missing)
+                yield from batched(
+                    make_record(ident, sequence)
+                    for ident, sequence in faidx.fetch_records(
+                        buffer, entries, file.encoding, file.errors
+                    )
+                )
+                file.seek(0, io.SEEK_END)
+                return
+    pairs = (
+        pair for batch in fasta_batches(file, lambda *pair: pair) for pair in batch
+    )
+    yield from batched(
+        make_record(ident, sequence)
+        for ident, sequence in scan_selection(pairs, select, record_range)
+    )
+
+
+def option_batches(
+    file: TextIO, make_record: Callable[[str, str], Record], options: Dict[str, Any]
+) -> Iterator[List[Record]]:
+    """
+    Yields the records of a FASTA file in batches, using the options of the reader
+    """
+    select = options.get("select")
+    record_range = options.get("record_range")
+    if select is None and record_range is None:
+        return fasta_batches(file, make_record, options.get("jobs", 1))
+    return selected_batches(file, make_record, select, record_range)
+
+
+def fasta_reader(
+    fields: List[str],
+    make_record: Callable[[str, str], Record],
+    file: TextIO,
+    **options: Any,
+) -> Tuple[List[str], Callable[[], Iterator[Record]]]:
+    """
+    Returns the reader result for a FASTA format
+
+    Records are created by make_record from the identifier line and the sequence
+    """
+
+    def record_generator() -> Iterator[Record]:
+        for batch in option_batches(file, make_record, options):
+            yield from batch
+
+    return fields, record_generator
+
+
+def fasta_batch_reader(
+    fields: List[str],
+    make_record: Callable[[str, str], Record],
+    file: TextIO,
+    **options: Any,
+) -> Tuple[List[str], Callable[[], Iterator[List[Record]]]]:
+    """
+    Returns the batch reader result for a FASTA format
+
+    Records are created by make_record from the identifier line and the sequence
+    """
+
+    def batch_generator() -> Iterator[List[Record]]:
+        return option_batches(file, make_record, options)
+
+    return fields, batch_generator
+
+
+# the records of the simple FASTA formats
+fasta_schema = Schema.get(["seqid", "sequence"])
+
+
 class Fastafile:
     """Class for standard FASTA files"""
 
     write_takes_kwargs = True
 
+    @staticmethod
+    def consumed_fields(fields: List[str]) -> List[str]:
+        """Returns the fields of the records, that the writer uses"""
+        return NameAssembler.used_fields(fields) + ["sequence"]
+
     @staticmethod
     def write(file: TextIO, fields: List[str], **options: bool) -> Generator:
         """FASTA writer method"""
+        return record_writer(Fastafile.write_batches(file, fields, **options))
+
+    @staticmethod
+    def write_batches(file: TextIO, fields: List[str], **options: bool) -> Generator:
+        """FASTA batch writer method"""
         # the standard NameAssembler
         name_assembler = NameAssembler(
-            fields, preserve_special=options.preserve_special
+            fields, preserve_special=options.get("preserve_special", False)
         )
+        name = name_assembler.name
 
         # the writing loop
         while True:
-            # receive a record
+            # receive a list of records
             try:
-                record = yield
+                batch = yield
             except GeneratorExit:
                 break
 
-            # print the unique name
-            print(">", name_assembler.name(record), sep="", file=file)
+            # write the unique names and the sequences
+            file.write(
+                "".join(
+                    [f">{name(record)}\n{record['sequence']}\n" for record in batch]
+                )
+            )
+
+    @staticmethod
+    def make_record(ident: str, sequence: str) -> Record:
+        """Creates a record from the first line and the concatenated other lines"""
+        # 'seqid' is the first line without the initial character
+        return Record.from_values(fasta_schema, [ident[1:], sequence])
 
-            # print the sequence
-            print(record["sequence"], file=file)
+    read_takes_kwargs = True
 
     @staticmethod
-    def read(file: TextIO) -> Tuple[List[str], Callable[[], Iterator[Record]]]:
+    def read(
+        file: TextIO, **options: Any
+    ) -> Tuple[List[str], Callable[[], Iterator[Record]]]:
         """FASTA reader method"""
-
         # FASTA always have the same fields
-        fields = ["seqid", "sequence"]
-
-        def record_generator() -> Iterator[Record]:
-            for chunk in split_file(file):
-                # 'seqid' is the first line without the initial character
-                # 'sequence' is the concatenation of all the other lines
-                yield Record(seqid=chunk[0][1:], sequence="".join(chunk[1:]))
+        return fasta_reader(
+            ["seqid", "sequence"], Fastafile.make_record, file, **options
+        )
 
-        return fields, record_generator
+    @staticmethod
+    def read_batches(
+        file: TextIO, **options: Any
+    ) -> Tuple[List[str], Callable[[], Iterator[List[Record]]]]:
+        """FASTA batch reader method"""
+        return fasta_batch_reader(
+            ["seqid", "sequence"], Fastafile.make_record, file, **options
+        )
 
 
 class FastafileNoGaps:
@@ -84,30 +338,42 @@ class FastafileNoGaps:
 
     write_takes_kwargs = True
 
+    @staticmethod
+    def consumed_fields(fields: List[str]) -> List[str]:
+        """Returns the fields of the records, that the writer uses"""
+        return NameAssembler.used_fields(fields) + ["sequence"]
+
     @staticmethod
     def write(file: TextIO, fields: List[str], **options: bool) -> Generator:
         """FASTA no gaps writer method"""
+        return record_writer(FastafileNoGaps.write_batches(file, fields, **options))
+
+    @staticmethod
+    def write_batches(file: TextIO, fields: List[str], **options: bool) -> Generator:
+        """FASTA no gaps batch writer method"""
         # the standard NameAssembler
         name_assembler = NameAssembler(
-            fields, preserve_special=options.preserve_special
+            fields, preserve_special=options.get("preserve_special", False)
         )
+        name = name_assembler.name
 
         # the writing loop
         while True:
-            # receive a record
+            # receive a list of records
             try:
-                record = yield
+                batch = yield
             except GeneratorExit:
                 break
 
-            # print the unique name
-            print(">", name_assembler.name(record), sep="", file=file)
-
-            # remove gaps from the sequence
-            record["sequence"] = record["sequence"].replace("-", "")
-
-            # print the sequence
-            print(record["sequence"], file=file)
+            # write the unique names and the sequences with the gaps removed
+            file.write(
+                "".join(
+                    [
+                        f">{name(record)}\n{record['sequence'].replace('-', '')}\n"
+                        for record in batch
+                    ]
+                )
+            )
 
     @staticmethod
     def read(file: TextIO) -> Tuple[List[str], Callable[[], Iterator[Record]]]:
@@ -136,9 +402,9 @@ class SpeciesNamer:
         returns Hapview short species name for the given record
     """
 
-    def __init__(self, species: Set[str], species_field: Optional[str]):
+    def __init__(self, species: Iterable[str], species_field: Optional[str]):
         """
-        species is the set of species' names in the input file.
+        species are the unique species' names in the input file.
         species_field is the name of the field that contains the species' name
         """
         # if the species' name is not given
@@ -179,81 +445,143 @@ class SpeciesNamer:
 class HapviewFastafile:
     """class for the FASTA format of the Haplotype Viewer"""
 
+    read_takes_kwargs = True
+
     @staticmethod
-    def read(file: TextIO) -> Tuple[List[str], Callable[[], Iterator[Record]]]:
+    def read(
+        file: TextIO, **options: Any
+    ) -> Tuple[List[str], Callable[[], Iterator[Record]]]:
         """
         FASTA Hapview reader method
 
         The same as for the standard FASTA
         """
-        # FASTA always have the same fields
-        fields = ["seqid", "sequence"]
+        return Fastafile.read(file, **options)
 
-        def record_generator() -> Iterator[Record]:
-            for chunk in split_file(file):
-                # 'seqid' is the first line without the initial character
-                # 'sequence' is the concatenation of all the other lines
-                yield Record(seqid=chunk[0][1:], sequence="".join(chunk[1:]))
+    @staticmethod
+    def read_batches(
+        file: TextIO, **options: Any
+    ) -> Tuple[List[str], Callable[[], Iterator[List[Record]]]]:
+        """FASTA Hapview batch reader method"""
+        return Fastafile.read_batches(file, **options)
 
-        return fields, record_generator
+    write_takes_kwargs = True
 
     @staticmethod
-    def write(file: TextIO, fields: List[str]) -> Generator:
-        """FASTA Hapview writer method"""
+    def consumed_fields(fields: List[str]) -> List[str]:
+        """Returns the fields of the records, that the writer uses"""
+        species_field = get_species_field(fields)
+        return NameAssembler.used_fields(fields) + [
+            "sequence",
+            *([species_field] if species_field else []),
+        ]
+
+    @staticmethod
+    def prescan(fields: List[str], **options: Any) -> Aggregator:
+        """
+        Returns the aggregator for the information needed before writing the first record
+        """
         # if there is a field with the name of the species
-        # then aggregate the names into a set
-        # else use the standard Phylip Aggregator
+        # then aggregate the names in the order of appearance
+        # so that the short names don't depend on the order of a set
         species_field = get_species_field(fields)
-        if species_field:
 
-            def species_reducer(acc: Set[str], record: Record) -> Set[str]:
-                assert species_field is not None
-                acc.add(record[species_field])
-                return acc
+        def species_reducer(acc: Dict[str, None], record: Record) -> Dict[str, None]:
+            if species_field:
+                acc.setdefault(record[species_field])
+            return acc
 
-            aggregator = PhylipAggregator((set(), species_reducer))
-        else:
-            aggregator = PhylipAggregator()
+        return PhylipAggregator(({}, species_reducer))
 
-        # collect the record and aggregate the information about them
-        records = []
-        while True:
-            try:
-                record = yield
-            except GeneratorExit:
-                break
-            aggregator.send(record)
-            records.append(record)
-        [max_length, min_length, species] = aggregator.results()
-
-        # will create the short species' names
-        species_namer = SpeciesNamer(species, species_field)
-        # will ensure that all sequences have the same length
-        aligner = dna_aligner(max_length, min_length)
-        # creates or copies the seqid
-        name_assembler = NameAssembler(fields)
-        # makes the seqid unique
-        unicifier = Unicifier(100)
-
-        # write the records
-        for record in records:
-            print(
-                ">",
-                unicifier.unique(name_assembler.name(record)),
-                ".",
-                species_namer.name(record),
-                sep="",
-                file=file,
+    @staticmethod
+    def write(file: TextIO, fields: List[str], **options: Any) -> Generator:
+        """FASTA Hapview writer method"""
+        return record_writer(HapviewFastafile.write_batches(file, fields, **options))
+
+    @staticmethod
+    def write_batches(
+        file: TextIO, fields: List[str], **options: Any
+    ) -> Generator[None, List[Record], None]:
+        """
+        FASTA Hapview batch writer method
+
+        If the option 'prescan' contains the results of the prescan aggregator,
+        the records are written as they are received.
+        Otherwise they are collected first, in a temporary file if the option 'low_memory' is set
+        """
+        prescan = options.get("prescan")
+        # the records are written as they are received, if the prescan results are given
+        streaming = prescan is not None
+        records: Union[List[Record], RecordSpool] = (
+            RecordSpool() if options.get("low_memory") and not streaming else []
+        )
+        try:
+            if prescan is None:
+                # collect the record and aggregate the information about them
+                aggregator = HapviewFastafile.prescan(fields, **options)
+                while True:
+                    try:
+                        batch = yield
+                    except GeneratorExit:
+                        break
+                    for record in batch:
+                        aggregator.send(record)
+                    records.extend(batch)
+                prescan = aggregator.results()
+            [max_length, min_length, species] = prescan
+
+            # will create the short species' names
+            species_namer = SpeciesNamer(species, get_species_field(fields))
+            # will ensure that all sequences have the same length
+            aligner = dna_aligner(max_length, min_length)
+            # creates or copies the seqid
+            name_assembler = NameAssembler(
+                fields, preserve_special=options.get("preserve_special", False)
             )
-            print(aligner(record["sequence"]), file=file)
+            # makes the seqid unique
+            unicifier = Unicifier(100)
+
+            def write_records(batch: List[Record]) -> None:
+                file.write(
+                    "".join(
+                        [
+                            f">{unicifier.unique(name_assembler.name(record))}.{species_namer.name(record)}\n{aligner(record['sequence'])}\n"
+                            for record in batch
+                        ]
+                    )
+                )
+
+            # write the records
+            if streaming:
+                while True:
+                    try:
+                        batch = yield
+                    except GeneratorExit:
+                        break
+                    write_records(batch)
+            else:
+                for batch in batched(records):
+                    write_records(batch)
+        finally:
+            if isinstance(records, RecordSpool):
+                records.close()
 
 
 class FastQFile:
     """class for the FastQ format"""
 
     @staticmethod
-    def to_fasta(infile: TextIO, outfile: TextIO) -> None:
-        """Quick conversion from FastQ to FASTA"""
+    def to_fasta(
+        infile: TextIO,
+        outfile: TextIO,
+        update: Optional[Callable[[int], None]] = None,
+    ) -> None:
+        """
+        Quick conversion from FastQ to FASTA
+
+        update is called with the number of records after each batch of them
+        """
+        count = 0
         for line in infile:
             # loop through lines until the start of a record
             if line[0] == "@":
@@ -262,12 +590,20 @@ class FastQFile:
                 # copy the sequence
                 line = infile.readline()
                 print(line, file=outfile, end="")
+                count += 1
+                if count == BATCH_SIZE and update is not None:
+                    update(count)
+                    count = 0
+        if update is not None:
+            update(count)
 
     @staticmethod
     def read(file: TextIO) -> Tuple[List[str], Callable[[], Iterator[Record]]]:
         """FastQ reader method"""
         # FastQ always have the same fields
         fields = ["seqid", "sequence", "quality_score_identifier", "quality_score"]
+        # all the records share the same schema
+        schema = Schema.get(fields)
 
         def record_generator() -> Iterator[Record]:
             for line in file:
@@ -278,11 +614,9 @@ class FastQFile:
                     sequence = file.readline().rstrip()
                     quality_score_identifier = file.readline().rstrip()
                     quality_score = file.readline().rstrip()
-                    yield Record(
-                        seqid=seqid,
-                        sequence=sequence,
-                        quality_score_identifier=quality_score_identifier,
-                        quality_score=quality_score,
+                    yield Record.from_values(
+                        schema,
+                        [seqid, sequence, quality_score_identifier, quality_score],
                     )
 
         return fields, record_generator
@@ -290,6 +624,11 @@ class FastQFile:
     @staticmethod
     def write(file: TextIO, fields: List[str]) -> Generator:
         """FastQ writer method"""
+        return record_writer(FastQFile.write_batches(file, fields))
+
+    @staticmethod
+    def write_batches(file: TextIO, fields: List[str]) -> Generator:
+        """FastQ batch writer method"""
 
         # check that all the required fields are present
         if not {
@@ -303,16 +642,21 @@ class FastQFile:
             )
 
         while True:
-            # get the record
+            # get the list of records
             try:
-                record = yield
+                batch = yield
             except GeneratorExit:
                 break
-            # write the name
-            print("@", record["seqid"], sep="", file=file)
-            # write the other attributes
-            for field in ["sequence", "quality_score_identifier", "quality_score"]:
-                print(record[field], file=file)
+            # write the names and the other attributes
+            file.write(
+                "".join(
+                    [
+                        f"@{record['seqid']}\n{record['sequence']}\n"
+                        f"{record['quality_score_identifier']}\n{record['quality_score']}\n"
+                        for record in batch
+                    ]
+                )
+            )
 
 
 class NameAssemblerGB(NameAssembler):
@@ -426,8 +770,14 @@ class GenbankFastaFile:
         record["sequence"] = record["sequence"].strip("nN?")
 
     @staticmethod
-    def parse_ident(line: str) -> Tuple[str, Dict[str, str]]:
-        """Reads the attributes from the first line of Genbank FASTA record. Returns seqid and the dictionary of attributes"""
+    def parse_ident(
+        line: str, fields: Optional[Set[str]] = None
+    ) -> Tuple[str, Dict[str, str]]:
+        """
+        Reads the attributes from the first line of Genbank FASTA record. Returns seqid and the dictionary of attributes
+
+        If fields is given, only these attributes are returned
+        """
         # raise an error if the line is invalid
         if line[0] != ">":
             raise ValueError("Genbank fasta: invalid identifier line\n" + line)
@@ -450,6 +800,13 @@ class GenbankFastaFile:
             else:
                 values[field] = value
 
+        if fields is not None:
+            # only the given fields are initialised
+            return seqid, {
+                field: values.get(field, "")
+                for field in GenbankFastaFile.genbankfields
+                if field in fields and not (field == "seqid" or field == "sequence")
+            }
         # initialise all the missing fields
         for field in GenbankFastaFile.genbankfields:
             if not (field == "seqid" or field == "sequence"):
@@ -457,23 +814,62 @@ class GenbankFastaFile:
         return seqid, values
 
     @staticmethod
-    def read(file: TextIO) -> Tuple[List[str], Callable[[], Iterator[Record]]]:
-        """Genbank FASTA reader method"""
+    def make_record(
+        ident: str, sequence: str, fields: Optional[Set[str]] = None
+    ) -> Record:
+        """
+        Creates a record from the first line and the concatenated other lines
 
-        def record_generator() -> Iterator[Record]:
-            for chunk in split_file(file):
-                ident = chunk[0]
-                # parse the seqid and attributes
-                seqid, values = GenbankFastaFile.parse_ident(ident)
-                yield Record(seqid=seqid, sequence="".join(chunk[1:]), **values)
+        If fields is given, the record only has these fields
+        """
+        # parse the seqid and attributes
+        seqid, values = GenbankFastaFile.parse_ident(ident, fields)
+        return Record(seqid=seqid, sequence=sequence, **values)
+
+    @staticmethod
+    def record_maker(options: Dict[str, Any]) -> Callable[[str, str], Record]:
+        """Returns make_record with the fields that are used by the writer"""
+        fields = projected_fields(GenbankFastaFile.genbankfields, options)
+        if fields is None:
+            return GenbankFastaFile.make_record
+        return functools.partial(GenbankFastaFile.make_record, fields=fields)
+
+    read_takes_kwargs = True
+
+    @staticmethod
+    def read(
+        file: TextIO, **options: Any
+    ) -> Tuple[List[str], Callable[[], Iterator[Record]]]:
+        """Genbank FASTA reader method"""
+        return fasta_reader(
+            GenbankFastaFile.genbankfields,
+            GenbankFastaFile.record_maker(options),
+            file,
+            **options,
+        )
 
-        return GenbankFastaFile.genbankfields, record_generator
+    @staticmethod
+    def read_batches(
+        file: TextIO, **options: Any
+    ) -> Tuple[List[str], Callable[[], Iterator[List[Record]]]]:
+        """Genbank FASTA batch reader method"""
+        return fasta_batch_reader(
+            GenbankFastaFile.genbankfields,
+            GenbankFastaFile.record_maker(options),
+            file,
+            **options,
+        )
 
     write_takes_kwargs = True
 
     @staticmethod
     def write(file: TextIO, fields: List[str], **options: bool) -> Generator:
         """Genbank FASTA writer method"""
+        return record_writer(GenbankFastaFile.write_batches(file, fields, **options))
+
+    @staticmethod
+    def write_batches(file: TextIO, fields: List[str], **options: bool) -> Generator:
+        """Genbank FASTA batch writer method"""
         # discard the invalid fields
         fields = [
             field
@@ -502,48 +898,63 @@ class GenbankFastaFile:
 
         # creates seqid for Genbank FASTA
         name_assembler = NameAssemblerGB(
-            fields, preserve_special=options.preserve_special
+            fields, preserve_special=options.get("preserve_special", False)
         )
         # makes the seqid unique within 25 characters
         unicifier = Unicifier(25)
 
+        # the fields written as attributes
+        attribute_fields = [
+            field for field in fields if not (field == "seqid" or field == "sequence")
+        ]
+
         # receive the records and write them
         while True:
             try:
-                record = yield
+                batch = yield
             except GeneratorExit:
                 break
 
-            # standardize the record
-            GenbankFastaFile.prepare(fields, record)
+            lines = []
+            for record in batch:
+                # standardize the record
+                GenbankFastaFile.prepare(fields, record)
 
-            # raise the warning if the sequence <200 bp and turn off the checking for this
-            if length_okay and len(record["sequence"]) < 200:
-                length_okay = False
-                warnings.warn(
-                    "Some of your sequences are <200 bp in length and therefore will probably not accepted by the GenBank nucleotide database"
-                )
+                # raise the warning if the sequence <200 bp and turn off the checking for this
+                if length_okay and len(record["sequence"]) < 200:
+                    length_okay = False
+                    warnings.warn(
+                        "Some of your sequences are <200 bp in length and therefore will probably not accepted by the GenBank nucleotide database"
+                    )
 
-            # raise the warning if the sequence has dashes and turn off the checking for this
-            if no_dashes and "-" in record["sequence"]:
-                no_dashes = False
-                warnings.warn(
-                    "Some of your sequences contain dashes (gaps) which is only allowed if you submit them as alignment. If you do not wish to submit your sequences as alignment, please remove the dashes before conversion."
+                # raise the warning if the sequence has dashes and turn off the checking for this
+                if no_dashes and "-" in record["sequence"]:
+                    no_dashes = False
+                    warnings.warn(
+                        "Some of your sequences contain dashes (gaps) which is only allowed if you submit them as alignment. If you do not wish to submit your sequences as alignment, please remove the dashes before conversion."
+                    )
+                # seqid and attributes
+                lines.append(
+                    " ".join(
+                        [">" + unicifier.unique(name_assembler.name(record))]
+                        + [
+                            f"[{field.replace('_', '-')}={record[field].strip()}]"
+                            for field in attribute_fields
+                            if record[field] and not record[field].isspace()
+                        ]
+                    )
                 )
-            # print seqid and attributes
-            print(
-                ">" + unicifier.unique(name_assembler.name(record)),
-                *[
-                    f"[{field.replace('_', '-')}={record[field].strip()}]"
-                    for field in fields
-                    if record[field]
-                    and not record[field].isspace()
-                    and not (field == "seqid" or field == "sequence")
-                ],
-                file=file,
-            )
-            # print the sequence
-            print(record["sequence"], file=file)
+                # the sequence
+                lines.append(record["sequence"])
+
+            # write the records of the batch
+            lines.append("")
+            file.write("\n".join(lines))
+
+
+# MolD always have the same fields
+mold_fields = ["seqid", "species", "sequence"]
+mold_schema = Schema.get(mold_fields)
 
 
 class MolDFastaFile:
@@ -551,82 +962,113 @@ class MolDFastaFile:
 
     write_takes_kwargs = True
 
+    @staticmethod
+    def consumed_fields(fields: List[str]) -> List[str]:
+        """Returns the fields of the records, that the writer uses"""
+        name_fields = ["specimen_voucher", "specimen-voucher", "isolate", "seqid"]
+        species_fields = ["species", "organism"]
+        return NameAssembler.used_fields(fields) + [
+            "sequence",
+            *(field for field in name_fields + species_fields if field in fields),
+        ]
+
     @staticmethod
     def write(file: TextIO, fields: List[str], **options) -> Generator:
         """MolD writer method"""
+        return record_writer(MolDFastaFile.write_batches(file, fields, **options))
+
+    @staticmethod
+    def write_batches(file: TextIO, fields: List[str], **options) -> Generator:
+        """MolD batch writer method"""
 
         # assemble the name from fields if 'specimen_voucher' or 'isolate' is missing
         name_assembler = NameAssembler(
-            fields, abbreviate_species=True, preserve_special=options.preserve_special
+            fields,
+            abbreviate_species=True,
+            preserve_special=options.get("preserve_special", False),
         )
         unicifier = Unicifier()
 
         # the writing loop
         while True:
-            # receive a record
+            # receive a list of records
             try:
-                record = yield
+                batch = yield
             except GeneratorExit:
                 break
 
-            if (
-                "specimen_voucher" in fields
-                or "specimen-voucher" in fields
-                or "isolate" in fields
-            ):
-                name = (
-                    record["specimen_voucher"]
-                    if "specimen_voucher" in fields
-                    else (
-                        record["specimen-voucher"]
-                        if "specimen-voucher" in fields
-                        else record["isolate"]
-                    )
-                )
-                if options.preserve_special:
-                    name = sanitize(name)
-            else:
-                try:
+            lines = []
+            for record in batch:
+                if (
+                    "specimen_voucher" in fields
+                    or "specimen-voucher" in fields
+                    or "isolate" in fields
+                ):
                     name = (
-                        sanitize(record["seqid"])
-                        if options.preserve_special
-                        else record["seqid"]
+                        record["specimen_voucher"]
+                        if "specimen_voucher" in fields
+                        else (
+                            record["specimen-voucher"]
+                            if "specimen-voucher" in fields
+                            else record["isolate"]
+                        )
                     )
-                except KeyError:
-                    name = unicifier.unique(name_assembler.name(record))
-                    warnings.warn(
-                        f'A record has no sequence identifier. Using "{name}" as a sequence identifier'
-                    )
-            species = (
-                record["species"]
-                if "species" in fields
-                else record["organism"] if "organism" in fields else ""
-            )
-            if options.preserve_special:
-                species = sanitize(species)
-            if not species:
-                raise ValueError(
-                    'Conversion to MolD FASTA requires either a "species" or an "organism" field. Neither was found'
+                    if options.get("preserve_special", False):
+                        name = sanitize(name)
+                else:
+                    try:
+                        name = (
+                            sanitize(record["seqid"])
+                            if options.get("preserve_special", False)
+                            else record["seqid"]
+                        )
+                    except KeyError:
+                        name = unicifier.unique(name_assembler.name(record))
+                        warnings.warn(
+                            f'A record has no sequence identifier. Using "{name}" as a sequence identifier'
+                        )
+                species = (
+                    record["species"]
+                    if "species" in fields
+                    else record["organism"] if "organism" in fields else ""
                 )
-            print(">", name, "|", species, sep="", file=file)
-            print(record["sequence"], file=file)
+                if options.get("preserve_special", False):
+                    species = sanitize(species)
+                if not species:
+                    raise ValueError(
+                        'Conversion to MolD FASTA requires either a "species" or an "organism" field. Neither was found'
+                    )
+                lines.append(f">{name}|{species}\n{record['sequence']}\n")
+
+            # write the records of the batch
+            file.write("".join(lines))
 
     @staticmethod
-    def read(file: TextIO) -> Tuple[List[str], Callable[[], Iterator[Record]]]:
-        """MolD reader method"""
+    def make_record(ident: str, sequence: str) -> Record:
+        """Creates a record from the first line and the concatenated other lines"""
+        # 'seqid' is the part of the first line between the initial character and '|'
+        # 'species' is the part of the first line after '|'
+        seqid, _, species = ident[1:].partition("|")
+        return Record.from_values(mold_schema, [seqid, species, sequence])
 
-        # MolD always have the same fields
-        fields = ["seqid", "species", "sequence"]
+    read_takes_kwargs = True
 
-        def record_generator() -> Iterator[Record]:
-            for chunk in split_file(file):
-                # 'seqid' is the part of the first line between the initial character and '|'
-                # 'species' is the part of the first line after '|'
-                # 'sequence' is the concatenation of all the other lines
-                seqid, _, species = chunk[0][1:].partition("|")
-                yield Record(seqid=seqid, species=species, sequence="".join(chunk[1:]))
+    @staticmethod
+    def read(
+        file: TextIO, **options: Any
+    ) -> Tuple[List[str], Callable[[], Iterator[Record]]]:
+        """MolD reader method"""
+        # MolD always have the same fields
+        return fasta_reader(mold_fields, MolDFastaFile.make_record, file, **options)
 
-        return fields, record_generator
+    @staticmethod
+    def read_batches(
+        file: TextIO, **options: Any
+    ) -> Tuple[List[str], Callable[[], Iterator[List[Record]]]]:
+        """MolD batch reader method"""
+        return fasta_batch_reader(
+            mold_fields, MolDFastaFile.make_record, file, **options
+        )
 
 
 class AliFile:
@@ -634,13 +1076,24 @@ class AliFile:
 
     write_takes_kwargs = True
 
+    @staticmethod
+    def consumed_fields(fields: List[str]) -> List[str]:
+        """Returns the fields of the records, that the writer uses"""
+        return NameAssembler.used_fields(fields) + ["sequence"]
+
     @staticmethod
     def write(file: TextIO, fields: List[str], **options: bool) -> Generator:
         """Ali writer method"""
+        return record_writer(AliFile.write_batches(file, fields, **options))
+
+    @staticmethod
+    def write_batches(file: TextIO, fields: List[str], **options: bool) -> Generator:
+        """Ali batch writer method"""
         # the standard NameAssembler
         name_assembler = NameAssembler(
-            fields, preserve_special=options.preserve_special
+            fields, preserve_special=options.get("preserve_special", False)
         )
+        name = name_assembler.name
 
         # Ali needs two empty lines with a hashtag
         print("#", file=file)
@@ -648,38 +1101,49 @@ class AliFile:
 
         # the writing loop
         while True:
-            # receive a record
+            # receive a list of records
             try:
-                record = yield
+                batch = yield
             except GeneratorExit:
                 break
 
-            # print the unique name
-            print(">", name_assembler.name(record), sep="", file=file)
+            # write the unique names and the sequences
+            file.write(
+                "".join(
+                    [f">{name(record)}\n{record['sequence']}\n" for record in batch]
+                )
+            )
+
+    @staticmethod
+    def make_record(ident: str, sequence: str) -> Record:
+        """Creates a record from the first line and the concatenated other lines"""
+        # 'seqid' is the first line without the initial character
+        seqid = ident[1:]
+        # the leading spaces are unknown bases
+        seq_start_match = re.search(r"\S", sequence)
+        if seq_start_match is None:
+            spaces_count = len(sequence)
+        else:
+            spaces_count = seq_start_match.start()
+        sequence = "?" * spaces_count + sequence[spaces_count:]
+        sequence = sequence.replace("*", "-")
+        return Record.from_values(fasta_schema, [seqid, sequence])
 
-            # print the sequence
-            print(record["sequence"], file=file)
+    read_takes_kwargs = True
 
     @staticmethod
-    def read(file: TextIO) -> Tuple[List[str], Callable[[], Iterator[Record]]]:
+    def read(
+        file: TextIO, **options: Any
+    ) -> Tuple[List[str], Callable[[], Iterator[Record]]]:
         """Ali reader method"""
-
         # Ali always have the same fields
-        fields = ["seqid", "sequence"]
+        return fasta_reader(["seqid", "sequence"], AliFile.make_record, file, **options)
 
-        def record_generator() -> Iterator[Record]:
-            for chunk in split_file(file):
-                # 'seqid' is the first line without the initial character
-                # 'sequence' is the concatenation of all the other lines
-                seqid = chunk[0][1:]
-                sequence = "".join(chunk[1:])
-                seq_start_match = re.search(r"\S", sequence)
-                if seq_start_match is None:
-                    spaces_count = len(sequence)
-                else:
-                    spaces_count = seq_start_match.start()
-                sequence = "?" * spaces_count + sequence[spaces_count:]
-                sequence = sequence.replace("*", "-")
-                yield Record(seqid=seqid, sequence=sequence)
-
-        return fields, record_generator
+    @staticmethod
+    def read_batches(
+        file: TextIO, **options: Any
+    ) -> Tuple[List[str], Callable[[], Iterator[List[Record]]]]:
+        """Ali batch reader method"""
+        return fasta_batch_reader(
+            ["seqid", "sequence"], AliFile.make_record, file, **options
+        )
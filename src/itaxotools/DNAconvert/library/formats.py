@@ -1,25 +1,59 @@
-from typing import Dict, Type, Any
-from . import tabfile
-from . import fasta
-from . import phylip
-from . import nexus
-from . import genbank
-from . import nexml
-from .config import get_config
-
-
-config = get_config()
-if config.nexus_parser == "python-nexus":
-    nexus_format = nexus.NexusFileSimple
-elif config.nexus_parser == "internal":
-    nexus_format = nexus.NexusFile
-else:
-    raise ValueError(
-        "The value of 'nexus_parser' in 'config.json' should be either 'python-nexus' or 'internal'"
-    )
+import importlib
+from typing import Dict, Type, Any, Iterator, Mapping, Union, Callable
+
+
+def nexus_format() -> Type[Any]:
+    """Returns the NEXUS format class selected by 'nexus_parser' in 'config.json'"""
+    from . import nexus
+    from .config import get_config
+
+    config = get_config()
+    if config.nexus_parser == "python-nexus":
+        return nexus.NexusFileSimple
+    elif config.nexus_parser == "internal":
+        return nexus.NexusFile
+    else:
+        raise ValueError(
+            "The value of 'nexus_parser' in 'config.json' should be either 'python-nexus' or 'internal'"
+        )
+
+
+class FormatRegistry(Mapping[str, Type[Any]]):
+    """Maps the keys to the format classes, importing their modules on the first lookup
+
+    The classes are given as 'module.Class' in the library or as functions returning the class.
+    The command-line conversions only import the modules of their formats
+    """
+
+    def __init__(self, classes: Dict[str, Union[str, Callable[[], Type[Any]]]]):
+        self._classes = classes
+        # the classes that are already imported
+        self._loaded: Dict[str, Type[Any]] = {}
+
+    def __getitem__(self, key: str) -> Type[Any]:
+        try:
+            return self._loaded[key]
+        except KeyError:
+            pass
+        location = self._classes[key]
+        if callable(location):
+            format_class = location()
+        else:
+            module_name, _, class_name = location.rpartition(".")
+            module = importlib.import_module(f".{module_name}", __package__)
+            format_class = getattr(module, class_name)
+        self._loaded[key] = format_class
+        return format_class
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._classes)
+
+    def __len__(self) -> int:
+        return len(self._classes)
+
 
 # To add a new format
-# add format_name=format_class to `formats`
+# add format_name="module.FormatClass" to `formats`
 #
 # for output-only formats
 # informats_gui.remove(format_name)
@@ -29,21 +63,23 @@ else:
 
 
 # formats' names dictionary
-formats: Dict[str, Type[Any]] = dict(
-    tab=tabfile.Tabfile,
-    tab_noheaders=tabfile.NoHeaderTab,
-    fasta=fasta.Fastafile,
-    fasta_nogaps=fasta.FastafileNoGaps,
-    relaxed_phylip=phylip.RelPhylipFile,
-    fasta_hapview=fasta.HapviewFastafile,
-    phylip=phylip.PhylipFile,
-    fastq=fasta.FastQFile,
-    fasta_gbexport=fasta.GenbankFastaFile,
-    nexus=nexus_format,
-    nexml=nexml.NeXMLFile,
-    genbank=genbank.GenbankFile,
-    mold_fasta=fasta.MolDFastaFile,
-    ali_fasta=fasta.AliFile,
+formats = FormatRegistry(
+    dict(
+        tab="tabfile.Tabfile",
+        tab_noheaders="tabfile.NoHeaderTab",
+        fasta="fasta.Fastafile",
+        fasta_nogaps="fasta.FastafileNoGaps",
+        relaxed_phylip="phylip.RelPhylipFile",
+        fasta_hapview="fasta.HapviewFastafile",
+        phylip="phylip.PhylipFile",
+        fastq="fasta.FastQFile",
+        fasta_gbexport="fasta.GenbankFastaFile",
+        nexus=nexus_format,
+        nexml="nexml.NeXMLFile",
+        genbank="genbank.GenbankFile",
+        mold_fasta="fasta.MolDFastaFile",
+        ali_fasta="fasta.AliFile",
+    )
 )
 
 informats_gui = list(formats.keys())
@@ -59,24 +95,26 @@ outformats_gui.remove(
 outformats_gui.remove("genbank")
 
 # extensions' dictionary
-extensions = {
-    ".tab": tabfile.Tabfile,
-    ".txt": tabfile.Tabfile,
-    ".tsv": tabfile.Tabfile,
-    ".fas": fasta.Fastafile,
-    ".fna": fasta.Fastafile,
-    ".fasta": fasta.Fastafile,
-    ".rel.phy": phylip.RelPhylipFile,
-    ".hapv.fas": fasta.HapviewFastafile,
-    ".phy": phylip.PhylipFile,
-    ".fastq": fasta.FastQFile,
-    ".fq": fasta.FastQFile,
-    ".fastq.gz": fasta.FastQFile,
-    ".fq.gz": fasta.FastQFile,
-    ".gz": fasta.FastQFile,
-    ".gb.fas": fasta.GenbankFastaFile,
-    ".nex": nexus_format,
-    ".gb": genbank.GenbankFile,
-    ".xml": nexml.NeXMLFile,
-    ".ali": fasta.AliFile,
-}
+extensions = FormatRegistry(
+    {
+        ".tab": "tabfile.Tabfile",
+        ".txt": "tabfile.Tabfile",
+        ".tsv": "tabfile.Tabfile",
+        ".fas": "fasta.Fastafile",
+        ".fna": "fasta.Fastafile",
+        ".fasta": "fasta.Fastafile",
+        ".rel.phy": "phylip.RelPhylipFile",
+        ".hapv.fas": "fasta.HapviewFastafile",
+        ".phy": "phylip.PhylipFile",
+        ".fastq": "fasta.FastQFile",
+        ".fq": "fasta.FastQFile",
+        ".fastq.gz": "fasta.FastQFile",
+        ".fq.gz": "fasta.FastQFile",
+        ".gz": "fasta.FastQFile",
+        ".gb.fas": "fasta.GenbankFastaFile",
+        ".nex": nexus_format,
+        ".gb": "genbank.GenbankFile",
+        ".xml": "nexml.NeXMLFile",
+        ".ali": "fasta.AliFile",
+    }
+)
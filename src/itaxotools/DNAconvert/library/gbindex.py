@@ -0,0 +1,105 @@
+import mmap
+import os
+from typing import NamedTuple, Optional, List, Dict, Callable, Iterable, Tuple
+
+# the extension of the index files, added to the name of the Genbank flatfile
+INDEX_EXTENSION = ".gbi"
+
+
+class IndexEntry(NamedTuple):
+    """A line of a Genbank index, a record of the flatfile"""
+
+    # the first word of the ACCESSION field
+    accession: str
+    # the span of bytes of the record, from the "LOCUS" line to the end of the "//" line
+    start: int
+    end: int
+    # the DEFINITION field, which is the name of the converted record
+    definition: str
+
+
+class IrregularGenbankError(ValueError):
+    """Raised when a record can't be parsed without the following records"""
+
+
+def write_index(
+    path: str, size: int, entries: Iterable[IndexEntry], encoding: str
+) -> None:
+    """Writes the size of the Genbank flatfile and the entries to the index file at 'path'"""
+    with open(path, "w", encoding=encoding, errors="replace", newline="\n") as file:
+        print(size, file=file)
+        for entry in entries:
+            # the definition is the last column, since it can contain tabs
+            print(*entry, sep="\t", file=file)
+
+
+def read_index(path: str, encoding: str) -> Tuple[int, List[IndexEntry]]:
+    """Reads the size of the Genbank flatfile and the entries from the index file at 'path'"""
+    with open(path, encoding=encoding, errors="replace") as file:
+        size = int(file.readline())
+        entries = []
+        for line in file:
+            if not line.strip("\r\n"):
+                continue
+            accession, start, end, definition = line.rstrip("\r\n").split("\t", 3)
+            entries.append(IndexEntry(accession, int(start), int(end), definition))
+        return size, entries
+
+
+def load_index(
+    path: str,
+    buffer: mmap.mmap,
+    encoding: str,
+    build_index: Callable[[mmap.mmap, str], List[IndexEntry]],
+) -> List[IndexEntry]:
+    """
+    Returns the index of the Genbank flatfile at 'path', mapped in the buffer
+
+    The index file next to it is used, if it's not older than the flatfile and has its size,
+    since the flatfile could be replaced keeping its modification time.
+    Otherwise, the index is built by build_index and written there, if it's possible.
+    Raises IrregularGenbankError, if the index can't be built
+    """
+    index_path = path + INDEX_EXTENSION
+    try:
+        if os.path.getmtime(index_path) >= os.path.getmtime(path):
+            size, entries = read_index(index_path, encoding)
+            if size == len(buffer):
+                return entries
+    except (OSError, ValueError):
+        # there is no usable index
+        pass
+    entries = build_index(buffer, encoding)
+    try:
+        write_index(index_path, len(buffer), entries, encoding)
+    except OSError:
+        # the directory could be read-only
+        pass
+    return entries
+
+
+def select_entries(
+    entries: List[IndexEntry],
+    select: Optional[Iterable[str]],
+    record_range: Optional[Tuple[int, int]],
+) -> Tuple[List[IndexEntry], List[str]]:
+    """
+    Returns the entries of the selected records and the names that are not in the index
+
+    select is a list of accessions or definitions, the entries are returned in its order.
+    record_range is a pair (start, stop) of indices in the file, as in a slice.
+    If both are given, only the names in the range are looked up
+    """
+    if record_range is not None:
+        entries = entries[slice(*record_range)]
+    if select is None:
+        return entries, []
+    by_name: Dict[str, IndexEntry] = {}
+    for entry in entries:
+        # the first record with the name is used, the accessions before the definitions
+        by_name.setdefault(entry.accession, entry)
+    for entry in entries:
+        by_name.setdefault(entry.definition, entry)
+    selected = [by_name[name] for name in select if name in by_name]
+    missing = [name for name in select if name not in by_name]
+    return selected, missing
@@ -1,39 +1,122 @@
 from .record import *
-from typing import List, Optional, Tuple, Iterator, TextIO, Dict, Callable, Any
+from typing import (
+    Collection,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Iterator,
+    Iterable,
+    TextIO,
+    Dict,
+    Callable,
+    Any,
+)
+from .utils import *
+from .fasta import report_missing
+from . import binary
+from . import gbindex
+from . import parallel
+import functools
+import io
+import itertools
+import mmap
 import re
 import warnings
 
+# the size of the blocks read from the Genbank flatfile
+BLOCK_SIZE = 1 << 20
 
-def logical_lines(file: TextIO) -> Iterator[str]:
+# the line that ends a record, after a newline and at the beginning of a text
+# (the patterns begin with the newline, because it's found much faster than a line beginning)
+RECORD_END_REGEX = re.compile(r"\n//[^\S\n]*(?=\n|\Z)")
+FIRST_RECORD_END_REGEX = re.compile(r"//[^\S\n]*(?=\n|\Z)")
+# the "//" line at the end of a text
+LAST_RECORD_END_REGEX = re.compile(r"//[^\S\n]*\n?\Z")
+
+# the first lines of the logical lines of the parts of a record, after a newline
+LOCUS_REGEX = re.compile(r"^[^\S\n]{0,11}LOCUS", flags=re.MULTILINE)
+FEATURES_REGEX = re.compile(r"\n[^\S\n]{0,11}FEATURES")
+SOURCE_REGEX = re.compile(r"\n[^\S\n]{0,11}source")
+ORIGIN_REGEX = re.compile(r"\n[^\S\n]{0,11}ORIGIN")
+# the first line of any logical line, after a newline
+LINE_START_REGEX = re.compile(r"\n[^\S\n]{0,11}\S")
+# the beginning of a line that is a continuation of a logical line
+CONTINUATION_INDENT = " " * 12
+# the newlines before the first lines of the logical lines
+LOGICAL_LINE_SPLIT_REGEX = re.compile(r"\n(?=[^\S\n]{0,11}\S)")
+
+# the classes of the ASCII characters in the sequence lines:
+# the digits are mapped to 0 and the other characters that are not whitespace to a
+CHARACTER_CLASSES = str.maketrans(
+    {
+        chr(c): "0" if chr(c).isdigit() else chr(c) if chr(c).isspace() else "a"
+        for c in range(128)
+    }
+)
+# the ASCII digits and whitespace, which are removed from the sequence lines
+SEQUENCE_DELETION = str.maketrans(
+    "", "", "".join(chr(c) for c in range(128) if chr(c).isdigit() or chr(c).isspace())
+)
+
+# the qualifiers of a feature
+QUALIFIER_REGEX = re.compile(r'/([^=]*)="([^"]*)"')
+PRODUCT_REGEX = re.compile(r'/product="([^"]*)"')
+
+# the patterns for the bytes of a file mapped in memory, when it's indexed
+BYTES_FIRST_LOCUS_REGEX = re.compile(rb"[^\S\n]{0,11}LOCUS")
+BYTES_LOCUS_REGEX = re.compile(rb"\n[^\S\n]{0,11}LOCUS")
+BYTES_RECORD_END_REGEX = re.compile(RECORD_END_REGEX.pattern.encode())
+BYTES_FEATURES_REGEX = re.compile(FEATURES_REGEX.pattern.encode())
+BYTES_SOURCE_REGEX = re.compile(SOURCE_REGEX.pattern.encode())
+BYTES_ORIGIN_REGEX = re.compile(ORIGIN_REGEX.pattern.encode())
+BYTES_LINE_START_REGEX = re.compile(LINE_START_REGEX.pattern.encode())
+# the line breaks, that are not found by the patterns
+BYTES_LONE_CR_REGEX = re.compile(rb"\r(?!\n)")
+
+
+def logical_lines(file: Iterable[str]) -> Iterator[str]:
     """
     Iterator over the logical lines of Genbank flatfile.
 
     Logical line starts with indentation less or equal 12 whitespace characters.
     Newlines are replaced with ' '
     """
+    lines = iter(file)
     # find the first non-blank line
     while True:
-        current = file.readline()
+        current = next(lines, "")
         if not current:
             break
         if not current.isspace():
             break
-    # the 'current' variable contains the initial part of the logical line
-    current = current.strip()
-    while True:
-        # read a line
-        line = file.readline()
-        if not line:
-            yield current
-            break
+    # the 'parts' variable contains the stripped lines of the logical line
+    parts = [current.strip()]
+    for line in lines:
         # check if it's a continuation
         if line[0:12].isspace():
             # if yes, add to the current logical line
-            current = current + " " + line.strip()
+            parts.append(line.strip())
         else:
             # else, yield the current logical line and begin a new one
-            yield current
-            current = line.strip()
+            yield " ".join(parts)
+            parts = [line.strip()]
+    yield " ".join(parts)
+
+
+def join_lines(text: str) -> List[str]:
+    """
+    Returns the logical lines of text, which begins with the first line of a logical line
+    and doesn't end with a newline
+    """
+    return [
+        (
+            " ".join(line.strip() for line in group.split("\n"))
+            if "\n" in group
+            else group.strip()
+        )
+        for group in LOGICAL_LINE_SPLIT_REGEX.split(text)
+    ]
 
 
 def find_line(lines: Iterator[str], field: str) -> Optional[str]:
@@ -99,13 +182,13 @@ def collect_features(lines: Iterator[str]) -> Optional[Dict[str, str]]:
         return None
     # collect the features from the logical line
     features: Dict[str, str] = {}
-    for match in re.finditer(r'/([^=]*)="([^"]*)"', line):
+    for match in QUALIFIER_REGEX.finditer(line):
         features.setdefault(match.group(1).casefold(), match.group(2))
     # save the first "/product" feature and iterate until the "ORIGIN" line
     while not line.startswith("ORIGIN"):
         # only search for "/product" if it's not already found
         if not "product" in features.keys():
-            m = re.search(r'/product="([^"]*)"', line)
+            m = PRODUCT_REGEX.search(line)
             if m:
                 features.setdefault("product", m.group(1))
         try:
@@ -124,7 +207,7 @@ def read_sequence(lines: Iterator[str]) -> Optional[str]:
     Precondition: beginning of 'lines' is immediately after the "ORIGIN" line
     Postcondition: beginning of 'lines' is immediately after the record
     """
-    sequence = ""
+    parts: List[str] = []
     while True:
         # read a line
         try:
@@ -135,11 +218,273 @@ def read_sequence(lines: Iterator[str]) -> Optional[str]:
         for word in line.split():
             if not word.isdigit():
                 if word.endswith(r"//"):
-                    sequence = sequence + word[:-2]
-                    return sequence
-                sequence = sequence + word
+                    parts.append(word[:-2])
+                    return "".join(parts)
+                parts.append(word)
         if line.startswith(r"//"):
-            return sequence
+            return "".join(parts)
+
+
+def record_texts(file: TextIO) -> Iterator[str]:
+    """
+    Iterator over the texts of the records in a Genbank flatfile,
+    each ending with the "//" line.
+
+    The file is read in blocks. The last text is the text after the last record
+    """
+    # the text of the current record in the previous blocks
+    parts: List[str] = []
+    # the incomplete last line of the previous block
+    buffer = ""
+    while True:
+        block = file.read(BLOCK_SIZE)
+        buffer += block
+        start = 0
+        first_end = FIRST_RECORD_END_REGEX.match(buffer)
+        for end in itertools.chain(
+            [first_end] if first_end else [], RECORD_END_REGEX.finditer(buffer)
+        ):
+            if end.end() == len(buffer) and block:
+                # the line can continue in the next block
+                break
+            # the text includes the newline after "//"
+            parts.append(buffer[start : end.end() + 1])
+            yield "".join(parts)
+            parts = []
+            start = end.end() + 1
+        if not block:
+            parts.append(buffer[start:])
+            yield "".join(parts)
+            return
+        newline = buffer.rfind("\n", start) + 1
+        if newline:
+            parts.append(buffer[start:newline])
+            start = newline
+        buffer = buffer[start:]
+
+
+def join_sequence(text: str) -> str:
+    """Returns the sequence in the sequence lines, ignoring the numbers"""
+    if text.isascii():
+        classes = text.translate(CHARACTER_CLASSES)
+        # the digits are removed at once, unless a word mixes them with other characters
+        if "0a" not in classes and "a0" not in classes:
+            return text.translate(SEQUENCE_DELETION)
+    return "".join(word for word in text.split() if not word.isdigit())
+
+
+def next_line_start(text: str, start: int, end: int) -> int:
+    """Returns the position of the newline before the next logical line, or end"""
+    line_start = LINE_START_REGEX.search(text, start, end)
+    return line_start.start() if line_start else end
+
+
+def find_product(text: str, start: int, end: int) -> Optional[str]:
+    """
+    Returns the first "/product" feature in the features between start and end,
+    as it's found in the logical lines.
+
+    start is the beginning of a logical line, after a newline.
+    Only the logical lines containing "/product=" are joined
+    """
+    while True:
+        position = text.find('/product="', start, end)
+        if position < 0:
+            return None
+        # go back to the first line of the logical line
+        line_start = text.rfind("\n", start - 1, position) + 1
+        while line_start > start and (
+            # the qualifiers are indented by 21 spaces
+            text.startswith(CONTINUATION_INDENT, line_start)
+            or not LINE_START_REGEX.match(text, line_start - 1)
+        ):
+            line_start = text.rfind("\n", start - 1, line_start - 1) + 1
+        line_end = next_line_start(text, position, end)
+        m = PRODUCT_REGEX.search(join_lines(text[line_start:line_end])[0])
+        if m:
+            return m.group(1)
+        start = line_end + 1
+
+
+def parse_record(
+    text: str, product: bool = True
+) -> Optional[Tuple[Dict[str, str], Dict[str, str], str]]:
+    """
+    Returns the metadata, the features and the sequence of the record in text,
+    as collect_metadata, collect_features and read_sequence do.
+
+    text is the text of a record ending with the "//" line.
+    If product is False, the "/product" feature is only looked for in the "source" feature.
+    Returns None if the record is irregular,
+    i.e. it cannot be parsed without the following records
+    """
+    locus = LOCUS_REGEX.search(text)
+    if not locus:
+        return None
+    features_line = FEATURES_REGEX.search(text, locus.end())
+    if not features_line:
+        return None
+    source = SOURCE_REGEX.search(text, features_line.end())
+    if not source:
+        return None
+    origin = ORIGIN_REGEX.search(text, source.end())
+    if not origin:
+        return None
+    # the sequence lines begin with the logical line after "ORIGIN"
+    sequence_start = LINE_START_REGEX.search(text, origin.end())
+    end = text.rfind("\n//") + 1
+    if (
+        not sequence_start
+        or end <= origin.start()
+        or not LAST_RECORD_END_REGEX.match(text, end)
+    ):
+        return None
+    sequence_text = text[sequence_start.start() + 1 : end]
+    if "//" in sequence_text:
+        # the sequence ends before the "//" line
+        return None
+
+    # collect the attributes
+    metadata: Dict[str, str] = {}
+    for line in join_lines(text[locus.start() : features_line.start()]):
+        # field name is the first word, value is the rest of the line
+        field, value = line.split(maxsplit=1)
+        # save only the first value of the field
+        metadata.setdefault(field.casefold(), value)
+
+    # collect the "source" features and the first "/product" feature
+    features: Dict[str, str] = {}
+    source_end = next_line_start(text, source.end(), origin.start())
+    source_line = join_lines(text[source.start() + 1 : source_end])[0]
+    for match in QUALIFIER_REGEX.finditer(source_line):
+        features.setdefault(match.group(1).casefold(), match.group(2))
+    if product and "product" not in features:
+        first_product = find_product(text, source.start() + 1, origin.start())
+        if first_product is not None:
+            features["product"] = first_product
+
+    return metadata, features, join_sequence(sequence_text)
+
+
+def read_span(
+    path: str,
+    encoding: str,
+    errors: str,
+    projection: "Projection",
+    span: Tuple[int, int],
+) -> Optional[Tuple[List[Record], List[str]]]:
+    """
+    Returns the records in the span of bytes of the Genbank flatfile at 'path'
+    with the fields of the projection and the messages of the warnings about them.
+
+    The span begins at a "LOCUS" line.
+    Returns None, if a record in the span is irregular
+    """
+    start, end = span
+    with open(path, "rb") as file:
+        file.seek(start)
+        data = file.read(end - start)
+    # decode the same way as the file opened for the conversion
+    texts = list(
+        record_texts(
+            io.StringIO(binary.normalize_newlines(data).decode(encoding, errors))
+        )
+    )
+    # the text after the last record can only contain the beginning of an irregular record
+    if LOCUS_REGEX.search(texts[-1]):
+        return None
+    parsed_records = []
+    for text in texts[:-1]:
+        parsed = parse_record(text, "product" in projection.optional)
+        if parsed is None:
+            return None
+        parsed_records.append(parsed)
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        records = list(GenbankFile._records(iter(parsed_records), projection))
+    return records, [str(warning.message) for warning in caught]
+
+
+def locus_starts(buffer: mmap.mmap) -> Iterator[int]:
+    """Yields the positions of the "LOCUS" lines in the buffer"""
+    if BYTES_FIRST_LOCUS_REGEX.match(buffer):
+        yield 0
+    for match in BYTES_LOCUS_REGEX.finditer(buffer):
+        yield match.start() + 1
+
+
+def locus_name(buffer: mmap.mmap, encoding: str, start: int) -> str:
+    """Returns the name in the "LOCUS" line at start"""
+    line_end = buffer.find(b"\n", start)
+    words = buffer[start : line_end if line_end >= 0 else len(buffer)].split()
+    return words[1].decode(encoding, "replace") if len(words) > 1 else ""
+
+
+def index_record(
+    buffer: mmap.mmap, encoding: str, start: int, end: int
+) -> gbindex.IndexEntry:
+    """
+    Returns the index entry of the record with the "LOCUS" line at start,
+    which is followed by the next "LOCUS" line at end.
+
+    Raises IrregularGenbankError, if parse_record would return None for the record
+    """
+    # the same checks as in parse_record
+    record_end = BYTES_RECORD_END_REGEX.search(buffer, start, end)
+    features_line = source = origin = sequence_start = None
+    if record_end:
+        features_line = BYTES_FEATURES_REGEX.search(buffer, start, record_end.start())
+    if record_end and features_line:
+        source = BYTES_SOURCE_REGEX.search(
+            buffer, features_line.end(), record_end.start()
+        )
+    if record_end and source:
+        origin = BYTES_ORIGIN_REGEX.search(buffer, source.end(), record_end.start())
+    if record_end and origin:
+        sequence_start = BYTES_LINE_START_REGEX.search(
+            buffer, origin.end(), record_end.end()
+        )
+    if (
+        not record_end
+        or not features_line
+        or not sequence_start
+        # the sequence ends before the "//" line
+        or buffer.find(b"//", sequence_start.start() + 1, record_end.start() + 1) >= 0
+    ):
+        raise gbindex.IrregularGenbankError(
+            f"The record '{locus_name(buffer, encoding, start)}' "
+            "can't be parsed without the following records"
+        )
+    # collect the fields as parse_record does
+    header = binary.normalize_newlines(buffer[start : features_line.start()])
+    metadata: Dict[str, str] = {}
+    for line in join_lines(header.decode(encoding, "replace")):
+        words = line.split(maxsplit=1)
+        if len(words) == 2:
+            metadata.setdefault(words[0].casefold(), words[1])
+    accession = metadata.get("accession", "").split(maxsplit=1)
+    return gbindex.IndexEntry(
+        accession[0] if accession else "",
+        start,
+        # the span includes the newline after "//"
+        min(record_end.end() + 1, len(buffer)),
+        metadata.get("definition", ""),
+    )
+
+
+def build_index(buffer: mmap.mmap, encoding: str) -> List[gbindex.IndexEntry]:
+    """
+    Returns the index of the Genbank flatfile in the buffer
+
+    Raises IrregularGenbankError, if a record can't be indexed
+    """
+    if BYTES_LONE_CR_REGEX.search(buffer):
+        raise gbindex.IrregularGenbankError("The lines of the file end with '\\r'")
+    starts = list(locus_starts(buffer))
+    return [
+        index_record(buffer, encoding, start, end)
+        for start, end in zip(starts, starts[1:] + [len(buffer)])
+    ]
 
 
 # field that need to be present in every record
@@ -261,6 +606,37 @@ gb_fields = [
     "variety",
 ]
 
+# the order of the values in the records
+gb_schema = Schema.get(["seqid", "sequence", *gb_required_fields, *gb_optional_fields])
+
+
+class Projection(NamedTuple):
+    """The fields of the records that are read"""
+
+    schema: Schema
+    # the fields that are read from the metadata and from the features
+    required: List[str]
+    optional: List[str]
+
+
+# all the fields
+gb_full_projection = Projection(gb_schema, gb_required_fields, gb_optional_fields)
+
+
+def gb_projection(fields: Optional[Collection[str]]) -> Projection:
+    """
+    Returns the projection to the fields, 'seqid' and 'sequence' are always read
+
+    Returns the projection to all the fields, if fields is None
+    """
+    if fields is None:
+        return gb_full_projection
+    required = [field for field in gb_required_fields if field in fields]
+    optional = [field for field in gb_optional_fields if field in fields]
+    return Projection(
+        Schema.get(["seqid", "sequence", *required, *optional]), required, optional
+    )
+
 
 class GenbankFile:
     """class for the Genbank flatfile"""
@@ -278,56 +654,262 @@ class GenbankFile:
         return "sequence", sequence[:20]
 
     @staticmethod
-    def read(file: TextIO) -> Tuple[List[str], Callable[[], Iterator[Record]]]:
-        """Genbank flatfile reader method"""
+    def _record(
+        metadata: Dict[str, str],
+        features: Dict[str, str],
+        sequence: str,
+        projection: Projection = gb_full_projection,
+    ) -> Optional[Record]:
+        """
+        Returns the record with the fields of the projection, or None if it has no definition
+        """
+        # initialize the record
+        try:
+            seqid = metadata["definition"]
+        except KeyError:
+            key, val = GenbankFile._identify_record(metadata, features, sequence)
+            warnings.warn(
+                f'The record with {key} "{val}" is missing the definition.'
+                "A seqid cannot be obtained. "
+                "Skipping"
+            )
+            return None
+        # write the fields of the record
+        values = [seqid, sequence]
+        values += [metadata.get(field, "") for field in projection.required]
+        values += [features.get(field, "") for field in projection.optional]
+        return Record.from_values(projection.schema, values)
 
-        def record_generator() -> Iterator[Record]:
-            # prepare the iterator over the logical lines
-            lines = logical_lines(file)
-            while True:
-                # collect the major attributes of a record
-                metadata = collect_metadata(lines)
-                if metadata is None:
-                    # EOF
-                    break
-                # read the features and the sequence
-                features = collect_features(lines)
-                if features is None:
-                    # EOF
-                    break
-                sequence = read_sequence(lines)
-                if sequence is None:
-                    # EOF
+    @staticmethod
+    def _parse_lines(
+        lines: Iterator[str],
+    ) -> Iterator[Tuple[Dict[str, str], Dict[str, str], str]]:
+        """Emits the metadata, the features and the sequence of the records in the logical lines"""
+        while True:
+            # collect the major attributes of a record
+            metadata = collect_metadata(lines)
+            if metadata is None:
+                # EOF
+                break
+            # read the features and the sequence
+            features = collect_features(lines)
+            if features is None:
+                # EOF
+                break
+            sequence = read_sequence(lines)
+            if sequence is None:
+                # EOF
+                break
+            yield metadata, features, sequence
+
+    @staticmethod
+    def _parse_file(
+        file: TextIO, product: bool = True
+    ) -> Iterator[Tuple[Dict[str, str], Dict[str, str], str]]:
+        """
+        Emits the metadata, the features and the sequence of the records in the file
+
+        The records are split at the "//" lines and parsed one by one.
+        From the first irregular record, the rest of the file is parsed line by line.
+        product is passed to parse_record
+        """
+        texts = record_texts(file)
+        for i, text in enumerate(texts):
+            parsed = parse_record(text, product)
+            if parsed is None:
+                lines = itertools.chain.from_iterable(
+                    io.StringIO(rest) for rest in itertools.chain([text], texts)
+                )
+                if i:
+                    # the lines after the previous record continue its "//" line
+                    lines = itertools.chain(["//\n"], lines)
+                yield from GenbankFile._parse_lines(logical_lines(lines))
+                return
+            yield parsed
+
+    @staticmethod
+    def _records(
+        parsed_records: Iterator[Tuple[Dict[str, str], Dict[str, str], str]],
+        projection: Projection,
+    ) -> Iterator[Record]:
+        """Emits the records of the parsed records, skipping those without definition"""
+        for metadata, features, sequence in parsed_records:
+            record = GenbankFile._record(metadata, features, sequence, projection)
+            if record is not None:
+                yield record
+
+    @staticmethod
+    def _file_records(file: TextIO, projection: Projection) -> Iterator[Record]:
+        """Emits the records in the file with the fields of the projection"""
+        return GenbankFile._records(
+            GenbankFile._parse_file(file, "product" in projection.optional),
+            projection,
+        )
+
+    @staticmethod
+    def _batches(
+        file: TextIO, jobs: int, projection: Projection
+    ) -> Iterator[List[Record]]:
+        """
+        Emits the records in the file with the fields of the projection in batches
+
+        If jobs > 1 and the file is an uncompressed regular file,
+        the file is split at the "LOCUS" lines and the parts are parsed by 'jobs' processes.
+        If a part contains an irregular record, the file is parsed by this process from that part
+        """
+        path = parallel.regular_file_path(file) if jobs > 1 else None
+        if path is None:
+            yield from batched(GenbankFile._file_records(file, projection))
+            return
+        spans = parallel.split_offsets(path, b"LOCUS", parallel.CHUNK_SIZE)
+        results = parallel.ordered_map(
+            functools.partial(read_span, path, file.encoding, file.errors, projection),
+            spans,
+            jobs,
+        )
+        for result, (start, end) in zip(results, spans):
+            if result is None:
+                # stop the processes
+                results.close()
+                file.seek(start)
+                yield from batched(GenbankFile._file_records(file, projection))
+                return
+            records, messages = result
+            # the warnings in the processes are not shown, so they are repeated here
+            for message in messages:
+                warnings.warn(message)
+            yield records
+            # the position of the file shows the progress
+            file.buffer.raw.seek(end)
+
+    @staticmethod
+    def _scan_selection(
+        parsed_records: Iterator[Tuple[Dict[str, str], Dict[str, str], str]],
+        select: Optional[List[str]],
+        record_range: Optional[Tuple[int, int]],
+    ) -> Iterator[Tuple[Dict[str, str], Dict[str, str], str]]:
+        """
+        Emits the selected parsed records from all the parsed records of a file
+
+        The selection is the same as with the index
+        """
+        if record_range is not None:
+            parsed_records = itertools.islice(parsed_records, *record_range)
+        if select is None:
+            yield from parsed_records
+            return
+        wanted = set(select)
+        by_accession: Dict[str, Tuple[Dict[str, str], Dict[str, str], str]] = {}
+        by_definition: Dict[str, Tuple[Dict[str, str], Dict[str, str], str]] = {}
+        for parsed in parsed_records:
+            metadata = parsed[0]
+            accession = metadata.get("accession", "").split(maxsplit=1)
+            if accession and accession[0] in wanted:
+                by_accession.setdefault(accession[0], parsed)
+                if len(by_accession) == len(wanted):
                     break
-                # initialize the record
+            if metadata.get("definition", "") in wanted:
+                by_definition.setdefault(metadata["definition"], parsed)
+        # the accessions are looked up before the definitions
+        found = {**by_definition, **by_accession}
+        report_missing([name for name in select if name not in found])
+        yield from (found[name] for name in select if name in found)
+
+    @staticmethod
+    def _selected_batches(
+        file: TextIO,
+        select: Optional[List[str]],
+        record_range: Optional[Tuple[int, int]],
+        projection: Projection,
+    ) -> Iterator[List[Record]]:
+        """
+        Emits the selected records of the file with the fields of the projection in batches
+
+        select is a list of accessions (the first word of the ACCESSION field)
+        or definitions, the records are emitted in its order.
+        record_range is a pair (start, stop) of positions of records in the file, as in a slice.
+
+        Regular files are read through the index in the file with the extension '.gbi',
+        which is created, if it's missing or outdated.
+        Otherwise, or if the file can't be indexed, the whole file is read
+        """
+        if record_range is not None and min(record_range) < 0:
+            raise ValueError("The range of records cannot contain negative positions")
+        path = parallel.regular_file_path(file)
+        buffer = binary.map_file(file) if path is not None else None
+        if path is not None and buffer is not None:
+            with buffer:
                 try:
-                    seqid = metadata["definition"]
-                except KeyError:
-                    key, val = GenbankFile._identify_record(
-                        metadata, features, sequence
+                    entries = gbindex.load_index(
+                        path, buffer, file.encoding, build_index
                     )
+                except gbindex.IrregularGenbankError as ex:
                     warnings.warn(
-                        f'The record with {key} "{val}" is missing the definition.'
-                        "A seqid cannot be obtained. "
-                        "Skipping"
+                        f"The file can't be indexed, so it's read completely. {ex}"
                     )
-                    continue
-                record = Record(seqid=seqid, sequence=sequence)
-                # write the fields of the record
-                for field in gb_required_fields:
-                    try:
-                        record[field] = metadata[field]
-                    except KeyError:
-                        record[field] = ""
-                for field in gb_optional_fields:
-                    try:
-                        record[field] = features[field]
-                    except KeyError:
-                        record[field] = ""
-                yield record
+                else:
+                    entries, missing = gbindex.select_entries(
+                        entries, select, record_range
+                    )
+                    report_missing(missing)
+                    yield from batched(
+                        record
+                        for entry in entries
+                        for record in GenbankFile._file_records(
+                            io.StringIO(
+                                binary.normalize_newlines(
+                                    buffer[entry.start : entry.end]
+                                ).decode(file.encoding, file.errors)
+                            ),
+                            projection,
+                        )
+                    )
+                    file.seek(0, io.SEEK_END)
+                    return
+        parsed_records = GenbankFile._scan_selection(
+            GenbankFile._parse_file(file, "product" in projection.optional),
+            select,
+            record_range,
+        )
+        yield from batched(GenbankFile._records(parsed_records, projection))
+
+    @staticmethod
+    def _option_batches(
+        file: TextIO, options: Dict[str, Any]
+    ) -> Iterator[List[Record]]:
+        """
+        Emits the records in the file in batches, using the options of the reader
+
+        The records only have the fields, that are used by the writer
+        """
+        select = options.get("select")
+        record_range = options.get("record_range")
+        projection = gb_projection(projected_fields(gb_fields, options))
+        if select is None and record_range is None:
+            return GenbankFile._batches(file, options.get("jobs", 1), projection)
+        return GenbankFile._selected_batches(file, select, record_range, projection)
+
+    read_takes_kwargs = True
+
+    @staticmethod
+    def read(
+        file: TextIO, **options: Any
+    ) -> Tuple[List[str], Callable[[], Iterator[Record]]]:
+        """Genbank flatfile reader method"""
+
+        def record_generator() -> Iterator[Record]:
+            for batch in GenbankFile._option_batches(file, options):
+                yield from batch
 
         return gb_fields, record_generator
 
+    @staticmethod
+    def read_batches(
+        file: TextIO, **options: Any
+    ) -> Tuple[List[str], Callable[[], Iterator[List[Record]]]]:
+        """Genbank flatfile batch reader method"""
+        return gb_fields, lambda: GenbankFile._option_batches(file, options)
+
     @staticmethod
     def write(_: Any) -> None:
         """Genbank flatfile cannot be written"""
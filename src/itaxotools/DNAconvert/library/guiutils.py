@@ -1,5 +1,11 @@
+import dataclasses
+import threading
 import tkinter as tk
 import tkinter.ttk as ttk
+from typing import Any, Callable, List, Optional
+
+from .progress import CancelToken, Progress
+from .utils import collect_warnings
 
 
 class ScrolledText():
@@ -24,3 +30,61 @@ class ScrolledText():
         self.vbar.grid(row=1, column=1, sticky='nsew')
         self.hbar.grid(row=2, column=0, sticky='nsew')
         self.grid = self.frame.grid
+
+
+class ConversionThread(threading.Thread):
+    """
+    Runs a conversion in the background, so that the window stays responsive
+
+    convert is called with the 'progress' and 'cancel' options.
+    The main thread polls the attributes:
+        progress: the last reported Progress or None
+        warnings: the messages of the warnings, once the thread is finished
+        error: the exception that stopped the conversion, once the thread is finished
+    """
+
+    def __init__(self, convert: Callable[..., None]) -> None:
+        # the thread doesn't keep the program running after the window is closed
+        super().__init__(daemon=True)
+        self._convert = convert
+        self.token = CancelToken()
+        self.progress: Optional[Progress] = None
+        self.warnings: List[str] = []
+        self.error: Optional[BaseException] = None
+
+    def _report(self, progress: Progress) -> None:
+        # the conversion updates the progress in place
+        self.progress = dataclasses.replace(progress)
+
+    def run(self) -> None:
+        # catch_warnings would replace the warnings handler of the main thread
+        with collect_warnings() as messages:
+            try:
+                self._convert(progress=self._report, cancel=self.token)
+            except Exception as ex:
+                self.error = ex
+        self.warnings = messages
+
+    def cancel(self) -> None:
+        self.token.cancel()
+
+
+def progress_text(progress: Optional[Progress]) -> str:
+    """Describes the progress of a conversion for the status line"""
+    if progress is None:
+        return "Starting..."
+    parts = [f"{progress.records} records"]
+    if progress.elapsed > 0:
+        parts.append(f"{progress.records / progress.elapsed:.0f} records/s")
+    if progress.files_total > 1:
+        current = min(progress.files_done + 1, progress.files_total)
+        parts.append(f"file {current} of {progress.files_total}")
+    if progress.remaining is not None:
+        parts.append(f"{progress.remaining:.0f} s left")
+    return ", ".join(parts)
+
+
+def set_enabled(widgets: List[Any], enabled: bool) -> None:
+    """Enables or disables the ttk widgets"""
+    for widget in widgets:
+        widget.state(["!disabled"] if enabled else ["disabled"])
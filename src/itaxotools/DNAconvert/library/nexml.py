@@ -13,12 +13,17 @@ class NeXMLFile:
 
     write_takes_kwargs = True
 
+    @staticmethod
+    def consumed_fields(fields: List[str]) -> List[str]:
+        """Returns the fields of the records, that the writer uses"""
+        return NameAssembler.used_fields(fields) + ["sequence"]
+
     @staticmethod
     def write(file: TextIO, fields: List[str], **options: bool) -> Generator:
         """NeXML writer method"""
 
         name_assembler = NameAssembler(
-            fields, preserve_special=options.preserve_special
+            fields, preserve_special=options.get("preserve_special", False)
         )
         sequence_dict: Dict[str, str] = {}
 
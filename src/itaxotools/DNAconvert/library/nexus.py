@@ -8,25 +8,63 @@ from typing import (
     Set,
     ClassVar,
     Generator,
-    DefaultDict,
+    Dict,
+    Union,
+    BinaryIO,
 )
 from .record import *
 from .utils import *
-from collections import defaultdict
+import array
+import io
+import os
 import re
-import nexus as python_nexus
+import shutil
+import stat
+import tempfile
+
+# the size of the blocks read by the Tokenizer
+BLOCK_SIZE = 1 << 20
+
+# whitespace followed by a word, a punctuation character, a quoted value or the beginning of a comment
+TOKEN_REGEX = re.compile(
+    r"(\s*)(?:(?P<word>[^\s=;\[']+)|(?P<punctuation>[=;])|(?P<quoted>'(?:[^']|'')*'(?!'))|(?P<comment>\[))"
+)
+
+# the brackets that begin and end the comments
+BRACKET_REGEX = re.compile(r"[\[\]]")
+
+# the tokens of the text without quoted values and comments
+SIMPLE_TOKEN_REGEX = re.compile(r"[^\s=;]+|[=;]")
+
+# the beginning of a quoted value or a comment
+SPECIAL_REGEX = re.compile(r"['\[]")
+
+# the command that begins a block, as a separate word
+BEGIN_REGEX = re.compile(r"(?<![^\s;\]])begin\s+([^\s;\[']+)\s*;", flags=re.IGNORECASE)
+
+# the command that ends a block
+END_REGEX = re.compile(r"end(?:block)?(?=[\s;\[])", flags=re.IGNORECASE)
+
+# the text of a skipped block with its comments without nested comments,
+# followed by the end of a command, the beginning of a quoted value or another comment
+SKIP_REGEX = re.compile(r"[^;'\[]*(?:\[[^\[\]]*\][^;'\[]*)*([;'\[])")
+
+# the whitespace and the comments without nested comments before a command
+COMMAND_START_REGEX = re.compile(r"\s*(?:\[[^\[\]]*\]\s*)*")
 
 
 class Tokenizer:
     """
     Token iterator for the NEXUS format
 
-    Emits the stream of words and punctuation
-    """
+    Emits the stream of words and punctuation.
+    The file is read in blocks, which are split into tokens with regular expressions.
 
-    punctuation: ClassVar[Set[str]] = set("=;")
+    If consumed_blocks is given, the NEXUS blocks with other names are skipped:
+    only their 'begin' and 'end' commands are emitted
+    """
 
-    def __init__(self, file: TextIO):
+    def __init__(self, file: TextIO, consumed_blocks: Optional[Set[str]] = None):
         """
         Iterate over the token in 'file'
         """
@@ -36,123 +74,157 @@ class Tokenizer:
             raise ValueError("The input file is not a nexus file")
         # contains the underlying file
         self.file = file
-        # the currently read token
-        self.token: List[str] = []
-        # the currently read line
-        self.line = ""
-        # the reading position in the line
-        self.line_pos = 0
-
-    def peek_char(self) -> Optional[str]:
-        """
-        Returns the next char, without advancing the position.
-        Returns None, if EOF is reached
-        """
-        try:
-            c = self.line[self.line_pos]
-            return c
-        except IndexError:
-            # line_pos is self.line.len()
-            # it's equivalent to 0 in the next line
-            self.line = self.file.readline()
-            if self.line == "":
-                # EOF is reached
-                return None
-            self.line_pos = 0
-            c = self.line[0]
-            return c
-
-    def get_char(self) -> Optional[str]:
-        """
-        Emits a char, advancing the reading
-        Returns None, if EOF is reached
-        """
-        c = self.peek_char()
-        self.line_pos += 1
-        return c
-
-    def replace_token(self, token: List[str]) -> str:
-        """
-        Remember the next token and return the str representation of the current one
-        """
-        self.token, token = token, self.token
-        return "".join(token)
-
-    def skip_comment(self) -> None:
-        """
-        Advance the iterator past the end of a comment
-        """
-        while True:
-            c = self.get_char()
-            if c is None:
-                # EOF is reached, should not happen in a well-formed file
-                raise ValueError("Nexus: EOF inside a comment")
-            elif c == "[":
-                # comment inside a comment
-                self.skip_comment
-            elif c == "]":
-                # end of the comment
-                break
-
-    def read_quoted(self) -> List[str]:
-        """
-        Reads a quoted string as one token
-        """
-        s = []
+        # the casefolded names of the blocks that are not skipped
+        self.consumed_blocks = consumed_blocks
+        self._tokens = self._read_tokens()
+
+    def _read_tokens(self) -> Iterator[str]:
+        # the parts of the current token, the comments inside a token don't split it
+        parts: List[str] = []
+        buffer = ""
+        pos = 0
+        eof = False
+        # the nesting level of the comment being skipped
+        depth = 0
+        # the state of the block being skipped
+        skipping = False
+        command_start = False
+        quoted = False
         while True:
-            c = self.get_char()
-            if c is None:
-                # EOF is reached, should not happen in a well-formed file
-                raise ValueError("Nexus: EOF inside a quoted value")
-            elif c == "'":
-                # possible end of the quoted value
-                if self.peek_char == "'":
-                    # '' is ', and not the end
-                    s += ["'"]
+            if depth:
+                # advance past the end of the comment, which can contain other comments
+                for bracket in BRACKET_REGEX.finditer(buffer, pos):
+                    depth += 1 if bracket.group() == "[" else -1
+                    if not depth:
+                        pos = bracket.end()
+                        break
+                else:
+                    if eof:
+                        # should not happen in a well-formed file
+                        raise ValueError("Nexus: EOF inside a comment")
+                    # the rest of the comment is in the next blocks
+                    buffer = self.file.read(BLOCK_SIZE)
+                    pos = 0
+                    eof = not buffer
+                continue
+            if skipping:
+                if quoted:
+                    # '' is two quoted values for skipping
+                    quote = buffer.find("'", pos)
+                    if quote < 0:
+                        if eof:
+                            # should not happen in a well-formed file
+                            raise ValueError("Nexus: EOF inside a quoted value")
+                        buffer = self.file.read(BLOCK_SIZE)
+                        pos = 0
+                        eof = not buffer
+                        continue
+                    pos = quote + 1
+                    quoted = False
+                    continue
+                if command_start:
+                    command_start_match = COMMAND_START_REGEX.match(buffer, pos)
+                    # the whitespace and the comments can be empty
+                    assert command_start_match is not None
+                    pos = command_start_match.end()
+                    if pos + len("endblock;") > len(buffer) and not eof:
+                        # the name of the command can be in the next block
+                        block = self.file.read(BLOCK_SIZE)
+                        buffer = buffer[pos:] + block
+                        pos = 0
+                        eof = not block
+                        continue
+                    if END_REGEX.match(buffer, pos):
+                        # the end command is tokenized
+                        skipping = False
+                        continue
+                    # a nested comment is skipped before the command
+                    command_start = buffer.startswith("[", pos)
+                special = SKIP_REGEX.match(buffer, pos)
+                if special is None:
+                    if eof:
+                        return
+                    buffer = self.file.read(BLOCK_SIZE)
+                    pos = 0
+                    eof = not buffer
+                    continue
+                pos = special.end()
+                if special.group(1) == ";":
+                    command_start = True
+                elif special.group(1) == "'":
+                    quoted = True
                 else:
-                    # the end of the line
-                    return s
+                    depth = 1
+                continue
+            if not parts:
+                # the lines before the next quoted value or comment are split at once
+                special = SPECIAL_REGEX.search(buffer, pos)
+                limit = special.start() if special else len(buffer)
+                end = (
+                    limit if eof and not special else buffer.rfind("\n", pos, limit) + 1
+                )
+                if self.consumed_blocks is not None:
+                    for begin in BEGIN_REGEX.finditer(buffer, pos, limit):
+                        if begin.group(1).casefold() not in self.consumed_blocks:
+                            # the block is skipped after its begin command
+                            yield from SIMPLE_TOKEN_REGEX.findall(
+                                buffer, pos, begin.end()
+                            )
+                            pos = begin.end()
+                            skipping = command_start = True
+                            break
+                    if skipping:
+                        continue
+                if end > pos:
+                    yield from SIMPLE_TOKEN_REGEX.findall(buffer, pos, end)
+                    pos = end
+            match = TOKEN_REGEX.match(buffer, pos)
+            # a token can continue in the next block,
+            # and a quoted value, if the next character is a quote
+            if match is None or (match.end() + 1 >= len(buffer) and not eof):
+                if eof:
+                    if buffer[pos:].strip():
+                        # should not happen in a well-formed file
+                        raise ValueError("Nexus: EOF inside a quoted value")
+                    if parts:
+                        yield "".join(parts)
+                    return
+                block = self.file.read(BLOCK_SIZE)
+                buffer = buffer[pos:] + block
+                pos = 0
+                eof = not block
+                continue
+            if match.group(1) and parts:
+                # the whitespace ends the token
+                yield "".join(parts)
+                parts = []
+            pos = match.end()
+            kind = match.lastgroup
+            if kind == "word":
+                parts.append(match.group(kind))
+            elif kind == "punctuation":
+                # punctuation is a token by itself
+                if parts:
+                    yield "".join(parts)
+                    parts = []
+                yield match.group(kind)
+            elif kind == "quoted":
+                # a quoted value begins a new token, the word after it continues the token
+                if parts:
+                    yield "".join(parts)
+                    parts = []
+                # '' is ', and not the end
+                parts.append(match.group(kind)[1:-1].replace("''", "'"))
             else:
-                # update the line
-                s += [c]
+                # a comment => skip it
+                depth = 1
 
     def __iter__(self) -> "Tokenizer":
         """Tokenizer is an Iterator"""
         return self
 
     def __next__(self) -> str:
-        if self.token:
-            # the is a previously saved token
-            return self.replace_token([])
-        while True:
-            c = self.get_char()
-            if c is None:
-                # EOF => return the last token
-                if self.token:
-                    "".join(self.token)
-                else:
-                    raise StopIteration
-            elif c in Tokenizer.punctuation:
-                # punctuation is a token by itself => save it into the token
-                token = self.replace_token([c])
-                if token:
-                    return token
-            elif c == "[":
-                # a comment => skip it
-                self.skip_comment()
-            elif c == "'":
-                # a quoted value => read it and save into the token
-                token = self.replace_token(self.read_quoted())
-                if token:
-                    return token
-            elif c.isspace():
-                # whitespace => return the token, if it's the first whitespace
-                if self.token:
-                    token = self.replace_token([])
-                    return token
-            else:
-                # otherwise => update the token
-                self.token.append(c)
+        return next(self._tokens)
 
     @staticmethod
     def print_tokens(path: str) -> None:
@@ -169,11 +241,13 @@ class NexusCommands:
     Iterator that emits NEXUS command as a tuple of the command name and the arguments' iterator
     """
 
-    def __init__(self, file: TextIO):
+    def __init__(self, file: TextIO, consumed_blocks: Optional[Set[str]] = None):
         """
         Iterate over the commands in 'file'
+
+        The blocks with names not in consumed_blocks are skipped, if it's given
         """
-        self.tokenizer = Tokenizer(file)
+        self.tokenizer = Tokenizer(file, consumed_blocks)
 
     def __iter__(self) -> "NexusCommands":
         """
@@ -215,6 +289,9 @@ class NexusReader:
     A virtual machine that executes NEXUS command and emits the sequences in the file
     """
 
+    # the blocks that can contain a matrix of sequences, the other blocks are skipped
+    consumed_blocks: ClassVar[Set[str]] = {"data", "characters", "unaligned"}
+
     def __init__(self) -> None:
         self.block_reset()
 
@@ -286,18 +363,78 @@ class NexusReader:
         else:
             return self.sequences_noninterleaved(args)
 
-    @staticmethod
-    def sequences_interleaved(args: Iterator[str]) -> Iterator[Tuple[str, str]]:
-        matrix: DefaultDict[str, str] = defaultdict(str)
+    def sequences_interleaved(self, args: Iterator[str]) -> Iterator[Tuple[str, str]]:
+        """
+        Emits the sequences of an interleaved matrix in the order of their first appearance
+
+        The fragments of each sequence are joined once.
+        If nchar is known, the sequences are emitted as soon as they are complete,
+        once the second block of the matrix has repeated all the taxa of the first block in the same order,
+        and the first block is shorter than nchar. Otherwise, the repeated taxa may belong to a single block,
+        so the fragments are appended to them and the sequences are emitted at the end of the matrix.
+        Raises ValueError, if an emitted sequence continues in a later block
+        """
+        # 0, if nchar is unknown
+        nchar = self.nchar or 0
+        # the fragments of the sequences that are not emitted yet and the lengths of the sequences
+        fragments: Dict[str, List[str]] = {}
+        lengths: Dict[str, int] = {}
+        # the taxa of the first block in order, while the blocks are being checked
+        first_block: List[str] = []
+        # the number of the taxa of the second block that repeat the first block, once it has started
+        repeated: Optional[int] = None
+        # the blocks are checked only if the sequences could be emitted early
+        checking = nchar > 0
+        streaming = False
+        # the taxa whose sequences are emitted
+        emitted: Set[str] = set()
         for arg in args:
             try:
-                matrix[arg] += next(args)
+                fragment = next(args)
             except StopIteration:
                 # expects the value to come in pairs (name, sequence)
                 raise ValueError(
                     f"In the Nexus file: {arg} has no corresponding sequence"
                 )
-        return iter(matrix.items())
+            if checking and repeated is None and arg in fragments:
+                # the second block starts with the first taxon
+                # and a regular interleaved matrix needs more than one block
+                if arg == first_block[0] and all(
+                    lengths[taxon] < nchar for taxon in first_block
+                ):
+                    repeated = 0
+                else:
+                    checking = False
+            if checking and repeated is None:
+                first_block.append(arg)
+            elif checking and repeated is not None:
+                if arg != first_block[repeated]:
+                    checking = False
+                else:
+                    repeated += 1
+                    if repeated == len(first_block):
+                        # the second block is complete
+                        streaming = True
+                        checking = False
+            if arg in emitted:
+                # the emitted sequence would be split into two records
+                raise ValueError(
+                    f"In the Nexus file: the sequence of {arg} is longer than nchar"
+                )
+            fragments.setdefault(arg, []).append(fragment)
+            lengths[arg] = lengths.get(arg, 0) + len(fragment)
+            if not streaming:
+                continue
+            # emit the complete sequences at the beginning of the matrix
+            while fragments:
+                seqid = next(iter(fragments))
+                if lengths[seqid] < nchar:
+                    break
+                emitted.add(seqid)
+                yield (seqid, "".join(fragments.pop(seqid)))
+        # the sequences are incomplete or nchar is unknown
+        for seqid, parts in fragments.items():
+            yield (seqid, "".join(parts))
 
     def sequences_noninterleaved(
         self, args: Iterator[str]
@@ -308,10 +445,48 @@ class NexusReader:
             )
         for arg in args:
             seqid = arg
-            sequence = ""
-            while len(sequence) < self.nchar:
-                sequence += next(args)
-            yield (seqid, sequence)
+            # the fragments of the sequence are joined once
+            fragments = []
+            length = 0
+            while length < self.nchar:
+                try:
+                    fragment = next(args)
+                except StopIteration:
+                    raise ValueError(
+                        f"In the Nexus file: the sequence of {seqid} is shorter than nchar"
+                    )
+                fragments.append(fragment)
+                length += len(fragment)
+            yield (seqid, "".join(fragments))
+
+
+def is_patchable(file: TextIO) -> bool:
+    """
+    Checks that file is a regular file that can be read and written at any position
+    """
+    try:
+        return (
+            file.seekable()
+            and file.readable()
+            and stat.S_ISREG(os.fstat(file.fileno()).st_mode)
+        )
+    except (AttributeError, OSError):
+        return False
+
+
+def read_lengths(lengths_file: BinaryIO) -> Iterator[int]:
+    """
+    Reads the lengths written as arrays of type 'Q'
+    """
+    while True:
+        lengths = array.array("Q")
+        try:
+            lengths.fromfile(lengths_file, BATCH_SIZE)
+        except EOFError:
+            # the last lengths are still read
+            yield from lengths
+            return
+        yield from lengths
 
 
 def seqid_max_reducer(acc: int, record: Record) -> int:
@@ -341,57 +516,136 @@ begin data;
         """the NEXUS reader method"""
         # NEXUS always have the same fields
         fields = ["seqid", "sequence"]
+        # all the records share the same schema
+        schema = Schema.get(fields)
 
         def record_generator() -> Iterator[Record]:
             # create the virtual machine
             nexus_reader = NexusReader()
             # execute all the commands in the file
-            for command, args in NexusCommands(file):
+            for command, args in NexusCommands(file, NexusReader.consumed_blocks):
                 records = nexus_reader.execute(command, args)
                 if records is not None:
                     # capture the records
                     for seqid, sequence in records:
-                        yield Record(seqid=seqid, sequence=sequence)
+                        yield Record.from_values(schema, [seqid, sequence])
 
         return fields, record_generator
 
     write_takes_kwargs = True
 
+    @staticmethod
+    def consumed_fields(fields: List[str]) -> List[str]:
+        """Returns the fields of the records, that the writer uses"""
+        return NameAssembler.used_fields(fields) + ["sequence"]
+
+    # the space reserved for the dimensions command, when it's written after the matrix
+    dimensions_width = len("dimensions Nchar= Ntax=;") + 2 * 20
+
+    # the output file is opened for reading, since the matrix is reread when it's patched
+    reads_output = True
+
     @staticmethod
     def write(file: TextIO, fields: List[str], **options: bool) -> Generator:
         """the NEXUS writer method"""
-        # aggregate minimum sequence length, maximum sequence length and the maximum seqid length
-        aggregator = PhylipAggregator((0, seqid_max_reducer))
+        return record_writer(NexusFile.write_batches(file, fields, **options))
+
+    @staticmethod
+    def write_batches(file: TextIO, fields: List[str], **options: bool) -> Generator:
+        """
+        the NEXUS batch writer method
+
+        If the option 'low_memory' is set, the records are not kept in memory.
+        If file is a regular file open for reading and writing, the matrix is written as the records arrive
+        and the dimensions command is filled in at the end.
+        Otherwise the records are collected in a temporary file
+        """
         # assembles the seqid
         name_assembler = NameAssembler(
-            fields, preserve_special=options.preserve_special
+            fields, preserve_special=options.get("preserve_special", False)
         )
         # makes the seqid unique within 100 characters
         unicifier = Unicifier(100)
 
+        def assign_seqids(batch: List[Record]) -> None:
+            for record in batch:
+                record["seqid"] = unicifier.unique(name_assembler.name(record))
+
+        if options.get("low_memory") and is_patchable(file):
+            yield from NexusFile._write_patched(file, assign_seqids)
+            return
+
+        # aggregate minimum sequence length, maximum sequence length and the maximum seqid length
+        aggregator = PhylipAggregator((0, seqid_max_reducer))
+
         # collect the record and aggregate the information
-        records = []
-        while True:
-            try:
-                record = yield
-            except GeneratorExit:
-                break
-            # the seqid needs to be generated before using the aggregator
-            record["seqid"] = unicifier.unique(name_assembler.name(record))
-            aggregator.send(record)
-            records.append(record)
+        records: Union[List[Record], RecordSpool] = (
+            RecordSpool() if options.get("low_memory") else []
+        )
+        try:
+            while True:
+                try:
+                    batch = yield
+                except GeneratorExit:
+                    break
+                # the seqid needs to be generated before using the aggregator
+                assign_seqids(batch)
+                for record in batch:
+                    aggregator.send(record)
+                records.extend(batch)
+
+            # extract the aggregated information
+            [max_length, min_length, seqid_max_length] = aggregator.results()
+
+            # pads the sequences with '-'
+            aligner = dna_aligner(max_length, min_length)
+
+            # write the beginning
+            print(NexusFile.nexus_preamble, file=file)
+
+            # print the dimensions command
+            print(f"dimensions Nchar={max_length} Ntax={len(records)};", file=file)
+
+            # print the format command
+            print(NexusFile.nexus_format_line, file=file)
+
+            file.write("\n")
+
+            # print the matrix command
+            print("matrix", file=file)
+            for batch in batched(records):
+                file.write(
+                    "".join(
+                        [
+                            f"{record['seqid'].ljust(seqid_max_length)} {aligner(record['sequence'])}\n"
+                            for record in batch
+                        ]
+                    )
+                )
 
-        # extract the aggregated information
-        [max_length, min_length, seqid_max_length] = aggregator.results()
+            # finish the block
+            print(";\n", file=file)
+            print("end;", file=file)
+        finally:
+            if isinstance(records, RecordSpool):
+                records.close()
 
-        # pads the sequences with '-'
-        aligner = dna_aligner(max_length, min_length)
+    @staticmethod
+    def _write_patched(
+        file: TextIO, assign_seqids: Callable[[List[Record]], None]
+    ) -> Generator:
+        """
+        Writes the matrix as the batches arrive and fills in the dimensions command at the end
 
+        The seqids are not aligned.
+        If the sequences have different lengths, the matrix is rewritten with padded sequences
+        """
         # write the beginning
         print(NexusFile.nexus_preamble, file=file)
 
-        # print the dimensions command
-        print(f"dimensions Nchar={max_length} Ntax={len(records)};", file=file)
+        # reserve the space for the dimensions command
+        dimensions_position = file.tell()
+        print(" " * NexusFile.dimensions_width, file=file)
 
         # print the format command
         print(NexusFile.nexus_format_line, file=file)
@@ -400,17 +654,69 @@ begin data;
 
         # print the matrix command
         print("matrix", file=file)
-        for record in records:
-            print(
-                record["seqid"].ljust(seqid_max_length),
-                aligner(record["sequence"]),
-                file=file,
-            )
+        matrix_position = file.tell()
+
+        count = 0
+        max_length = 0
+        min_length: Optional[int] = None
+        # the lengths of the sequences are needed, if the matrix is rewritten
+        with tempfile.TemporaryFile() as lengths_file:
+            while True:
+                try:
+                    batch = yield
+                except GeneratorExit:
+                    break
+                assign_seqids(batch)
+                lengths = array.array(
+                    "Q", [len(record["sequence"]) for record in batch]
+                )
+                lengths.tofile(lengths_file)
+                count += len(batch)
+                max_length = max(max_length, max(lengths))
+                min_length = (
+                    min(min_length, min(lengths))
+                    if min_length is not None
+                    else min(lengths)
+                )
+                file.write(
+                    "".join(
+                        [
+                            f"{record['seqid']} {record['sequence']}\n"
+                            for record in batch
+                        ]
+                    )
+                )
+
+            if max_length != min_length and min_length is not None:
+                # pads the sequences with '-'
+                aligner = dna_aligner(max_length, min_length)
+                lengths_file.seek(0)
+                with tempfile.TemporaryFile(mode="w+") as matrix:
+                    # move the matrix away
+                    file.seek(matrix_position)
+                    shutil.copyfileobj(file, matrix)
+                    matrix.seek(0)
+                    file.seek(matrix_position)
+                    file.truncate()
+                    # write it back with the padded sequences
+                    for line, length in zip(matrix, read_lengths(lengths_file)):
+                        # each line is the seqid, a space and the sequence
+                        start = len(line) - 1 - length
+                        file.write(f"{line[:start]}{aligner(line[start:-1])}\n")
 
         # finish the block
         print(";\n", file=file)
         print("end;", file=file)
 
+        # fill in the dimensions command
+        file.seek(dimensions_position)
+        file.write(
+            f"dimensions Nchar={max_length} Ntax={count};".ljust(
+                NexusFile.dimensions_width
+            )
+        )
+        file.seek(0, io.SEEK_END)
+
 
 class NexusFileSimple(NexusFile):
 
@@ -424,6 +730,8 @@ class NexusFileSimple(NexusFile):
         fields = ["seqid", "sequence"]
 
         def record_generator() -> Iterator[Record]:
+            import nexus as python_nexus
+
             nexus_file = python_nexus.NexusReader.from_file(file.name)
             if "data" in nexus_file.blocks:
                 for seqid, sequence in nexus_file.data.matrix.items():
@@ -0,0 +1,78 @@
+import collections
+import io
+import mmap
+import os
+import stat
+from typing import Optional, TextIO, List, Tuple, Callable, Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# the approximate size in bytes of the part of a file parsed by one task
+CHUNK_SIZE = 1 << 24
+
+
+def regular_file_path(file: TextIO) -> Optional[str]:
+    """
+    Returns the path of 'file', if it's an uncompressed regular file
+    opened in text mode from which nothing has been read yet.
+    Returns None otherwise
+    """
+    raw = getattr(getattr(file, "buffer", None), "raw", None)
+    if not isinstance(raw, io.FileIO) or not isinstance(raw.name, str):
+        return None
+    if not stat.S_ISREG(os.fstat(raw.fileno()).st_mode):
+        return None
+    if raw.tell() != 0 or file.tell() != 0:
+        return None
+    return raw.name
+
+
+def split_offsets(path: str, marker: bytes, chunk_size: int) -> List[Tuple[int, int]]:
+    """
+    Splits the file into spans of about chunk_size bytes
+
+    Each span, except the first one, starts at a line that begins with marker
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    starts = [0]
+    with open(path, "rb") as file, mmap.mmap(
+        file.fileno(), 0, access=mmap.ACCESS_READ
+    ) as buffer:
+        position = chunk_size
+        while position < size:
+            # the next record begins after the newline
+            i = buffer.find(b"\n" + marker, position - 1)
+            if i < 0:
+                break
+            starts.append(i + 1)
+            position = i + 1 + chunk_size
+    return list(zip(starts, starts[1:] + [size]))
+
+
+def ordered_map(
+    function: Callable[[T], R], tasks: Iterable[T], jobs: int
+) -> Iterator[R]:
+    """
+    Applies function to the tasks in 'jobs' processes and yields the results in the order of the tasks
+
+    At most 2 * jobs tasks are submitted ahead of the consumer
+    """
+    # imported here, because it slows down the start of single-process conversions
+    import concurrent.futures
+
+    pending: collections.deque = collections.deque()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+        try:
+            for task in tasks:
+                pending.append(executor.submit(function, task))
+                if len(pending) >= 2 * jobs:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            # the consumer has stopped early or a task has failed
+            for future in pending:
+                future.cancel()
@@ -1,7 +1,17 @@
 import warnings
 from .utils import *
 from .record import *
-from typing import TextIO, Tuple, List, Callable, Iterator, Generator
+from typing import (
+    TextIO,
+    Tuple,
+    List,
+    Callable,
+    Iterator,
+    Generator,
+    Iterable,
+    Any,
+    Union,
+)
 
 
 class RelPhylipFile:
@@ -16,6 +26,8 @@ class RelPhylipFile:
         """
         # Phylip always have the same fields
         fields = ["seqid", "sequence"]
+        # all the records share the same schema
+        schema = Schema.get(fields)
 
         def record_generator() -> Iterator[Record]:
             # skip the first line
@@ -28,45 +40,101 @@ class RelPhylipFile:
                 # separate name and sequence
                 name, _, sequence = line.partition(" ")
                 # return the record
-                yield Record(seqid=name, sequence=sequence)
+                yield Record.from_values(schema, [name, sequence])
 
         return fields, record_generator
 
     write_takes_kwargs = True
 
     @staticmethod
-    def write(file: TextIO, fields: List[str], **options: bool) -> Generator:
+    def consumed_fields(fields: List[str]) -> List[str]:
+        """Returns the fields of the records, that the writer uses"""
+        return NameAssembler.used_fields(fields) + ["sequence"]
+
+    @staticmethod
+    def prescan(fields: List[str], **options: Any) -> Aggregator:
+        """
+        Returns the aggregator for the information needed before writing the first record
+        """
+        return PhylipAggregator((0, count_reducer))
+
+    @staticmethod
+    def write(file: TextIO, fields: List[str], **options: Any) -> Generator:
         """
         the writer method for the relaxed Phylip format
         """
-        # aggregate information about minumum and maximum length of the sequences
-        aggregator = PhylipAggregator()
-        records = []
-
-        while True:
-            try:
-                record = yield
-            except GeneratorExit:
-                break
-            aggregator.send(record)
-            records.append(record)
-
-        # extract the aggregate information
-        [max_length, min_length] = aggregator.results()
-
-        # formats all the sequences to the same maximum length
-        aligner = dna_aligner(max_length, min_length)
-        # generate the seqid from the fields
-        name_assembler = NameAssembler(
-            fields, preserve_special=options.preserve_special
+        return record_writer(RelPhylipFile.write_batches(file, fields, **options))
+
+    @staticmethod
+    def write_batches(
+        file: TextIO, fields: List[str], **options: Any
+    ) -> Generator[None, List[Record], None]:
+        """
+        the batch writer method for the relaxed Phylip format
+
+        If the option 'prescan' contains the results of the prescan aggregator,
+        the records are written as they are received.
+        Otherwise they are collected first, in a temporary file if the option 'low_memory' is set
+        """
+        prescan = options.get("prescan")
+        # the records are written as they are received, if the prescan results are given
+        streaming = prescan is not None
+        records: Union[List[Record], RecordSpool] = (
+            RecordSpool() if options.get("low_memory") and not streaming else []
         )
+        try:
+            if prescan is None:
+                # aggregate information about minumum and maximum length of the sequences
+                aggregator = RelPhylipFile.prescan(fields, **options)
+
+                while True:
+                    try:
+                        batch = yield
+                    except GeneratorExit:
+                        break
+                    for record in batch:
+                        aggregator.send(record)
+                    records.extend(batch)
 
-        # print the relaxed Phylip heading
-        print(len(records), max_length, file=file)
+                prescan = aggregator.results()
 
-        # print the records
-        for record in records:
-            print(name_assembler.name(record), aligner(record["sequence"]), file=file)
+            # extract the aggregate information
+            [max_length, min_length, count] = prescan
+
+            # formats all the sequences to the same maximum length
+            aligner = dna_aligner(max_length, min_length)
+            # generate the seqid from the fields
+            name_assembler = NameAssembler(
+                fields, preserve_special=options.get("preserve_special", False)
+            )
+
+            def write_records(batch: List[Record]) -> None:
+                file.write(
+                    "".join(
+                        [
+                            f"{name_assembler.name(record)} {aligner(record['sequence'])}\n"
+                            for record in batch
+                        ]
+                    )
+                )
+
+            # print the relaxed Phylip heading
+            print(count, max_length, file=file)
+
+            # print the records
+            if streaming:
+                while True:
+                    try:
+                        batch = yield
+                    except GeneratorExit:
+                        break
+                    write_records(batch)
+            else:
+                for batch in batched(records):
+                    write_records(batch)
+        finally:
+            if isinstance(records, RecordSpool):
+                records.close()
 
 
 class PhylipFile:
@@ -81,6 +149,8 @@ class PhylipFile:
         """
         # Phylip always have the same fields
         fields = ["seqid", "sequence"]
+        # all the records share the same schema
+        schema = Schema.get(fields)
 
         def record_generator() -> Iterator[Record]:
             # skip the first line
@@ -94,49 +164,102 @@ class PhylipFile:
                 name = line[0:10]
                 # everything else in the sequence
                 sequence = line[10:]
-                yield Record(seqid=name, sequence=sequence)
+                yield Record.from_values(schema, [name, sequence])
 
         return fields, record_generator
 
     write_takes_kwargs = True
 
     @staticmethod
-    def write(file: TextIO, fields: List[str], **options: bool) -> Generator:
+    def consumed_fields(fields: List[str]) -> List[str]:
+        """Returns the fields of the records, that the writer uses"""
+        return NameAssembler.used_fields(fields) + ["sequence"]
+
+    @staticmethod
+    def prescan(fields: List[str], **options: Any) -> Aggregator:
+        """
+        Returns the aggregator for the information needed before writing the first record
+        """
+        return PhylipAggregator((0, count_reducer))
+
+    @staticmethod
+    def write(file: TextIO, fields: List[str], **options: Any) -> Generator:
         """
         the writer method for the Phylip format
         """
-        # aggregate the minimum and maximum length of sequences
-        aggregator = PhylipAggregator()
-        records = []
-
-        while True:
-            try:
-                record = yield
-            except GeneratorExit:
-                break
-            aggregator.send(record)
-            records.append(record)
-
-        # extract the aggragate information
-        [max_length, min_length] = aggregator.results()
-
-        # formats all the sequences to the same maximum length
-        aligner = dna_aligner(max_length, min_length)
-        # generate the seqid from the fields
-        name_assembler = NameAssembler(
-            fields, abbreviate_species=True, preserve_special=options.preserve_special
+        return record_writer(PhylipFile.write_batches(file, fields, **options))
+
+    @staticmethod
+    def write_batches(
+        file: TextIO, fields: List[str], **options: Any
+    ) -> Generator[None, List[Record], None]:
+        """
+        the batch writer method for the Phylip format
+
+        If the option 'prescan' contains the results of the prescan aggregator,
+        the records are written as they are received.
+        Otherwise they are collected first, in a temporary file if the option 'low_memory' is set
+        """
+        prescan = options.get("prescan")
+        # the records are written as they are received, if the prescan results are given
+        streaming = prescan is not None
+        records: Union[List[Record], RecordSpool] = (
+            RecordSpool() if options.get("low_memory") and not streaming else []
         )
-        # makes seqid unique within 10 characters
-        unicifier = Unicifier(10)
-
-        # write the Phylip heading
-        print(len(records), max_length, file=file)
-
-        # write the records
-        for record in records:
-            print(
-                unicifier.unique(name_assembler.name(record)),
-                aligner(record["sequence"]),
-                sep=" ",
-                file=file,
+        try:
+            if prescan is None:
+                # aggregate the minimum and maximum length of sequences
+                aggregator = PhylipFile.prescan(fields, **options)
+
+                while True:
+                    try:
+                        batch = yield
+                    except GeneratorExit:
+                        break
+                    for record in batch:
+                        aggregator.send(record)
+                    records.extend(batch)
+
+                prescan = aggregator.results()
+
+            # extract the aggragate information
+            [max_length, min_length, count] = prescan
+
+            # formats all the sequences to the same maximum length
+            aligner = dna_aligner(max_length, min_length)
+            # generate the seqid from the fields
+            name_assembler = NameAssembler(
+                fields,
+                abbreviate_species=True,
+                preserve_special=options.get("preserve_special", False),
             )
+            # makes seqid unique within 10 characters
+            unicifier = Unicifier(10)
+
+            def write_records(batch: List[Record]) -> None:
+                file.write(
+                    "".join(
+                        [
+                            f"{unicifier.unique(name_assembler.name(record))} {aligner(record['sequence'])}\n"
+                            for record in batch
+                        ]
+                    )
+                )
+
+            # write the Phylip heading
+            print(count, max_length, file=file)
+
+            # write the records
+            if streaming:
+                while True:
+                    try:
+                        batch = yield
+                    except GeneratorExit:
+                        break
+                    write_records(batch)
+            else:
+                for batch in batched(records):
+                    write_records(batch)
+        finally:
+            if isinstance(records, RecordSpool):
+                records.close()
@@ -0,0 +1,165 @@
+import collections
+import contextlib
+import io
+import os
+import time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    ContextManager,
+    DefaultDict,
+    Iterator,
+    Optional,
+    TextIO,
+)
+
+if TYPE_CHECKING:
+    import cProfile
+    import pstats
+
+# the stages of the conversion, in the order of the report
+STAGES = {
+    "prescan": "prescan (low memory)",
+    "read": "reader parse and input I/O",
+    "prepare": "option transforms",
+    "write": "writer formatting",
+    "names": "  of which name assembly",
+    "output": "  of which output I/O",
+}
+
+# the methods of utils.py that assemble the names of records, none of them calls another
+NAME_FUNCTIONS = {"_simple_name", "_complex_name", "_unique_limit", "_unique_set"}
+
+# the number of functions listed in the report
+TOP_FUNCTIONS = 15
+
+
+class TimedFile:
+    """Proxy of file that adds the time spent writing to it to the profile"""
+
+    def __init__(self, file: TextIO, profile: "Profile"):
+        self._file = file
+        self._profile = profile
+
+    def write(self, data: str) -> int:
+        with self._profile.stage("output"):
+            return self._file.write(data)
+
+    def writelines(self, lines: Any) -> None:
+        with self._profile.stage("output"):
+            self._file.writelines(lines)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._file, name)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._file)
+
+
+class Profile:
+    """
+    Collects the wall time of the stages of conversions and a cProfile profile of them
+
+    Pass it as the 'profile' option of convertDNA, then call report or dump.
+    The times of several conversions are added up.
+    A disabled profile doesn't measure anything
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.stages: DefaultDict[str, float] = collections.defaultdict(float)
+        self.total = 0.0
+        self.conversions = 0
+        self._profiler: Optional["cProfile.Profile"] = None
+        if enabled:
+            # imported here, because it slows down the start of the conversions
+            import cProfile
+
+            self._profiler = cProfile.Profile()
+
+    @contextlib.contextmanager
+    def _stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] += time.perf_counter() - start
+
+    def stage(self, name: str) -> ContextManager[None]:
+        """Context manager that adds the time spent in it to the stage"""
+        if not self.enabled:
+            return contextlib.nullcontext()
+        return self._stage(name)
+
+    @contextlib.contextmanager
+    def _conversion(self) -> Iterator[None]:
+        assert self._profiler is not None
+        start = time.perf_counter()
+        self._profiler.enable()
+        try:
+            yield
+        finally:
+            self._profiler.disable()
+            self.total += time.perf_counter() - start
+            self.conversions += 1
+
+    def conversion(self) -> ContextManager[None]:
+        """Context manager that profiles the conversion in it"""
+        if not self.enabled:
+            return contextlib.nullcontext()
+        return self._conversion()
+
+    def output(self, file: TextIO) -> TextIO:
+        """Returns file with the writing to it timed as the output I/O"""
+        if not self.enabled:
+            return file
+        return TimedFile(file, self)  # type: ignore[return-value]
+
+    def _stats(self, stream: TextIO) -> "pstats.Stats":
+        import pstats
+
+        return pstats.Stats(self._profiler, stream=stream)
+
+    def name_time(self) -> float:
+        """
+        Returns the time spent in NameAssembler.name and Unicifier.unique of utils.py,
+        including sanitize
+        """
+        from . import utils
+
+        stats = self._stats(io.StringIO()).stats  # type: ignore[attr-defined]
+        utils_file = os.path.normcase(os.path.abspath(utils.__file__))
+        return sum(
+            cumulative
+            for (filename, _, name), (_, _, _, cumulative, _) in stats.items()
+            if name in NAME_FUNCTIONS
+            and os.path.normcase(os.path.abspath(filename)) == utils_file
+        )
+
+    def report(self) -> str:
+        """
+        Returns the table of the time of the stages,
+        followed by the functions with the largest own time
+        """
+        if not self.enabled or not self.conversions:
+            return "No conversion has been profiled"
+        stages = dict(self.stages, names=self.name_time())
+        lines = [f"{'stage':<30}{'seconds':>10}{'%':>8}"]
+        for key, title in STAGES.items():
+            if key not in stages:
+                continue
+            seconds = stages[key]
+            share = 100 * seconds / self.total if self.total else 0.0
+            lines.append(f"{title:<30}{seconds:>10.3f}{share:>8.1f}")
+        lines.append(f"{'total':<30}{self.total:>10.3f}{100:>8.1f}")
+        lines.append("")
+        with io.StringIO() as stream:
+            self._stats(stream).sort_stats("tottime").print_stats(TOP_FUNCTIONS)
+            lines.append(stream.getvalue().strip("\n"))
+        return "\n".join(lines)
+
+    def dump(self, path: str) -> None:
+        """Writes the cProfile profile to path, it can be loaded by pstats and snakeviz"""
+        if not self.enabled or not self.conversions:
+            raise ValueError("No conversion has been profiled")
+        self._stats(io.StringIO()).dump_stats(path)
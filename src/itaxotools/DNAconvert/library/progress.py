@@ -0,0 +1,212 @@
+import dataclasses
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, TextIO
+
+
+class ConversionCancelled(Exception):
+    """
+    Raised when a conversion is stopped by its CancelToken
+
+    The output file of a cancelled conversion is incomplete
+    """
+
+
+class CancelToken:
+    """
+    Requests to stop a conversion, from any thread
+
+    The conversion checks the token between the batches of records
+    and raises ConversionCancelled, once it's cancelled
+    """
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def check(self) -> None:
+        """Raises ConversionCancelled, if the token is cancelled"""
+        if self._event.is_set():
+            raise ConversionCancelled("The conversion has been cancelled")
+
+
+@dataclasses.dataclass
+class Progress:
+    """
+    The state of a conversion, given to the progress callbacks
+
+    The number of bytes is of the input file as it's stored, i.e. compressed,
+    and is None if it can't be known, e.g. for pipes.
+    In the directory mode, the bytes are counted over all the files
+    """
+
+    # the number of records read so far
+    records: int = 0
+    # the number of bytes read from the input and its size
+    bytes_read: Optional[int] = None
+    total_bytes: Optional[int] = None
+    # the seconds since the start of the conversion
+    elapsed: float = 0.0
+    # the input file being converted in the directory mode
+    file: Optional[str] = None
+    files_done: int = 0
+    files_total: int = 1
+
+    @property
+    def fraction(self) -> Optional[float]:
+        """The part of the input that has been read, between 0 and 1"""
+        if self.bytes_read is None or not self.total_bytes:
+            return None
+        return min(self.bytes_read / self.total_bytes, 1.0)
+
+    @property
+    def remaining(self) -> Optional[float]:
+        """The estimated number of seconds until the end of the conversion"""
+        fraction = self.fraction
+        if not fraction:
+            return None
+        return self.elapsed * (1 - fraction) / fraction
+
+
+ProgressCallback = Callable[[Progress], Any]
+
+
+def source_file(file: TextIO) -> Any:
+    """Returns the file with the stored bytes of the text file, or None"""
+    raw = getattr(getattr(file, "buffer", None), "raw", None)
+    # the compressed input files are decompressed by compression.ReadAheadReader
+    return getattr(raw, "source", raw)
+
+
+def file_size(file: TextIO) -> Optional[int]:
+    """Returns the size in bytes of the regular file under the text file"""
+    try:
+        size = os.fstat(source_file(file).fileno()).st_size
+    except (AttributeError, OSError, ValueError):
+        return None
+    return size or None
+
+
+def file_position(file: TextIO) -> Optional[int]:
+    """
+    Returns the number of bytes read from the file under the text file
+
+    The readers that don't read the file directly move its position, as they progress
+    """
+    try:
+        return source_file(file).tell()
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+class Monitor:
+    """
+    Reports the progress of the conversion of infile to the callback
+    and checks the cancel token, on each update
+    """
+
+    def __init__(
+        self,
+        infile: TextIO,
+        callback: Optional[ProgressCallback] = None,
+        cancel: Optional[CancelToken] = None,
+    ):
+        self._infile = infile
+        self._callback = callback
+        self._cancel = cancel
+        self._start = time.monotonic()
+        self.progress = Progress(total_bytes=file_size(infile))
+
+    def check(self) -> None:
+        """Raises ConversionCancelled, if the conversion is cancelled"""
+        if self._cancel is not None:
+            self._cancel.check()
+
+    def update(self, records: int = 0) -> None:
+        """Adds the number of records that have been read, then reports the progress"""
+        self.check()
+        self.progress.records += records
+        if self._callback is not None:
+            self.progress.bytes_read = file_position(self._infile)
+            self.progress.elapsed = time.monotonic() - self._start
+            self._callback(self.progress)
+
+    def finish(self) -> None:
+        """Reports the progress at the end of the conversion"""
+        if self._callback is not None:
+            self.progress.bytes_read = self.progress.total_bytes or file_position(
+                self._infile
+            )
+            self.progress.elapsed = time.monotonic() - self._start
+            self._callback(self.progress)
+
+
+class DirectoryMonitor:
+    """
+    Combines the progress of the conversions of the files of a directory
+    and checks the cancel token between them
+    """
+
+    def __init__(
+        self,
+        paths: List[str],
+        callback: Optional[ProgressCallback] = None,
+        cancel: Optional[CancelToken] = None,
+    ):
+        self._callback = callback
+        self._cancel = cancel
+        self._start = time.monotonic()
+        self._sizes: Dict[str, int] = {}
+        for path in paths:
+            try:
+                self._sizes[path] = os.path.getsize(path)
+            except OSError:
+                self._sizes[path] = 0
+        self.progress = Progress(
+            bytes_read=0,
+            total_bytes=sum(self._sizes.values()) or None,
+            files_total=len(paths),
+        )
+        # the records and the bytes of the converted files
+        self._records_done = 0
+        self._bytes_done = 0
+
+    def check(self) -> None:
+        """Raises ConversionCancelled, if the conversion is cancelled"""
+        if self._cancel is not None:
+            self._cancel.check()
+
+    def file_callback(self, path: str) -> ProgressCallback:
+        """Returns the progress callback for the conversion of the file at path"""
+
+        def callback(file_progress: Progress) -> None:
+            self.progress.file = path
+            self.progress.records = self._records_done + file_progress.records
+            self.progress.bytes_read = self._bytes_done + min(
+                file_progress.bytes_read or 0, self._sizes[path]
+            )
+            self._report()
+
+        return callback
+
+    def file_done(self, path: str, records: int) -> None:
+        """Records that the file at path has been converted"""
+        self._records_done += records
+        self._bytes_done += self._sizes[path]
+        self.progress.file = path
+        self.progress.files_done += 1
+        self.progress.records = self._records_done
+        self.progress.bytes_read = self._bytes_done
+        self._report()
+
+    def _report(self) -> None:
+        if self._callback is not None:
+            self.progress.elapsed = time.monotonic() - self._start
+            self._callback(self.progress)
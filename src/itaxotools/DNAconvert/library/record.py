@@ -1,10 +1,59 @@
-from typing import Optional
+from typing import Optional, Dict, Tuple, List, Iterable, ClassVar
+
+
+class Schema:
+    """Class for the list of fields shared by the records of a stream
+
+    Maps each field to the index of its value in the records.
+    Schemas are interned: there is only one schema for each list of fields
+    """
+
+    __slots__ = ("fields", "index", "_extensions")
+
+    # all the schemas created so far
+    _interned: ClassVar[Dict[Tuple[str, ...], "Schema"]] = {}
+
+    def __init__(self, fields: Tuple[str, ...]):
+        """Use Schema.get instead"""
+        self.fields = fields
+        # if a field is repeated, the last occurence is used
+        self.index = {field: i for i, field in enumerate(fields)}
+        # the schemas with one more field
+        self._extensions: Dict[str, "Schema"] = {}
+
+    @staticmethod
+    def get(fields: Iterable[str]) -> "Schema":
+        """Returns the shared schema for the given fields"""
+        fields = tuple(fields)
+        try:
+            return Schema._interned[fields]
+        except KeyError:
+            schema = Schema(fields)
+            Schema._interned[fields] = schema
+            return schema
+
+    def extend(self, field: str) -> "Schema":
+        """Returns the shared schema with the additional field at the end"""
+        try:
+            return self._extensions[field]
+        except KeyError:
+            schema = Schema.get(self.fields + (field,))
+            self._extensions[field] = schema
+            return schema
+
+    def __reduce__(self) -> Tuple:
+        # unpickled schemas are interned as well
+        return (Schema.get, (self.fields,))
 
 
 class Record:
     """Class for records with a smart constructor that guarantees the presence of required fields
+
+    The values are stored in a list, the names of the fields are stored in a shared Schema
     """
 
+    __slots__ = ("_schema", "_values")
+
     def __init__(self, **kwargs: str):
         """Creates a record with given fields
         Raises an ValueError if a requred field is not supplied
@@ -13,23 +62,46 @@ class Record:
         """
         if len(kwargs) < 2:
             raise ValueError("The input has less than 2 fields")
-        if 'sequence' not in kwargs:
+        if "sequence" not in kwargs:
             raise ValueError("field 'sequence' is required")
-        self._fields = kwargs
+        self._schema = Schema.get(kwargs)
+        self._values = list(kwargs.values())
 
-    def __getitem__(self, field: str) -> str:
-        """r.__getitem__(field) <==> r[field]
+    @staticmethod
+    def from_values(schema: Schema, values: List[str]) -> "Record":
+        """Creates a record with the values of the fields in the schema
+
+        The values are not copied and not checked.
+        The caller is responsible for the presence of the required fields
         """
-        return self._fields[field]
+        record = Record.__new__(Record)
+        record._schema = schema
+        record._values = values
+        return record
+
+    def __reduce__(self) -> Tuple:
+        # records are sent between processes in parallel conversions
+        return (Record.from_values, (self._schema, self._values))
+
+    def __getitem__(self, field: str) -> str:
+        """r.__getitem__(field) <==> r[field]"""
+        return self._values[self._schema.index[field]]
 
     def __setitem__(self, field: str, value: str) -> None:
-        """Sets self[field] to a value
-        """
-        self._fields[field] = value
+        """Sets self[field] to a value"""
+        try:
+            self._values[self._schema.index[field]] = value
+        except KeyError:
+            # a new field
+            self._schema = self._schema.extend(field)
+            self._values.append(value)
 
     def get(self, field: str) -> Optional[str]:
         """
         returns the value of the field
         returns None if it doesn't exists
         """
-        return self._fields.get(field)
+        i = self._schema.index.get(field)
+        if i is None:
+            return None
+        return self._values[i]
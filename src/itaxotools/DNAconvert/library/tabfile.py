@@ -1,6 +1,9 @@
 from typing import TextIO, List, Tuple, Callable, Iterator, Generator
+import io
+import itertools
 from .utils import *
 from .record import *
+from . import binary
 
 
 class Tabfile:
@@ -11,6 +14,13 @@ class Tabfile:
         """
         the writer method for tab format
         """
+        return record_writer(Tabfile.write_batches(file, fields))
+
+    @staticmethod
+    def write_batches(file: TextIO, fields: List[str]) -> Generator:
+        """
+        the batch writer method for tab format
+        """
         if "seqid" not in fields:
             raise ValueError("Tab format expects a 'seqid'")
 
@@ -18,25 +28,52 @@ class Tabfile:
         file.write("\t".join(fields) + "\n")
 
         while True:
-            # receive a record
+            # receive a list of records
             try:
-                record = yield
+                batch = yield
             except GeneratorExit:
                 break
-            # enforce name uniqueness
-            unicifier = Unicifier()
-            record["seqid"] = unicifier.unique(record["seqid"])
 
             # collect record fields in a list and join them with tabs
-            file.writelines("\t".join([record[field] for field in fields]) + "\n")
+            file.write(
+                "".join(
+                    [
+                        "\t".join([record[field] for field in fields]) + "\n"
+                        for record in batch
+                    ]
+                )
+            )
 
     @staticmethod
     def read(file: TextIO) -> Tuple[List[str], Callable[[], Iterator[Record]]]:
         """
         the reader method for tab format
         """
-        # read the heading for the list of fields
-        fields = file.readline().rstrip("\n").split("\t")
+        fields, batch_generator = Tabfile.read_batches(file)
+
+        # closure that will iterate over the subsequent lines and yield the records
+        def record_generator() -> Iterator[Record]:
+            for batch in batch_generator():
+                yield from batch
+
+        # return the list of fields and the generator closure
+        return fields, record_generator
+
+    @staticmethod
+    def read_batches(
+        file: TextIO,
+    ) -> Tuple[List[str], Callable[[], Iterator[List[Record]]]]:
+        """
+        the batch reader method for tab format
+        """
+        # regular files are read from a memory map
+        buffer = binary.map_file(file)
+        if buffer is not None:
+            heading, start = binary.first_line(buffer)
+            fields = heading.decode(file.encoding, file.errors).split("\t")
+        else:
+            # read the heading for the list of fields
+            fields = file.readline().rstrip("\n").split("\t")
         fields = list(map(str.casefold, fields))
         if "seqid" not in fields and len(fields) >= 2:
             warnings.warn(
@@ -64,21 +101,53 @@ class Tabfile:
                 )
                 fields[-1] = "sequence"
 
-        # closure that will iterate over the subsequent lines and yield the records
+        # all the records share the same schema
+        schema = Schema.get(fields)
+        # the fast path can be taken only if the schema makes valid records
+        valid_schema = len(schema.index) >= 2
 
-        def record_generator() -> Iterator[Record]:
-            for line in file:
-                line = line.rstrip("\n")
+        def make_record(line: str) -> Record:
+            # split the line into values
+            values = line.rstrip("\n").split("\t")
+            if valid_schema and len(values) == len(fields):
+                return Record.from_values(schema, values)
+            else:
+                # pair the values with the fields
+                return Record(**dict(zip(fields, values)))
+
+        # closure that will iterate over the subsequent lines and yield the lists of records
+
+        def batch_generator() -> Iterator[List[Record]]:
+            while True:
+                lines = list(itertools.islice(file, BATCH_SIZE))
+                if not lines:
+                    break
                 # skip blank lines
-                if line.isspace() or line == "":
-                    continue
-                # split line into values
-                values = line.split("\t")
-                # pair them with fiels and send
-                yield Record(**{field: value for field, value in zip(fields, values)})
+                batch = [make_record(line) for line in lines if not line.isspace()]
+                if batch:
+                    yield batch
+
+        def mapped_batch_generator() -> Iterator[List[Record]]:
+            assert buffer is not None
+            with buffer:
+                for data in binary.mapped_blocks(buffer, start, source=file.buffer.raw):
+                    # the lines don't have the line breaks, blank lines are skipped
+                    lines = data.decode(file.encoding, file.errors).split("\n")
+                    batch = [
+                        make_record(line)
+                        for line in lines
+                        if line and not line.isspace()
+                    ]
+                    if batch:
+                        yield batch
+            # the whole file is read
+            file.seek(0, io.SEEK_END)
+
+        if buffer is not None:
+            return fields, mapped_batch_generator
 
         # return the list of fields and the generator closure
-        return fields, record_generator
+        return fields, batch_generator
 
 
 class NoHeaderTab:
@@ -96,16 +165,30 @@ class NoHeaderTab:
         """
         the writer method for 'tab-no headers' format
         """
+        return record_writer(NoHeaderTab.write_batches(file, fields))
+
+    @staticmethod
+    def write_batches(file: TextIO, fields: List[str]) -> Generator:
+        """
+        the batch writer method for 'tab-no headers' format
+        """
 
         while True:
-            # receive a record
+            # receive a list of records
             try:
-                record = yield
+                batch = yield
             except GeneratorExit:
                 break
 
             # collect record fields in a list and join them with tabs
-            file.writelines("\t".join([record[field] for field in fields]) + "\n")
+            file.write(
+                "".join(
+                    [
+                        "\t".join([record[field] for field in fields]) + "\n"
+                        for record in batch
+                    ]
+                )
+            )
 
     @staticmethod
     def read(
@@ -116,6 +199,8 @@ class NoHeaderTab:
         """
         # always the same heading
         fields = ["seqid", "sequence"]
+        # all the records share the same schema
+        schema = Schema.get(fields)
 
         # closure that will iterate over the subsequent lines and yield the records
 
@@ -143,12 +228,12 @@ class NoHeaderTab:
                     first_line = False
 
                 sequence = values.pop(sequence_index)
-                if options.preserve_special:
+                if options.get("preserve_special", False):
                     seqid = "_".join(value for value in values)
                 else:
                     seqid = "_".join(sanitize(value) for value in values)
 
-                yield Record(seqid=seqid, sequence=sequence)
+                yield Record.from_values(schema, [seqid, sequence])
 
         # return the list of fields and the generator closure
         return fields, record_generator
@@ -1,13 +1,63 @@
 from .ext_ASCII_conv_table import ext_ascii_trans
-from typing import List, Callable, Optional, Dict, Any
+from typing import (
+    List,
+    Callable,
+    Optional,
+    Dict,
+    Any,
+    Iterable,
+    Iterator,
+    Generator,
+    Set,
+    TextIO,
+    Type,
+    Union,
+)
 from .record import *
+import contextlib
+import itertools
+import pickle
 import re
+import tempfile
+import threading
 import warnings
 import unicodedata
 
 # read by lib.utils.Unicifier._unique_limit
 GLOBAL_OPTION_DISABLE_AUTOMATIC_RENAMING = True
 
+# the number of records passed at once through the batch protocol
+BATCH_SIZE = 1024
+
+
+def batched(
+    records: Iterable[Record], size: int = BATCH_SIZE
+) -> Iterator[List[Record]]:
+    """
+    groups the records into lists of at most `size` records
+    """
+    records = iter(records)
+    while True:
+        batch = list(itertools.islice(records, size))
+        if not batch:
+            return
+        yield batch
+
+
+def record_writer(batch_writer: Generator[Any, Any, Any]) -> Generator:
+    """
+    adapts a writer that receives lists of records
+    to the writer protocol that receives records one-by-one
+    """
+    next(batch_writer)
+    try:
+        while True:
+            record = yield
+            batch_writer.send([record])
+    finally:
+        # finishes the writing
+        batch_writer.close()
+
 
 class Aggregator:
     """Aggregates information about records"""
@@ -34,6 +84,59 @@ class Aggregator:
         return self._accs
 
 
+class RecordSpool:
+    """
+    A list of records that is stored in a temporary file instead of the memory
+
+    Supports appending and iterating over the records in the order of appending
+    """
+
+    def __init__(self) -> None:
+        self._file = tempfile.TemporaryFile()
+        # the records not yet written to the file
+        self._pending: List[Record] = []
+        self._count = 0
+
+    def _flush(self) -> None:
+        if self._pending:
+            # the records in a batch share the pickled schema
+            pickle.dump(self._pending, self._file, protocol=pickle.HIGHEST_PROTOCOL)
+            self._pending = []
+
+    def append(self, record: Record) -> None:
+        self._pending.append(record)
+        self._count += 1
+        if len(self._pending) >= BATCH_SIZE:
+            self._flush()
+
+    def extend(self, records: Iterable[Record]) -> None:
+        for record in records:
+            self.append(record)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[Record]:
+        self._flush()
+        self._file.seek(0)
+        while True:
+            try:
+                batch = pickle.load(self._file)
+            except EOFError:
+                return
+            yield from batch
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def count_reducer(acc: int, record: Record) -> int:
+    """
+    counts the records
+    """
+    return acc + 1
+
+
 def _max_reducer(acc: int, record: Record) -> int:
     """
     returns the maximum between acc and the length of sequence in record
@@ -107,17 +210,11 @@ class NameAssembler:
         else:
             return "_".join(map(sanitize, parts))
 
-    def __init__(
-        self,
-        fields: List[str],
-        *,
-        abbreviate_species: bool = False,
-        preserve_special: bool,
-    ):
+    @staticmethod
+    def _name_fields(fields: List[str]) -> List[str]:
+        """returns the information fields, that the name is assembled from"""
         # copy the fields to not mutate the original
         fields = fields.copy()
-        self.abbreviate_species = abbreviate_species
-        self.preserve_special = preserve_special
         try:
             # seqid should not be used for the name generation
             fields.remove("seqid")
@@ -131,11 +228,28 @@ class NameAssembler:
         else:
             # collect the relevant fields
             fields = fields[:i]
+        if "species" in fields:
+            i = fields.index("species")
+            fields[0], fields[i] = fields[i], fields[0]
+        return fields
+
+    @staticmethod
+    def used_fields(fields: List[str]) -> List[str]:
+        """returns the fields of the records, that are read by the name method"""
+        return NameAssembler._name_fields(fields) or ["seqid"]
+
+    def __init__(
+        self,
+        fields: List[str],
+        *,
+        abbreviate_species: bool = False,
+        preserve_special: bool,
+    ):
+        self.abbreviate_species = abbreviate_species
+        self.preserve_special = preserve_special
+        fields = NameAssembler._name_fields(fields)
         if fields:
             # generate 'seqid' from the fields
-            if "species" in fields:
-                i = fields.index("species")
-                fields[0], fields[i] = fields[i], fields[0]
             self._fields = fields
             self.name = self._complex_name
         else:
@@ -143,6 +257,21 @@ class NameAssembler:
             self.name = self._simple_name
 
 
+def projected_fields(fields: List[str], options: Dict[str, Any]) -> Optional[Set[str]]:
+    """
+    returns the fields of the records, that the writer uses, and 'sequence'
+
+    'fields' are the fields returned by the reader,
+    the option 'projection' is the 'consumed_fields' method of the writer.
+    Returns None, if all the fields are needed
+    """
+    projection = options.get("projection")
+    consumed = projection(fields) if projection is not None else None
+    if consumed is None:
+        return None
+    return {*consumed, "sequence"}
+
+
 def dna_aligner(max_length: int, min_length: int) -> Callable[[str], str]:
     """
     returns a function that takes a sequence and pads it to the max_length
@@ -229,3 +358,63 @@ class Unicifier:
             # increment the amount the name have been seen
             self._seen_name[name] += 1
         return uniquename
+
+
+# the lists collecting the warnings of each thread, innermost last
+_warning_collectors = threading.local()
+_warning_hook_lock = threading.Lock()
+# the warnings.showwarning replaced by the hook
+_previous_showwarning: Callable[..., None] = warnings.showwarning
+
+
+def _showwarning_hook(
+    message: Union[Warning, str],
+    category: Type[Warning],
+    filename: str,
+    lineno: int,
+    file: Optional[TextIO] = None,
+    line: Optional[str] = None,
+) -> None:
+    collectors = getattr(_warning_collectors, "stack", None)
+    if collectors:
+        collectors[-1].append(str(message))
+    else:
+        # the warnings outside of collect_warnings are shown as before
+        _previous_showwarning(message, category, filename, lineno, file, line)
+
+
+def install_warnings_hook() -> None:
+    """
+    Replaces warnings.showwarning by a hook that passes the warnings to collect_warnings
+
+    Should be called from the main thread before other threads start collecting the warnings,
+    since warnings.showwarning is global.
+    warnings.catch_warnings replaces the hook until it exits
+    """
+    global _previous_showwarning
+    with _warning_hook_lock:
+        if warnings.showwarning is not _showwarning_hook:
+            _previous_showwarning = warnings.showwarning
+            warnings.showwarning = _showwarning_hook
+        # doesn't change which warnings are shown,
+        # but resets the registries of the shown warnings, like catch_warnings
+        warnings.filterwarnings("default", append=True)
+
+
+@contextlib.contextmanager
+def collect_warnings() -> Iterator[List[str]]:
+    """
+    Collects the messages of the warnings issued in the current thread
+
+    Unlike warnings.catch_warnings, it doesn't replace the global state of the warnings module,
+    so it can be used in several threads
+    """
+    install_warnings_hook()
+    if not hasattr(_warning_collectors, "stack"):
+        _warning_collectors.stack = []
+    messages: List[str] = []
+    _warning_collectors.stack.append(messages)
+    try:
+        yield messages
+    finally:
+        _warning_collectors.stack.pop()
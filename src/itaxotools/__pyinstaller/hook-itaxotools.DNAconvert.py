@@ -1,4 +1,6 @@
 #!/usr/bin/env python3
 
-from PyInstaller.utils.hooks import collect_data_files
+from PyInstaller.utils.hooks import collect_data_files, collect_submodules
 datas = collect_data_files('itaxotools.DNAconvert', subdir='resources')
+# the format modules are imported by name, when they are used
+hiddenimports = collect_submodules('itaxotools.DNAconvert.library')
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+
+import io
+from pathlib import Path
+from typing import Any, List, Tuple
+
+import pytest
+
+from itaxotools.DNAconvert.library import binary  # type: ignore
+from itaxotools.DNAconvert.library.fasta import Fastafile  # type: ignore
+from itaxotools.DNAconvert.library.tabfile import Tabfile  # type: ignore
+
+fasta_samples = [
+    b">a b\nACGT\nAC GT  \n\n>b\nTT\n",
+    b">a >b\nAC>GT\n>>c\nTT\n\x0c\n> d\t\n",
+    b"junk\n\n>a\r\nAC\r\nGT\r\n>b\r\n\r\nTT",
+    b">a\rAC\rGT\r>b\rTT\r",
+    b">\xc3\xa9t\xc3\xa9 \nAC\xc2\xa0\nGT\x1f\n>b\xff\nT\xffT\n",
+    b"no records\n",
+    b"",
+]
+
+tab_samples = [
+    b"seqid\tsequence\na\tACGT\n\n  \nb\tAC GT \n",
+    b"seqid\tSpecies\tsequence\r\na\tb\xc3\xa9\tAC\r\nc\t\tTT\r\n\r\nd\te\tGT",
+    b"seqid\tsequence\ra\tAC\rb\tGT\r",
+]
+
+Records = List[Tuple[str, ...]]
+
+
+def read_text(reader: Any, data: bytes) -> Records:
+    text = io.StringIO(data.decode("utf-8", errors="replace"), newline=None)
+    _, records = reader(text)
+    return [tuple(record._values) for record in records()]
+
+
+def read_buffered(reader: Any, data: bytes) -> Records:
+    with io.TextIOWrapper(io.BytesIO(data), encoding="utf-8", errors="replace") as file:
+        assert binary.binary_source(file) is not None
+        assert binary.map_file(file) is None
+        _, records = reader(file)
+        return [tuple(record._values) for record in records()]
+
+
+def read_mapped(reader: Any, path: Path, data: bytes) -> Records:
+    path.write_bytes(data)
+    with path.open(encoding="utf-8", errors="replace") as file:
+        if data:
+            with binary.map_file(file):
+                pass
+        _, records = reader(file)
+        return [tuple(record._values) for record in records()]
+
+
+@pytest.mark.parametrize("block_size", [1, 3, 1 << 20])
+@pytest.mark.parametrize("data", fasta_samples)
+def test_fasta(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, block_size: int, data: bytes
+) -> None:
+    monkeypatch.setattr(binary, "BLOCK_SIZE", block_size)
+    expected = read_text(Fastafile.read, data)
+    assert read_buffered(Fastafile.read, data) == expected
+    assert read_mapped(Fastafile.read, tmp_path / "input.fas", data) == expected
+
+
+@pytest.mark.parametrize("block_size", [1, 3, 1 << 20])
+@pytest.mark.parametrize("data", tab_samples)
+def test_tab(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, block_size: int, data: bytes
+) -> None:
+    monkeypatch.setattr(binary, "BLOCK_SIZE", block_size)
+    expected = read_text(Tabfile.read, data)
+    assert read_mapped(Tabfile.read, tmp_path / "input.tab", data) == expected
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+
+import gzip
+import lzma
+from pathlib import Path
+
+import pytest
+
+from itaxotools.DNAconvert.DNAconvert import convert_wrapper  # type: ignore
+from itaxotools.DNAconvert.library import compression  # type: ignore
+
+testfiles_path: Path = Path(__file__).parent / "test_files"
+
+options = dict(
+    allow_empty_sequences=False,
+    automatic_renaming=False,
+    preserve_spaces=False,
+)
+
+
+@pytest.mark.parametrize(
+    "extension", [".tab", ".fas", ".phy", ".rel.phy", ".nex", ".xml", ".gb.fas"]
+)
+@pytest.mark.parametrize("jobs", [1, 3])
+def test_gzip_output(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, extension: str, jobs: int
+) -> None:
+    # many small blocks
+    monkeypatch.setattr(compression, "BGZF_BLOCK_SIZE", 100)
+    infile = str(testfiles_path / "testbarcodes.tab")
+    plain = tmp_path / f"output{extension}"
+    compressed = tmp_path / f"output{extension}.gz"
+    convert_wrapper(infile, str(plain), "", "", **options)
+    convert_wrapper(infile, str(compressed), "", "", jobs=jobs, **options)
+    data = compressed.read_bytes()
+    assert data.endswith(compression.BGZF_EOF)
+    assert gzip.decompress(data) == plain.read_bytes()
+
+
+@pytest.mark.parametrize("readable", [False, True])
+def test_plain_output(tmp_path: Path, readable: bool) -> None:
+    with compression.open_output(
+        str(tmp_path / "output.fas"), None, readable=readable
+    ) as output:
+        assert output.readable() == readable
+
+
+def test_bgzf_blocks() -> None:
+    data = b"ACGT" * 100
+    block = compression.bgzf_block(data)
+    # the size of the block is stored in the extra field
+    assert int.from_bytes(block[16:18], "little") == len(block) - 1
+    assert gzip.decompress(block + compression.BGZF_EOF) == data
+
+
+def test_xz_output(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(compression, "STREAM_SIZE", 1000)
+    infile = str(testfiles_path / "testbarcodes.tab")
+    plain = tmp_path / "output.fas"
+    convert_wrapper(infile, str(plain), "", "", **options)
+    for path, codec in [("output.fas.xz", None), ("output.fas.bin", "xz")]:
+        convert_wrapper(
+            infile, str(tmp_path / path), "", "fasta", compression=codec, **options
+        )
+        assert lzma.decompress((tmp_path / path).read_bytes()) == plain.read_bytes()
+
+
+@pytest.mark.parametrize(
+    "name", ["testbarcodes.gb", "ali_example_file_1.ali", "testbarcodes.tab"]
+)
+@pytest.mark.parametrize("codec", ["gzip", "bz2", "xz"])
+# the compression is detected without the extension or despite a wrong one
+@pytest.mark.parametrize("extension", ["", ".gz"])
+def test_compressed_input(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+    name: str,
+    codec: str,
+    extension: str,
+) -> None:
+    # many chunks are read ahead
+    monkeypatch.setattr(compression, "READ_SIZE", 1000)
+    compress, _, end = compression.codec_parameters(codec)
+    infile = testfiles_path / name
+    compressed = tmp_path / (name + extension)
+    compressed.write_bytes(compress(infile.read_bytes()) + end)
+    assert compression.input_compression(str(compressed)) == codec
+    convert_wrapper(str(infile), str(tmp_path / "plain.tab"), "", "", **options)
+    convert_wrapper(str(compressed), str(tmp_path / "output.tab"), "", "", **options)
+    assert (tmp_path / "output.tab").read_text() == (tmp_path / "plain.tab").read_text()
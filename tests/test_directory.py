@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+
+from pathlib import Path
+
+import pytest
+
+from itaxotools.DNAconvert.DNAconvert import (  # type: ignore
+    BatchConversionError,
+    convert_directory,
+    convert_wrapper,
+)
+
+options = dict(
+    allow_empty_sequences=False,
+    automatic_renaming=False,
+    preserve_spaces=False,
+)
+
+
+def make_directory(path: Path) -> None:
+    path.mkdir()
+    for i in range(4):
+        (path / f"file{i}.fas").write_text(
+            "".join(f">seq{i}_{j}\nACGT{'A' * i * j}\n" for j in range(10 * i + 1))
+        )
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_directory_conversion(tmp_path: Path, jobs: int) -> None:
+    make_directory(tmp_path / "input")
+    (tmp_path / "output").mkdir()
+    results = convert_directory(
+        str(tmp_path / "input"),
+        str(tmp_path / "output" / "#.tab"),
+        "fasta",
+        "tab",
+        jobs=jobs,
+        **options,
+    )
+    assert len(results) == 4
+    assert all(result.error is None for result in results)
+    for i in range(4):
+        lines = (tmp_path / "output" / f"file{i}.tab").read_text().splitlines()
+        assert lines[0] == "seqid\tsequence"
+        assert len(lines) == 10 * i + 2
+
+
+def test_directory_errors(tmp_path: Path) -> None:
+    make_directory(tmp_path / "input")
+    (tmp_path / "input" / "broken.fas").write_text(">seq\nACGT\n")
+    (tmp_path / "output").mkdir()
+    with pytest.raises(BatchConversionError) as error:
+        # the output file for 'broken.fas' cannot be opened
+        (tmp_path / "output" / "broken.tab").mkdir()
+        convert_wrapper(
+            str(tmp_path / "input"),
+            str(tmp_path / "output" / "#.tab"),
+            "fasta",
+            "tab",
+            jobs=2,
+            **options,
+        )
+    assert [Path(result.infile).name for result in error.value.failed] == ["broken.fas"]
+    for i in range(4):
+        assert (tmp_path / "output" / f"file{i}.tab").exists()
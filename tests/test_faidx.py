@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+
+import os
+from io import StringIO
+from pathlib import Path
+from typing import Any, TextIO
+
+import pytest
+
+from itaxotools.DNAconvert import convertDNA  # type: ignore
+from itaxotools.DNAconvert.library import faidx  # type: ignore
+from itaxotools.DNAconvert.library.fasta import Fastafile  # type: ignore
+from itaxotools.DNAconvert.library.tabfile import Tabfile  # type: ignore
+
+options = dict(
+    allow_empty_sequences=True,
+    automatic_renaming=False,
+    preserve_spaces=False,
+)
+
+sequences = ["ACGTACGTAC" * length for length in (0, 1, 3, 5, 6, 12)]
+
+
+def write_fasta(path: Path, newline: str) -> None:
+    # 20 bases per line
+    with path.open("w", newline="") as file:
+        for i, sequence in enumerate(sequences):
+            file.write(f">seq{i} description {i}{newline}")
+            for start in range(0, len(sequence), 20):
+                file.write(sequence[start : start + 20] + newline)
+
+
+def convert(input: TextIO, **selection: Any) -> str:
+    with StringIO() as output:
+        convertDNA(input, output, Fastafile, Tabfile, **options, **selection)
+        return output.getvalue()
+
+
+@pytest.mark.parametrize("newline", ["\n", "\r\n"])
+def test_index(tmp_path: Path, newline: str) -> None:
+    path = tmp_path / "test.fas"
+    write_fasta(path, newline)
+    with path.open() as file:
+        convert(file, record_range=(0, 1))
+    index = faidx.read_index(str(path) + faidx.INDEX_EXTENSION, "utf-8")
+    assert [entry.name for entry in index] == [f"seq{i}" for i in range(len(sequences))]
+    assert [entry.length for entry in index] == [len(seq) for seq in sequences]
+    data = path.read_bytes()
+    for entry, sequence in zip(index, sequences):
+        if sequence:
+            assert entry.line_bases == min(20, len(sequence))
+            assert entry.line_width == entry.line_bases + len(newline)
+            first_line = data[entry.offset : entry.offset + entry.line_bases]
+            assert first_line == sequence[: entry.line_bases].encode()
+
+
+@pytest.mark.parametrize(
+    "selection",
+    [
+        dict(select=["seq4", "seq1", "seq5"]),
+        dict(record_range=(2, 4)),
+        dict(select=["seq3", "seq0"], record_range=(1, 6)),
+    ],
+)
+def test_selection(tmp_path: Path, selection: Any) -> None:
+    path = tmp_path / "test.fas"
+    write_fasta(path, "\n")
+    # the regular file is read through the index, StringIO is read completely
+    for _ in range(2):
+        with path.open() as file:
+            indexed = convert(file, **selection)
+        assert (tmp_path / "test.fas.fai").exists()
+    with path.open() as file:
+        scanned = convert(StringIO(file.read()), **selection)
+    assert indexed == scanned
+    lines = indexed.splitlines()[1:]
+    if "select" in selection:
+        names = [name for name in selection["select"] if name != "seq0"]
+        assert [line.split()[0] for line in lines] == names
+
+
+@pytest.mark.parametrize("count", [4, 6])
+def test_replaced_file(tmp_path: Path, count: int) -> None:
+    path = tmp_path / "test.fas"
+    write_fasta(path, "\n")
+    with path.open() as file:
+        convert(file, record_range=(0, 1))
+    mtime = path.stat().st_mtime
+    # the file is replaced with the same modification time
+    with path.open("w") as file:
+        for i in range(count):
+            file.write(f">new{i}\n{'TTGCA' * (i + 1)}\n")
+    os.utime(path, (mtime, mtime))
+    with path.open() as file:
+        indexed = convert(file, record_range=(0, count))
+    with path.open() as file:
+        assert indexed == convert(StringIO(file.read()))
+
+
+def test_irregular(tmp_path: Path) -> None:
+    path = tmp_path / "test.fas"
+    path.write_text(">seq1\nACGT\nACGTACGT\nAC\n>seq2\nACGT\n")
+    with path.open() as file, pytest.warns(UserWarning, match="indexed"):
+        output = convert(file, select=["seq1"])
+    assert output.splitlines()[1:] == ["seq1\tACGTACGTACGTAC"]
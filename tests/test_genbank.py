@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+
+import os
+import warnings
+from io import StringIO
+from pathlib import Path
+from typing import Any, List, TextIO, Tuple
+
+import pytest
+
+from itaxotools.DNAconvert.library import gbindex, genbank  # type: ignore
+from itaxotools.DNAconvert.library.fasta import Fastafile  # type: ignore
+
+testfile = Path(__file__).parent / "test_files" / "testbarcodes.gb"
+
+text = testfile.read_text()
+
+# the records of the test file
+records = [record + "//\n" for record in text.split("//\n") if record.strip()]
+
+
+def read(text: str, **options: Any) -> Tuple[List[List[str]], List[str]]:
+    """Returns the values of the records and the warnings"""
+    return read_file(StringIO(text), **options)
+
+
+def read_file(file: TextIO, **options: Any) -> Tuple[List[List[str]], List[str]]:
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        _, record_generator = genbank.GenbankFile.read(file, **options)
+        values = [
+            [record[field] for field in genbank.gb_fields]
+            for record in record_generator()
+        ]
+    return values, [str(warning.message) for warning in caught]
+
+
+def read_lines(text: str) -> Tuple[List[List[str]], List[str]]:
+    """Reads the records line by line, as the irregular records are"""
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        lines = genbank.logical_lines(StringIO(text))
+        values = []
+        for parsed in genbank.GenbankFile._parse_lines(lines):
+            record = genbank.GenbankFile._record(*parsed)
+            if record is not None:
+                values.append([record[field] for field in genbank.gb_fields])
+    return values, [str(warning.message) for warning in caught]
+
+
+@pytest.mark.parametrize("block_size", [1, 7, 100, 1 << 20])
+def test_record_texts(monkeypatch: pytest.MonkeyPatch, block_size: int) -> None:
+    monkeypatch.setattr(genbank, "BLOCK_SIZE", block_size)
+    texts = list(genbank.record_texts(StringIO(text)))
+    assert texts[:-1] == records
+    assert "".join(texts) == text
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        text,
+        # without definition
+        records[0].replace("DEFINITION", "COMMENT") + records[1],
+        # without ORIGIN, the features and the sequence are of the next record
+        records[0].replace("ORIGIN", "CONTIG") + records[1] + records[2],
+        # the sequence ends before the "//" line
+        records[0].replace("\n//", "//", 1) + records[1],
+        # the last record is incomplete
+        records[0] + records[1][:-100],
+        "\n\n" + records[0] + "\n\n" + records[1],
+        # the product is on several lines or not closed
+        records[0].replace('/product="', '/product="a\n                     b ')
+        + records[1].replace('/product="', '/product="a\n'),
+    ],
+)
+@pytest.mark.parametrize("block_size", [1, 100, 1 << 20])
+def test_read(monkeypatch: pytest.MonkeyPatch, block_size: int, text: str) -> None:
+    monkeypatch.setattr(genbank, "BLOCK_SIZE", block_size)
+    assert read(text) == read_lines(text)
+
+
+def test_find_product() -> None:
+    features = (
+        "FEATURES             Location/Qualifiers\n"
+        "     source          1..10\n"
+        '                     /note="a /product="b" c\n'
+        "     gene            1..10\n"
+        '                     /product="d\n'
+        "     CDS             1..10\n"
+        "                     /codon_start=1\n"
+        '                     /product="e\n'
+        '                     f"\n'
+        '     CDS             /product="g"\n'
+    )
+    # the logical lines are joined, as in collect_features
+    start = features.index("     source")
+    assert genbank.find_product(features, start, len(features)) == "b"
+    start = features.index("     gene")
+    assert genbank.find_product(features, start, len(features)) == "e f"
+    assert genbank.find_product(features, start, features.index("     CDS")) is None
+
+
+def test_join_sequence() -> None:
+    assert genbank.join_sequence("        1 acgt acgt\n        9 ac\n") == "acgtacgtac"
+    # only the numbers are ignored
+    assert genbank.join_sequence("        1 ac1t\n") == "ac1t"
+
+
+@pytest.mark.parametrize("newline", ["\n", "\r\n"])
+def test_index(tmp_path: Path, newline: str) -> None:
+    path = tmp_path / "test.gb"
+    path.write_text(text, newline=newline)
+    with path.open() as file:
+        read_file(file, record_range=(0, 1))
+    _, index = gbindex.read_index(str(path) + gbindex.INDEX_EXTENSION, "utf-8")
+    data = path.read_bytes().decode()
+    assert [data[entry.start : entry.end] for entry in index] == [
+        record.lstrip("\n").replace("\n", newline) for record in records
+    ]
+    assert index[0].accession == "MF918302"
+    assert index[0].definition.startswith("Jugatala sp. BIOUG20439-D05 cytochrome")
+
+
+@pytest.mark.parametrize(
+    "selection",
+    [
+        dict(select=["MF918295", "MF918302", "missing"]),
+        dict(record_range=(2, 5)),
+        dict(select=["MF918302", "MF918295"], record_range=(1, 10)),
+    ],
+)
+def test_selection(tmp_path: Path, selection: Any) -> None:
+    path = tmp_path / "test.gb"
+    path.write_text(text)
+    # the regular file is read through the index, StringIO is read completely
+    for _ in range(2):
+        with path.open() as file:
+            indexed = read_file(file, **selection)
+        assert (tmp_path / "test.gb.gbi").exists()
+    assert indexed == read(text, **selection)
+    if "select" in selection:
+        accessions = [
+            values[genbank.gb_fields.index("accession")] for values in indexed[0]
+        ]
+        _, index = gbindex.read_index(str(path) + gbindex.INDEX_EXTENSION, "utf-8")
+        in_range = index[slice(*selection.get("record_range", (None,)))]
+        assert accessions == [
+            name
+            for name in selection["select"]
+            if name in {entry.accession for entry in in_range}
+        ]
+    # the records can be selected by the definition
+    definition = indexed[0][0][0]
+    with path.open() as file:
+        assert read_file(file, select=[definition])[0] == indexed[0][:1]
+
+
+def test_replaced_file(tmp_path: Path) -> None:
+    path = tmp_path / "test.gb"
+    path.write_text(text)
+    with path.open() as file:
+        read_file(file, record_range=(0, 1))
+    mtime = path.stat().st_mtime
+    # the file is replaced with the same modification time
+    path.write_text(records[2] + records[0])
+    os.utime(path, (mtime, mtime))
+    with path.open() as file:
+        indexed = read_file(file, record_range=(0, 2))
+    assert indexed == read(records[2] + records[0], record_range=(0, 2))
+    size, _ = gbindex.read_index(str(path) + gbindex.INDEX_EXTENSION, "utf-8")
+    assert size == path.stat().st_size
+
+
+def test_irregular_index(tmp_path: Path) -> None:
+    path = tmp_path / "test.gb"
+    path.write_text(records[0].replace("ORIGIN", "CONTIG") + records[1] + records[2])
+    with path.open() as file:
+        values, messages = read_file(file, record_range=(0, 3))
+    assert any("indexed" in message for message in messages)
+    assert not (tmp_path / "test.gb.gbi").exists()
+
+
+def test_projection() -> None:
+    # the fields that Fastafile uses are the fields of the name and the sequence
+    consumed = Fastafile.consumed_fields(genbank.gb_fields)
+    assert consumed == [*genbank.gb_fields[1:9], "sequence"]
+    _, full_records = genbank.GenbankFile.read(StringIO(text))
+    _, projected_records = genbank.GenbankFile.read(
+        StringIO(text), projection=Fastafile.consumed_fields
+    )
+    for full, projected in zip(full_records(), projected_records()):
+        assert set(projected._schema.fields) == {"seqid", *consumed}
+        assert all(projected[field] == full[field] for field in consumed)
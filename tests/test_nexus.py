@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+
+from io import StringIO
+from typing import List, Tuple
+
+import pytest
+
+from itaxotools.DNAconvert.library import nexus  # type: ignore
+
+text = """#NEXUS
+begin data;
+dimensions ntax=2 nchar=8;
+format datatype=DNA [a [nested] comment] interleave;
+matrix
+'taxon ''one''' ACGT[comment inside]ACGT
+taxon_2 TTTT TTTT
+;
+end;"""
+
+tokens = [
+    "begin",
+    "data",
+    ";",
+    "dimensions",
+    "ntax",
+    "=",
+    "2",
+    "nchar",
+    "=",
+    "8",
+    ";",
+    "format",
+    "datatype",
+    "=",
+    "DNA",
+    "interleave",
+    ";",
+    "matrix",
+    "taxon 'one'",
+    "ACGTACGT",
+    "taxon_2",
+    "TTTT",
+    "TTTT",
+    ";",
+    "end",
+    ";",
+]
+
+
+@pytest.mark.parametrize("block_size", [1, 2, 3, 7, 1 << 20])
+def test_tokenizer(monkeypatch: pytest.MonkeyPatch, block_size: int) -> None:
+    monkeypatch.setattr(nexus, "BLOCK_SIZE", block_size)
+    assert list(nexus.Tokenizer(StringIO(text))) == tokens
+
+
+@pytest.mark.parametrize("block_size", [1, 2, 1 << 20])
+@pytest.mark.parametrize(
+    "quoted, expected",
+    [
+        # a quoted value begins a new token and the word after it continues it
+        ("abc'q x'def", ["abc", "q xdef"]),
+        ("'q x'def'y'", ["q xdef", "y"]),
+        ("'it''s'", ["it's"]),
+    ],
+)
+def test_tokenizer_quoted(
+    monkeypatch: pytest.MonkeyPatch, block_size: int, quoted: str, expected: List[str]
+) -> None:
+    monkeypatch.setattr(nexus, "BLOCK_SIZE", block_size)
+    assert list(nexus.Tokenizer(StringIO(f"#NEXUS\n{quoted};"))) == expected + [";"]
+
+
+@pytest.mark.parametrize(
+    "text, message",
+    [
+        ("#NEXUS\nbegin [data;", "comment"),
+        ("#NEXUS\nbegin 'data;", "quoted"),
+        ("begin data;", "not a nexus file"),
+    ],
+)
+def test_tokenizer_errors(text: str, message: str) -> None:
+    with pytest.raises(ValueError, match=message):
+        list(nexus.Tokenizer(StringIO(text)))
+
+
+def read_matrix(matrix: str, format: str) -> List[Tuple[str, str]]:
+    text = f"#NEXUS\nbegin data;\ndimensions ntax=3 nchar=8;\nformat datatype=DNA {format};\nmatrix\n{matrix}\n;\nend;\n"
+    _, records = nexus.NexusFile.read(StringIO(text))
+    return [(record["seqid"], record["sequence"]) for record in records()]
+
+
+def test_matrix() -> None:
+    sequences = [("a", "ACGTACGT"), ("b", "TTTTTTTT"), ("c", "GGGGGGGG")]
+    interleaved = "a ACGT\nb TTTTT\nc GG\n\na ACGT\nb TTT\nc GGGGGG"
+    assert read_matrix(interleaved, "interleave") == sequences
+    sequential = "a ACGT ACGT\nb TTTTTTTT\nc GG GG GG GG"
+    assert read_matrix(sequential, "") == sequences
+    with pytest.raises(ValueError, match="shorter"):
+        read_matrix("a ACGT ACGT\nb TTTT", "")
+
+
+def test_interleaved_streaming() -> None:
+    reader = nexus.NexusReader()
+    reader.nchar = 6
+    args = iter(
+        ["a", "AC", "b", "TT", "c", "GG"]
+        + ["a", "GT", "b", "TT", "c", "GG"]
+        + ["a", "AC", "b", "TT"]
+    )
+    sequences = reader.sequences_interleaved(args)
+    # once the second block has repeated the first one, a is emitted as soon as it's complete
+    assert next(sequences) == ("a", "ACGTAC")
+    assert list(args) == ["b", "TT"]
+
+
+def test_interleaved_repeated_taxon() -> None:
+    reader = nexus.NexusReader()
+    reader.nchar = 4
+    # a matrix with a single block keeps appending to a repeated taxon
+    args = iter(["a", "ACGT", "b", "TTTT", "b", "GGGG"])
+    assert list(reader.sequences_interleaved(args)) == [
+        ("a", "ACGT"),
+        ("b", "TTTTGGGG"),
+    ]
+
+
+def test_interleaved_longer_than_nchar() -> None:
+    reader = nexus.NexusReader()
+    reader.nchar = 4
+    # the third block continues the sequences emitted after the second one
+    args = iter(["a", "AC", "b", "GG", "a", "GT", "b", "TT", "a", "XX", "b", "YY"])
+    sequences = reader.sequences_interleaved(args)
+    assert next(sequences) == ("a", "ACGT")
+    with pytest.raises(ValueError, match="a is longer than nchar"):
+        list(sequences)
+
+
+skipped_text = """#NEXUS
+begin taxa; dimensions ntax=2; taxlabels a b; end;
+begin trees;
+ translate 1 'x;end;'' y', [end; [nested] end;] 2 end ;
+ tree t = [&R] ((1:0.1,2:0.2)end:1);
+ [comment] End;
+BEGIN data;
+dimensions ntax=2 nchar=8;
+format datatype=DNA;
+matrix
+a ACGTACGT
+b TTTTTTTT
+;
+endblock;
+begin assumptions;
+ options deftype=unord;
+"""
+
+
+def test_skipped_blocks() -> None:
+    tokens = list(nexus.Tokenizer(StringIO(skipped_text), {"data"}))
+    assert tokens[:10] == ["begin", "taxa", ";", "end", ";"] + [
+        "begin",
+        "trees",
+        ";",
+        "End",
+        ";",
+    ]
+    assert tokens[-5:] == ["endblock", ";", "begin", "assumptions", ";"]
+
+
+@pytest.mark.parametrize("block_size", [1, 2, 3, 7, 13, 1 << 20])
+def test_skipped_blocks_records(
+    monkeypatch: pytest.MonkeyPatch, block_size: int
+) -> None:
+    monkeypatch.setattr(nexus, "BLOCK_SIZE", block_size)
+    _, records = nexus.NexusFile.read(StringIO(skipped_text))
+    assert [(record["seqid"], record["sequence"]) for record in records()] == [
+        ("a", "ACGTACGT"),
+        ("b", "TTTTTTTT"),
+    ]
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+
+from io import StringIO
+from pathlib import Path
+
+import pytest
+
+from itaxotools.DNAconvert import convertDNA  # type: ignore
+from itaxotools.DNAconvert.library import parallel  # type: ignore
+from itaxotools.DNAconvert.library.formats import formats  # type: ignore
+from itaxotools.DNAconvert.library import tabfile  # type: ignore
+
+testfiles_path: Path = Path(__file__).parent / "test_files"
+
+options = dict(
+    allow_empty_sequences=False,
+    automatic_renaming=False,
+    preserve_spaces=False,
+)
+
+
+def convert(path: Path, format_name: str, jobs: int) -> str:
+    with StringIO() as output, path.open() as input:
+        convertDNA(
+            input,
+            output,
+            formats[format_name],
+            tabfile.Tabfile,
+            jobs=jobs,
+            **options,
+        )
+        return output.getvalue()
+
+
+@pytest.mark.parametrize(
+    "name, format_name",
+    [
+        ("MolD_examplefile1_PontohedyleCOI_iTaxoTools_0_1.fas", "mold_fasta"),
+        ("ali_example_file_1.ali", "ali_fasta"),
+    ],
+)
+def test_parallel_fasta(
+    monkeypatch: pytest.MonkeyPatch, name: str, format_name: str
+) -> None:
+    # split the small test files into many parts
+    monkeypatch.setattr(parallel, "CHUNK_SIZE", 1000)
+    path = testfiles_path / name
+    assert len(parallel.split_offsets(str(path), b">", 1000)) > 2
+    assert convert(path, format_name, jobs=2) == convert(path, format_name, jobs=1)
+
+
+def test_parallel_genbank(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(parallel, "CHUNK_SIZE", 3000)
+    path = testfiles_path / "testbarcodes.gb"
+    assert len(parallel.split_offsets(str(path), b"LOCUS", 3000)) > 2
+    assert convert(path, "genbank", jobs=2) == convert(path, "genbank", jobs=1)
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+
+import pstats
+from io import StringIO
+from pathlib import Path
+
+import pytest
+
+from itaxotools.DNAconvert import convertDNA  # type: ignore
+from itaxotools.DNAconvert.DNAconvert import convert_wrapper  # type: ignore
+from itaxotools.DNAconvert.library.nexus import NexusFile  # type: ignore
+from itaxotools.DNAconvert.library.profiling import Profile  # type: ignore
+from itaxotools.DNAconvert.library.tabfile import Tabfile  # type: ignore
+
+testfiles_path: Path = Path(__file__).parent / "test_files"
+
+options = dict(
+    allow_empty_sequences=False,
+    automatic_renaming=False,
+    preserve_spaces=False,
+)
+
+
+def convert(profile: Profile = None) -> str:
+    with open(testfiles_path / "testbarcodes.tab") as infile, StringIO() as outfile:
+        convertDNA(infile, outfile, Tabfile, NexusFile, profile=profile, **options)
+        return outfile.getvalue()
+
+
+def test_profile(tmp_path: Path) -> None:
+    profile = Profile()
+    assert convert(profile) == convert()
+    assert profile.conversions == 1
+    assert set(profile.stages) == {"read", "prepare", "write", "output"}
+    assert sum(profile.stages[stage] for stage in ("read", "prepare", "write")) <= (
+        profile.total
+    )
+    assert 0 < profile.name_time() <= profile.stages["write"]
+    report = profile.report()
+    assert "name assembly" in report
+    assert "_complex_name" in report or "sanitize" in report
+    profile.dump(str(tmp_path / "conversion.prof"))
+    stats = pstats.Stats(str(tmp_path / "conversion.prof"))
+    assert any(name == "convert_records" for _, _, name in stats.stats)  # type: ignore
+
+
+def test_profile_directory(tmp_path: Path) -> None:
+    for name in ("a.tab", "b.tab"):
+        (tmp_path / name).write_text((testfiles_path / "testbarcodes.tab").read_text())
+    output = tmp_path / "output"
+    output.mkdir()
+    profile = Profile()
+    with pytest.raises(ValueError, match="one job"):
+        convert_wrapper(
+            str(tmp_path),
+            str(output),
+            "tab",
+            "nexus",
+            jobs=2,
+            profile=profile,
+            **options,
+        )
+    convert_wrapper(
+        str(tmp_path), str(output), "tab", "nexus", profile=profile, **options
+    )
+    assert profile.conversions == 2
@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+
+import threading
+import warnings
+from pathlib import Path
+from typing import Any, List
+
+import pytest
+
+from itaxotools.DNAconvert.DNAconvert import convert_wrapper  # type: ignore
+from itaxotools.DNAconvert.library import binary  # type: ignore
+from itaxotools.DNAconvert.library.progress import (  # type: ignore
+    CancelToken,
+    ConversionCancelled,
+    Progress,
+)
+from itaxotools.DNAconvert.library.utils import collect_warnings  # type: ignore
+
+options = dict(
+    allow_empty_sequences=False,
+    automatic_renaming=False,
+    preserve_spaces=False,
+)
+
+
+def write_fasta(path: Path, count: int) -> None:
+    with path.open("w") as file:
+        for i in range(count):
+            file.write(f">seq{i}\n{'ACGT' * 25}\n")
+
+
+@pytest.mark.parametrize("extension", [".fas", ".tab"])
+def test_progress(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, extension: str
+) -> None:
+    # many small blocks of the memory mapped files
+    monkeypatch.setattr(binary, "BLOCK_SIZE", 1000)
+    infile = tmp_path / "input.fas"
+    write_fasta(infile, 5000)
+    if extension != ".fas":
+        convert_wrapper(
+            str(infile), str(tmp_path / f"input{extension}"), "", "", **options
+        )
+        infile = tmp_path / f"input{extension}"
+    reports: List[Progress] = []
+    convert_wrapper(
+        str(infile),
+        str(tmp_path / "output.phy"),
+        "",
+        "",
+        progress=lambda progress: reports.append(Progress(**vars(progress))),
+        **options,
+    )
+    assert len(reports) > 2
+    assert [report.records for report in reports] == sorted(
+        report.records for report in reports
+    )
+    assert [report.bytes_read for report in reports] == sorted(
+        report.bytes_read for report in reports
+    )
+    assert 0 < reports[1].fraction < 1
+    assert reports[-1].records == 5000
+    assert reports[-1].fraction == 1
+    assert reports[-1].total_bytes == infile.stat().st_size
+
+
+def test_cancel(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(binary, "BLOCK_SIZE", 1000)
+    infile = tmp_path / "input.fas"
+    write_fasta(infile, 5000)
+    token = CancelToken()
+    reports: List[int] = []
+
+    def cancel_after_first(progress: Progress) -> None:
+        reports.append(progress.records)
+        token.cancel()
+
+    with pytest.raises(ConversionCancelled):
+        convert_wrapper(
+            str(infile),
+            str(tmp_path / "output.tab"),
+            "",
+            "",
+            progress=cancel_after_first,
+            cancel=token,
+            **options,
+        )
+    # the conversion stops at the next batch
+    assert len(reports) == 1
+    lines = (tmp_path / "output.tab").read_text().splitlines()
+    assert len(lines) == 1 + reports[0] < 5000
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_directory(tmp_path: Path, jobs: int) -> None:
+    (tmp_path / "input").mkdir()
+    (tmp_path / "output").mkdir()
+    for i in range(3):
+        write_fasta(tmp_path / "input" / f"{i}.fas", 100 * (i + 1))
+    reports: List[Progress] = []
+    convert_wrapper(
+        str(tmp_path / "input"),
+        str(tmp_path / "output"),
+        "fasta",
+        "tab",
+        jobs=jobs,
+        progress=lambda progress: reports.append(Progress(**vars(progress))),
+        **options,
+    )
+    assert reports[-1].records == 600
+    assert reports[-1].files_done == reports[-1].files_total == 3
+    assert reports[-1].fraction == 1
+
+    token = CancelToken()
+    token.cancel()
+    with pytest.raises(ConversionCancelled):
+        convert_wrapper(
+            str(tmp_path / "input"),
+            str(tmp_path / "output"),
+            "fasta",
+            "tab",
+            jobs=jobs,
+            cancel=token,
+            **options,
+        )
+
+
+def test_conversion_thread(tmp_path: Path) -> None:
+    pytest.importorskip("tkinter")
+    from itaxotools.DNAconvert.library import guiutils  # type: ignore
+
+    infile = tmp_path / "input.fas"
+    write_fasta(infile, 3000)
+
+    def convert(**observers: Any) -> None:
+        convert_wrapper(
+            str(infile), str(tmp_path / "output.tab"), "", "", **options, **observers
+        )
+
+    conversion = guiutils.ConversionThread(convert)
+    conversion.start()
+    conversion.join()
+    assert conversion.error is None
+    assert conversion.progress.records == 3000
+    assert guiutils.progress_text(conversion.progress).startswith("3000 records")
+
+    conversion = guiutils.ConversionThread(convert)
+    conversion.cancel()
+    conversion.start()
+    conversion.join()
+    assert isinstance(conversion.error, ConversionCancelled)
+
+
+def test_collect_warnings(monkeypatch: pytest.MonkeyPatch) -> None:
+    shown: List[str] = []
+    monkeypatch.setattr(
+        warnings, "showwarning", lambda message, *args: shown.append(str(message))
+    )
+    started = threading.Event()
+    warned = threading.Event()
+    collected: List[List[str]] = []
+
+    def convert() -> None:
+        with collect_warnings() as messages:
+            started.wait()
+            warnings.warn("in the thread")
+            warned.set()
+        collected.append(messages)
+
+    thread = threading.Thread(target=convert)
+    thread.start()
+    # the warnings of the main thread are shown as before
+    started.set()
+    warned.wait()
+    warnings.warn("in the main thread")
+    thread.join()
+    assert collected == [["in the thread"]]
+    assert shown == ["in the main thread"]
+
+    # the same warning is collected again in the next conversion
+    for _ in range(2):
+        with collect_warnings() as messages:
+            warnings.warn("repeated")
+        assert messages == ["repeated"]
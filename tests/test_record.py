@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+
+import pickle
+
+import pytest
+
+from itaxotools.DNAconvert.library.record import Record, Schema  # type: ignore
+
+
+def test_record_fields() -> None:
+    record = Record(seqid="id1", sequence="ACGT")
+    assert record["seqid"] == "id1"
+    assert record.get("sequence") == "ACGT"
+    assert record.get("species") is None
+    with pytest.raises(KeyError):
+        record["species"]
+    record["sequence"] = "AC"
+    record["species"] = "Homo sapiens"
+    assert record["sequence"] == "AC"
+    assert record["species"] == "Homo sapiens"
+
+
+def test_record_validation() -> None:
+    with pytest.raises(ValueError):
+        Record(sequence="ACGT")
+    with pytest.raises(ValueError):
+        Record(seqid="id1", species="Homo sapiens")
+
+
+def test_schema_sharing() -> None:
+    schema = Schema.get(["seqid", "sequence"])
+    first = Record.from_values(schema, ["id1", "ACGT"])
+    second = Record(seqid="id2", sequence="ACGA")
+    assert first._schema is second._schema
+    first["species"] = "Homo sapiens"
+    second["species"] = "Homo sapiens"
+    assert first._schema is second._schema
+    assert pickle.loads(pickle.dumps(first))._schema is first._schema
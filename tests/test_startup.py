@@ -0,0 +1,33 @@
+#!/usr/bin/env python
+
+import subprocess
+import sys
+from pathlib import Path
+
+testfiles_path: Path = Path(__file__).parent / "test_files"
+
+# the modules that a command-line conversion between FASTA and tab files doesn't need
+heavy_modules = ["tkinter", "dendropy", "nexus", "appdirs", "concurrent.futures"]
+
+script = """
+import sys
+from itaxotools.DNAconvert import main
+
+sys.argv = ["DNAconvert", "--cmd", "--informat", "fasta", "--outformat", "tab", *sys.argv[1:]]
+main()
+print(" ".join(sorted(sys.modules)))
+"""
+
+
+def test_lazy_imports(tmp_path: Path) -> None:
+    infile = testfiles_path / "MolD_examplefile1_PontohedyleCOI_iTaxoTools_0_1.fas"
+    outfile = tmp_path / "output.tab"
+    result = subprocess.run(
+        [sys.executable, "-c", script, str(infile), str(outfile)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert outfile.read_text().startswith("seqid\tsequence\n")
+    modules = set(result.stdout.split())
+    assert [module for module in heavy_modules if module in modules] == []
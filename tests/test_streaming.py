@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+
+import sys
+from io import StringIO
+from pathlib import Path
+from typing import TextIO, List, Tuple
+
+import pytest
+
+from itaxotools.DNAconvert import convertDNA  # type: ignore
+from itaxotools.DNAconvert.DNAconvert import convert_wrapper  # type: ignore
+from itaxotools.DNAconvert.library.formats import formats  # type: ignore
+from itaxotools.DNAconvert.library import tabfile  # type: ignore
+from itaxotools.DNAconvert.library import utils  # type: ignore
+
+testfiles_path: Path = Path(__file__).parent / "test_files"
+
+options = dict(
+    allow_empty_sequences=False,
+    automatic_renaming=False,
+    preserve_spaces=False,
+)
+
+
+class UnseekableInput(StringIO):
+    """Input that can only be read once, like a pipe"""
+
+    def seekable(self) -> bool:
+        return False
+
+
+def convert(input: TextIO, format_name: str, **extra_options: bool) -> str:
+    with StringIO() as output:
+        convertDNA(
+            input,
+            output,
+            tabfile.Tabfile,
+            formats[format_name],
+            **options,
+            **extra_options,
+        )
+        return output.getvalue()
+
+
+@pytest.mark.parametrize(
+    "name, format_name",
+    [
+        ("MolD_examplefile1_PontohedyleCOI_iTaxoTools_0_1.tab", "phylip"),
+        ("MolD_examplefile1_PontohedyleCOI_iTaxoTools_0_1.tab", "relaxed_phylip"),
+        ("testbarcodes.tab", "fasta_hapview"),
+        ("ali_example_file_1.tab", "fasta_hapview"),
+    ],
+)
+@pytest.mark.parametrize("input_class", [StringIO, UnseekableInput])
+def test_low_memory(name: str, format_name: str, input_class: type) -> None:
+    content = (testfiles_path / name).read_text()
+    expected = convert(StringIO(content), format_name)
+    assert convert(input_class(content), format_name, low_memory=True) == expected
+
+
+@pytest.mark.parametrize(
+    "format_name", ["phylip", "relaxed_phylip", "nexus", "fasta_hapview"]
+)
+def test_spool_closed(monkeypatch: pytest.MonkeyPatch, format_name: str) -> None:
+    closed: List[utils.RecordSpool] = []
+
+    class RecordSpool(utils.RecordSpool):
+        def close(self) -> None:
+            closed.append(self)
+            super().close()
+
+    monkeypatch.setattr(
+        sys.modules[formats[format_name].__module__], "RecordSpool", RecordSpool
+    )
+    content = (testfiles_path / "ali_example_file_1.tab").read_text()
+    # the input can't be prescanned, so the records are collected in a temporary file
+    convert(UnseekableInput(content), format_name, low_memory=True)
+    # it is closed after the records are written
+    assert len(closed) == 1
+
+
+def test_tabfile_blank_batch() -> None:
+    content = "seqid\tsequence\na\tACGT\n" + "\n" * 2 * tabfile.BATCH_SIZE + "b\tGG\n"
+    _, batches = tabfile.Tabfile.read_batches(StringIO(content))
+    # the batch of blank lines is skipped
+    assert [[record["seqid"] for record in batch] for batch in batches()] == [
+        ["a"],
+        ["b"],
+    ]
+
+
+def read_nexus(text: str) -> List[Tuple[str, str]]:
+    _, records = formats["nexus"].read(StringIO(text))
+    return [(record["seqid"], record["sequence"]) for record in records()]
+
+
+@pytest.mark.parametrize(
+    "name",
+    [
+        "MolD_examplefile1_PontohedyleCOI_iTaxoTools_0_1.tab",
+        "ali_example_file_1.tab",
+    ],
+)
+def test_nexus_patched(tmp_path: Path, name: str) -> None:
+    content = (testfiles_path / name).read_text()
+    expected = convert(StringIO(content), "nexus")
+    # the output is not a regular file, the records are collected in a temporary file
+    assert convert(StringIO(content), "nexus", low_memory=True) == expected
+    # the dimensions command is written after the matrix
+    with (tmp_path / "output.nex").open("w+") as output:
+        convertDNA(
+            UnseekableInput(content),
+            output,
+            tabfile.Tabfile,
+            formats["nexus"],
+            low_memory=True,
+            **options,
+        )
+    patched = (tmp_path / "output.nex").read_text()
+    assert read_nexus(patched) == read_nexus(expected)
+    assert "dimensions" in patched
+
+
+def test_nexus_patched_output(tmp_path: Path) -> None:
+    infile = testfiles_path / "MolD_examplefile1_PontohedyleCOI_iTaxoTools_0_1.tab"
+    expected = convert(StringIO(infile.read_text()), "nexus")
+    outfile = tmp_path / "output.nex"
+    convert_wrapper(str(infile), str(outfile), "", "", low_memory=True, **options)
+    # the output file is opened for reading, so the dimensions command is patched
+    assert " " * 20 in outfile.read_text()
+    assert read_nexus(outfile.read_text()) == read_nexus(expected)
+
+
+@pytest.mark.parametrize(
+    "matrix, expected",
+    [
+        # a single block with a repeated taxon, as written without renaming
+        ("a ACGT\na TTTT\nb GGGG\n", [("a", "ACGTTTTT"), ("b", "GGGG")]),
+        ("a ACGT\nb GGGG\na TTTT\n", [("a", "ACGTTTTT"), ("b", "GGGG")]),
+        # the taxa of the first block don't repeat in the same order
+        ("a AC\nb GG\nb TT\na GT\n", [("a", "ACGT"), ("b", "GGTT")]),
+        # a regular interleaved matrix
+        ("a AC\nb GG\n\na GT\nb TT\n", [("a", "ACGT"), ("b", "GGTT")]),
+    ],
+)
+def test_nexus_repeated_taxon(matrix: str, expected: List[Tuple[str, str]]) -> None:
+    text = (
+        "#NEXUS\nbegin data;\ndimensions ntax=2 nchar=4;\n"
+        "format datatype=DNA missing=N gap=- interleave=yes;\n"
+        f"matrix\n{matrix};\nend;\n"
+    )
+    assert read_nexus(text) == expected